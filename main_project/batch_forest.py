@@ -0,0 +1,305 @@
+"""
+This module is the non-interactive entry point of the forest fire simulator. It reads run specifications from a
+JSON or TOML file and executes them headless (no prompts, pauses or windows), writing the results to disk, so
+simulations can be started from schedulers and cron jobs.
+
+Usage: python batch_forest.py runs.json [--only NAME ...] [--quiet] [--warehouse [PATH]]
+
+A run specification file holds one run, a list of runs, or a table 'runs' with a list of runs. Each run has:
+    name        Name of the run, used in messages and default output names (default 'run<number>')
+    graph       Graph source, either {"file": path} for a .dat edge file or binary graph file (see graphfile_helper),
+                or {"generator": name, ...parameters} for one of generator_helper.GENERATORS,
+                eg. {"generator": "voronoi", "minpoints": 5000, "seed": 3}. Generated graphs are cached on disk.
+                An optional "order" renumbers the vertices for locality when the graph is loaded, one of 'auto',
+                'hilbert', 'morton' or 'rcm' (see reorder_helper); vertex ids are unchanged. It speeds up the
+                array engines; every engine updates the patches in vertex order, which the order changes
+    params      Simulation parameters (see PARAM_DEFAULTS): tree_rate, firefighters, autocombustion_prob,
+                fire_spread_prob, rock_mutate_prob, sim_limit and firefighter_skill
+    replicas    Number of independent simulations of the configuration (default 1)
+    seed        Seed of the first replica, replica r uses seed + r (the array engines seed all replicas
+                together with seed). If missing, runs are not reproducible
+    engine      Simulation engine in ENGINES (default 'object'): 'object' simulates each replica with
+                sim_forest.ForestFireGraph, 'replicas' simulates all replicas together as arrays and 'packed' as
+                arrays with the flags of 64 replicas packed in one word (see ensemble_helper)
+    output      Path of the results: .json, .csv or .npz (default '<name>.json')
+
+With --warehouse, every replica is also recorded in a results database (see store_helper.ResultStore), at PATH or
+at store_helper.default_results_path().
+
+Example (JSON):
+    {"runs": [{"name": "dense", "graph": {"generator": "square", "rows": 100},
+               "params": {"tree_rate": 90, "sim_limit": 50}, "replicas": 20, "seed": 1, "output": "dense.csv"}]}
+
+Requirements
+------------
+Package numpy https://numpy.org/ which can be installed via PIP.
+Python 3.7 or higher, TOML files need Python 3.11 or the tomli package.
+
+Notes
+-----
+This module is created as material for the phase 2 project for DM857, DS830 (2023).
+"""
+import argparse
+import csv
+import json
+import os
+import random
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+import numpy as np
+from class_helper import SERIES
+from csr_helper import CSRGraph
+import store_helper as store
+import ensemble_helper as ensemble
+
+# Simulation parameters and their defaults, named like the prompts of graph_forest
+PARAM_DEFAULTS = {
+    "tree_rate": 80,
+    "firefighters": 3,
+    "autocombustion_prob": 1,
+    "fire_spread_prob": 30,
+    "rock_mutate_prob": 1,
+    "sim_limit": 10,
+    "firefighter_skill": 25,
+}
+# Keys a run specification may have
+RUN_KEYS = ("name", "graph", "params", "replicas", "seed", "engine", "output")
+
+
+def run_object(graph: CSRGraph, params: Dict, replicas: int, seed: Optional[int]) -> Dict[str, np.ndarray]:
+    """Return the series of replicas simulated with the object engine (sim_forest.ForestFireGraph)
+
+    Parameters
+    ----------
+    graph: CSRGraph
+        The graph to simulate on
+    params: Dict
+        Simulation parameters, see PARAM_DEFAULTS
+    replicas: int
+        Number of simulations
+    seed: Optional[int]
+        Seed of the first replica, replica r is seeded with seed + r
+    """
+    from sim_forest import ForestFireGraph
+
+    series = {name: np.zeros((replicas, params["sim_limit"] + 1), dtype=np.int64) for name in SERIES}
+    for replica in range(replicas):
+        if seed is not None:
+            random.seed(seed + replica)
+        forest = ForestFireGraph(graph, {}, params["tree_rate"], params["firefighters"], params["autocombustion_prob"],
+                                 params["fire_spread_prob"], params["rock_mutate_prob"], params["sim_limit"],
+                                 params["firefighter_skill"], renderer=None)
+        forest.simulate()
+        data = forest._graph_data
+        series["tree_patches"][replica] = data._tree_patches
+        series["rock_patches"][replica] = data._rock_patches
+        series["ignited_tree_patches"][replica] = data._ignited_tree_patches
+
+    return series
+
+
+# Simulation engines by name. Each takes (graph, params, replicas, seed) and returns SERIES arrays
+ENGINES: Dict[str, Callable[[CSRGraph, Dict, int, Optional[int]], Dict[str, np.ndarray]]] = {
+    "object": run_object,
+    "replicas": ensemble.run_replicas,
+    "packed": ensemble.run_packed,
+}
+
+
+def load_runs(path: str) -> List[Dict]:
+    """Return the run specifications in a JSON or TOML file, with defaults filled in
+
+    Parameters
+    ----------
+    path: str
+        Path of the .json or .toml file
+    """
+    if path.endswith(".toml"):
+        try:
+            import tomllib
+        except ImportError:
+            import tomli as tomllib
+        with open(path, "rb") as file:
+            content = tomllib.load(file)
+    else:
+        with open(path) as file:
+            content = json.load(file)
+
+    if isinstance(content, dict):
+        content = content.get("runs", [content])
+
+    return [_complete_run(run, number) for number, run in enumerate(content, start=1)]
+
+
+def load_graph_source(source: Dict) -> CSRGraph:
+    """Return the graph of a run's graph source
+
+    Parameters
+    ----------
+    source: Dict
+        {"file": path} or {"generator": name, ...parameters}, with an optional "order" of the vertices
+    """
+    if "file" in source:
+        import graphfile_helper as gfh
+        if not os.path.isfile(source["file"]):
+            raise Exception(f"batch, graph file {source['file']} not found")
+        graph = gfh.load_graph(source["file"])
+    elif "generator" in source:
+        import cache_helper as cache
+        params = {key: value for key, value in source.items() if key not in ("generator", "seed", "order")}
+        graph = cache.cached_generate(source["generator"], seed=source.get("seed"), **params)
+    else:
+        raise Exception(f"batch, graph source needs a 'file' or a 'generator': {source}")
+
+    if graph.num_edges() == 0:
+        raise Exception(f"batch, graph source has no edges: {source}")
+
+    if source.get("order"):
+        from reorder_helper import reorder_csr
+        graph = reorder_csr(graph, source["order"])
+
+    return graph
+
+
+def execute_run(run: Dict,
+                quiet: Optional[bool] = False,
+                warehouse: Optional[store.ResultStore] = None) -> Dict:
+    """Simulates a run specification and writes its results. Return the results
+
+    Parameters
+    ----------
+    run: Dict
+        Run specification from load_runs
+    quiet: Optional[bool], default = False
+        If True, no progress is printed
+    warehouse: Optional[ResultStore], default = None
+        If given, every replica is also recorded in this results database
+    """
+    started = time.perf_counter()
+    graph = load_graph_source(run["graph"])
+    loaded = time.perf_counter()
+
+    series = ENGINES[run["engine"]](graph, run["params"], run["replicas"], run["seed"])
+    finished = time.perf_counter()
+
+    results = {
+        "name": run["name"],
+        "spec": run,
+        "land_patches": int(np.count_nonzero(graph.degrees())),
+        "load_seconds": loaded - started,
+        "wall_seconds": finished - loaded,
+        "series": series,
+    }
+    write_results(run["output"], results)
+    if warehouse is not None:
+        import cache_helper as cache
+        warehouse.add_runs(cache.edge_set_hash(graph), run["params"], series, run["engine"], run["seed"],
+                           results["wall_seconds"], results["land_patches"])
+
+    if not quiet:
+        print(f"{run['name']}: {run['replicas']} replica(s) of {results['land_patches']} patches with engine "
+              f"'{run['engine']}' in {results['wall_seconds']:.2f} s -> {run['output']}")
+
+    return results
+
+
+def write_results(path: str, results: Dict) -> None:
+    """Writes the results of a run as .json, .csv (one row per replica and step) or .npz
+
+    Parameters
+    ----------
+    path: str
+        Output path, the format is chosen by the extension
+    results: Dict
+        Results from execute_run
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    series = results["series"]
+
+    if path.endswith(".csv"):
+        with open(path, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["run", "replica", "step", *SERIES])
+            replicas, steps = series[SERIES[0]].shape
+            for replica in range(replicas):
+                for step in range(steps):
+                    writer.writerow([results["name"], replica, step, *(int(series[name][replica, step]) for name in SERIES)])
+    elif path.endswith(".npz"):
+        np.savez_compressed(path, **series, spec=json.dumps(results["spec"]), wall_seconds=results["wall_seconds"])
+    else:
+        content = dict(results, series={name: values.tolist() for name, values in series.items()})
+        with open(path, "w") as file:
+            json.dump(content, file)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Execute the runs of a run specification file. Return the exit status"""
+
+    parser = argparse.ArgumentParser(description="Run forest fire simulations from a JSON or TOML file, headless.")
+    parser.add_argument("spec", help="path of the .json or .toml run specification file")
+    parser.add_argument("--only", nargs="+", metavar="NAME", help="only execute the runs with these names")
+    parser.add_argument("--quiet", action="store_true", help="do not print progress")
+    parser.add_argument("--warehouse", nargs="?", const="", metavar="PATH",
+                        help="also record every replica in a results database, by default in the cache directory")
+    arguments = parser.parse_args(argv)
+
+    try:
+        runs = load_runs(arguments.spec)
+    except Exception as error:
+        print(f"Invalid run specification file {arguments.spec}: {error}", file=sys.stderr)
+        return 2
+
+    if arguments.only:
+        runs = [run for run in runs if run["name"] in arguments.only]
+
+    warehouse = None if arguments.warehouse is None else store.ResultStore(arguments.warehouse or None)
+    failed = 0
+    try:
+        for run in runs:
+            try:
+                execute_run(run, arguments.quiet, warehouse)
+            except Exception as error:
+                failed += 1
+                print(f"{run['name']}: failed, {error}", file=sys.stderr)
+    finally:
+        if warehouse is not None:
+            warehouse.close()
+
+    return 1 if failed else 0
+
+
+def _complete_run(run: Dict, number: int) -> Dict:
+    """Return a copy of a run specification with defaults filled in, raising an exception on unknown keys"""
+
+    unknown = set(run) - set(RUN_KEYS)
+    if unknown:
+        raise Exception(f"run {number} has unknown keys: {', '.join(sorted(unknown))}")
+    if "graph" not in run:
+        raise Exception(f"run {number} has no graph source")
+
+    params = dict(run.get("params", {}))
+    unknown = set(params) - set(PARAM_DEFAULTS)
+    if unknown:
+        raise Exception(f"run {number} has unknown parameters: {', '.join(sorted(unknown))}")
+
+    engine = run.get("engine", "object")
+    if engine not in ENGINES:
+        raise Exception(f"run {number} has unknown engine '{engine}', use one of {', '.join(ENGINES)}")
+
+    name = run.get("name", f"run{number}")
+    return {
+        "name": name,
+        "graph": dict(run["graph"]),
+        "params": dict(PARAM_DEFAULTS, **params),
+        "replicas": int(run.get("replicas", 1)),
+        "seed": run.get("seed"),
+        "engine": engine,
+        "output": run.get("output", f"{name}.json"),
+    }
+
+
+if __name__ == "__main__":
+    sys.exit(main())
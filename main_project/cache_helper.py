@@ -0,0 +1,441 @@
+"""
+This module provides GraphCache, an on-disk cache of generated graphs, VerdictCache, an on-disk cache of
+yes/no verdicts about files, and helper functions, to:
+- default_cache_dir:        return the directory used for caches when none is given
+- content_hash:             return the sha256 hash of a file's content, used as key for VerdictCache
+- edge_set_hash:            return the sha256 hash of a set of undirected edges, eg. to cache layouts of a graph
+- intern_graph:             keep one copy of a graph per edge set in memory and return its key (its edge set hash)
+- interned_graph:           return the edges and positions of an interned graph by key, the most recently used
+                            MAX_INTERNED_GRAPHS graphs stay interned
+- is_interned:              return true if a graph with the given key is interned
+- cached_voronoi_to_edges:  return graph_helper.voronoi_to_edges output, generated once per size and seed
+- cached_generate:          return a generator_helper graph, generated once per generator, parameters and seed
+
+Each cache entry is a directory of .npy arrays named after a hash of the generator, its parameters and the seed.
+Entries are opened memory mapped, so repeat requests load in milliseconds. When the total size of the cache grows
+above its limit, the least recently used entries are removed.
+
+The cache can be shared by several worker processes: entries are written to a temporary directory and published
+with an atomic rename, and eviction is serialized with a lock file. Readers that already opened an evicted entry
+keep their memory mapping.
+
+Requirements
+------------
+Package numpy https://numpy.org/ which can be installed via PIP.
+Python 3.7 or higher.
+
+Notes
+-----
+This module is created as material for the phase 2 project for DM857, DS830 (2023).
+"""
+import hashlib
+import json
+import os
+import shutil
+import uuid
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows, eviction is then not serialized between processes
+    fcntl = None
+
+# Default limit for the total size of a cache on disk
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+# Bump when the layout of cache entries changes, so old entries are never read
+CACHE_VERSION = 1
+# Most graphs interned at once. The least recently used are released first, configurations keep their own graph
+MAX_INTERNED_GRAPHS = 32
+# Interned graphs of this process, edges and positions by edge set hash, least recently used first
+_INTERNED_GRAPHS: "OrderedDict[str, Tuple[List[Tuple[int, int]], Dict[int, Tuple[float, float]]]]" = OrderedDict()
+
+
+def default_cache_dir() -> str:
+    """Return the cache directory from the FOREST_CACHE_DIR environment variable, or ~/.cache/forest_fire"""
+
+    return os.environ.get("FOREST_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "forest_fire"))
+
+
+class GraphCache:
+    """Each instance of this class manages a directory of cached graphs, stored as compact binary arrays"""
+    def __init__(self,
+                 directory: Optional[str] = None,
+                 max_bytes: Optional[int] = DEFAULT_MAX_BYTES) -> None:
+        """
+        Parameters
+        ----------
+        directory: Optional[str], default = None
+            Directory holding the cache entries. If None, default_cache_dir()/graphs is used
+        max_bytes: Optional[int], default = 2 GiB
+            Total size of the entries above which the least recently used entries are evicted
+        """
+        self._directory = directory or os.path.join(default_cache_dir(), "graphs")
+        self._max_bytes = max_bytes
+        os.makedirs(self._directory, exist_ok=True)
+
+    @staticmethod
+    def key(generator: str, params: Dict, seed: Optional[int]) -> str:
+        """Return the content address of a generated graph
+
+        Parameters
+        ----------
+        generator: str
+            Name of the generator, eg. 'voronoi'
+        params: Dict
+            Parameters passed to the generator (must be JSON serializable)
+        seed: Optional[int]
+            Seed of the random generator
+        """
+        description = json.dumps({"version": CACHE_VERSION, "generator": generator, "params": params, "seed": seed},
+                                 sort_keys=True)
+        return hashlib.sha256(description.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, np.ndarray]]:
+        """Return the arrays stored under key, memory mapped read-only, or None if key is not cached
+
+        Parameters
+        ----------
+        key: str
+            Content address from GraphCache.key
+        """
+        entry = os.path.join(self._directory, key)
+        try:
+            arrays = {name[:-4]: np.load(os.path.join(entry, name), mmap_mode="r")
+                      for name in os.listdir(entry) if name.endswith(".npy")}
+            # Mark entry as recently used for eviction
+            os.utime(entry)
+        except (FileNotFoundError, NotADirectoryError):
+            # Not cached, or evicted by another process while reading
+            return None
+
+        return arrays
+
+    def put(self, key: str, arrays: Dict[str, np.ndarray]) -> None:
+        """Stores arrays under key, then evicts old entries if the cache is over its size limit
+
+        Parameters
+        ----------
+        key: str
+            Content address from GraphCache.key
+        arrays: Dict[str, np.ndarray]
+            Arrays to store, by name
+        """
+        entry = os.path.join(self._directory, key)
+        temporary = os.path.join(self._directory, f".tmp-{os.getpid()}-{uuid.uuid4().hex}")
+
+        os.makedirs(temporary)
+        for name, array in arrays.items():
+            np.save(os.path.join(temporary, name + ".npy"), np.ascontiguousarray(array))
+
+        # Publish atomically. If another process stored the same key first, its entry is identical
+        try:
+            os.rename(temporary, entry)
+        except OSError:
+            shutil.rmtree(temporary, ignore_errors=True)
+
+        self.evict()
+
+    def get_or_create(self,
+                      generator: str,
+                      params: Dict,
+                      seed: Optional[int],
+                      create: Callable[[], Dict[str, np.ndarray]]) -> Dict[str, np.ndarray]:
+        """Return the cached arrays of a generated graph, calling create and storing its result on a miss
+
+        Parameters
+        ----------
+        generator: str
+            Name of the generator
+        params: Dict
+            Parameters passed to the generator
+        seed: Optional[int]
+            Seed of the random generator. If None, the graph is not reproducible and is not cached
+        create: Callable[[], Dict[str, np.ndarray]]
+            Function generating the graph's arrays
+        """
+        if seed is None:
+            return create()
+
+        key = self.key(generator, params, seed)
+        arrays = self.get(key)
+        if arrays is None:
+            created = create()
+            self.put(key, created)
+            arrays = self.get(key)
+            # The entry may already be evicted if it alone exceeds the size limit
+            if arrays is None:
+                arrays = created
+
+        return arrays
+
+    def entries(self) -> List[Tuple[str, int, float]]:
+        """Return (key, size in bytes, last use time) of each entry, least recently used first"""
+
+        entries = []
+        for key in os.listdir(self._directory):
+            entry = os.path.join(self._directory, key)
+            if key.startswith(".") or not os.path.isdir(entry):
+                continue
+            try:
+                size = sum(file.stat().st_size for file in os.scandir(entry))
+                entries.append((key, size, os.stat(entry).st_mtime))
+            except FileNotFoundError:
+                continue
+
+        return sorted(entries, key=lambda item: item[2])
+
+    def total_bytes(self) -> int:
+        """Return the total size of the cache entries in bytes"""
+
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self) -> None:
+        """Removes least recently used entries until the cache fits in its size limit"""
+
+        with _DirectoryLock(os.path.join(self._directory, ".lock")):
+            entries = self.entries()
+            total = sum(size for _, size, _ in entries)
+            for key, size, _ in entries:
+                if total <= self._max_bytes:
+                    break
+                # Renaming first hides the entry from readers before its files are removed
+                trash = os.path.join(self._directory, f".trash-{uuid.uuid4().hex}")
+                try:
+                    os.rename(os.path.join(self._directory, key), trash)
+                except OSError:
+                    continue
+                shutil.rmtree(trash, ignore_errors=True)
+                total -= size
+
+
+class VerdictCache:
+    """Each instance of this class stores yes/no verdicts (eg. 'is planar') of files, keyed by their content hash"""
+    def __init__(self,
+                 name: str,
+                 directory: Optional[str] = None) -> None:
+        """
+        Parameters
+        ----------
+        name: str
+            Name of the verdict, eg. 'planarity'. Verdicts are stored in their own directory per name
+        directory: Optional[str], default = None
+            Directory holding the verdict directories. If None, default_cache_dir() is used
+        """
+        self._directory = os.path.join(directory or default_cache_dir(), name)
+        os.makedirs(self._directory, exist_ok=True)
+
+    def get(self, key: str) -> Optional[bool]:
+        """Return the verdict stored under key, or None if there is none
+
+        Parameters
+        ----------
+        key: str
+            Content hash from content_hash
+        """
+        try:
+            with open(os.path.join(self._directory, key)) as file:
+                return file.read() == "1"
+        except FileNotFoundError:
+            return None
+
+    def put(self, key: str, verdict: bool) -> None:
+        """Stores verdict under key
+
+        Parameters
+        ----------
+        key: str
+            Content hash from content_hash
+        verdict: bool
+            The verdict to store
+        """
+        temporary = os.path.join(self._directory, f".tmp-{os.getpid()}-{uuid.uuid4().hex}")
+        with open(temporary, "w") as file:
+            file.write("1" if verdict else "0")
+        os.replace(temporary, os.path.join(self._directory, key))
+
+
+def content_hash(path: str, block_size: Optional[int] = 1024 * 1024) -> str:
+    """Return the sha256 hash of the content of a file, read in blocks
+
+    Parameters
+    ----------
+    path: str
+        Path of the file
+    block_size: Optional[int], default = 1 MiB
+        Number of bytes read at a time
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(block_size), b""):
+            digest.update(block)
+
+    return digest.hexdigest()
+
+
+def edge_set_hash(edges: np.ndarray) -> str:
+    """Return the sha256 hash of a set of undirected edges. Edge order, edge direction, repeated edges
+    and self loops do not change the hash.
+
+    Parameters
+    ----------
+    edges: np.ndarray
+        (E,2) array (or list of tuples) of edges, or a CSRGraph
+    """
+    if hasattr(edges, "edge_array"):
+        # CSRGraph, hashed by original vertex ids so relabelling does not change the hash
+        edges = edges.ids()[edges.edge_array()]
+    edges = np.sort(np.asarray(edges, dtype=np.int64).reshape(-1, 2), axis=1)
+    edges = edges[edges[:, 0] != edges[:, 1]]
+
+    # Sorting by (smaller, larger) vertex makes the hash independent of edge order
+    edges = edges[np.lexsort((edges[:, 1], edges[:, 0]))]
+    if len(edges):
+        edges = edges[np.concatenate(([True], np.any(edges[1:] != edges[:-1], axis=1)))]
+
+    return hashlib.sha256(edges.astype("<i8").tobytes()).hexdigest()
+
+
+def intern_graph(edges: List[Tuple[int, int]],
+                 pos_nodes: Optional[Dict[int, Tuple[float, float]]] = None,
+                 key: Optional[str] = None) -> str:
+    """Keep one copy of a graph per edge set and return its key, the edge set hash of edges.
+    If the edge set was interned before, the stored copy is kept and edges can be released by the caller.
+    Once more than MAX_INTERNED_GRAPHS graphs are interned, the least recently used graph is released.
+
+    Parameters
+    ----------
+    edges: List[(int,int)]
+        List containing the edges (Tuples of 2 vertices) of the graph
+    pos_nodes: Optional[Dict[int,(float,float)]], default = None
+        Position of each vertex. Stored if the graph was interned without positions
+    key: Optional[str], default = None
+        edge_set_hash(edges), if already known, so edges are not hashed again
+    """
+    key = key or edge_set_hash(edges)
+    interned = _INTERNED_GRAPHS.get(key)
+    if interned is None or (pos_nodes and not interned[1]):
+        _INTERNED_GRAPHS[key] = (interned[0] if interned else edges, pos_nodes or {})
+    _INTERNED_GRAPHS.move_to_end(key)
+
+    while len(_INTERNED_GRAPHS) > MAX_INTERNED_GRAPHS:
+        _INTERNED_GRAPHS.popitem(last=False)
+
+    return key
+
+
+def interned_graph(key: str) -> Tuple[List[Tuple[int, int]], Dict[int, Tuple[float, float]]]:
+    """Return the edges and vertex positions (empty if unknown) of an interned graph
+
+    Parameters
+    ----------
+    key: str
+        Key from intern_graph
+    """
+    try:
+        _INTERNED_GRAPHS.move_to_end(key)
+    except KeyError:
+        raise Exception(f"cache, no interned graph with key {key}") from None
+
+    return _INTERNED_GRAPHS[key]
+
+
+def is_interned(key: str) -> bool:
+    """Return true if a graph with key (see intern_graph) is interned"""
+
+    return key in _INTERNED_GRAPHS
+
+
+def cached_voronoi_to_edges(minpoints: int,
+                            seed: Optional[int],
+                            cache: Optional[GraphCache] = None) -> Tuple[List[Tuple[int, int]], Dict[int, Tuple[float, float]]]:
+    """Return the edges and positions of graph_helper.voronoi_to_edges(minpoints, seed=seed), from cache if stored.
+    The cached arrays are converted to the list and dictionary voronoi_to_edges returns, so the result is not
+    memory mapped. Use cached_generate('voronoi', seed, minpoints=minpoints) to keep the arrays memory mapped.
+
+    Parameters
+    ----------
+    minpoints: int
+        Minimal number of points requested for the graph
+    seed: Optional[int]
+        Seed for the random points, 0 or more. If None, a new graph is generated and not cached
+    cache: Optional[GraphCache], default = None
+        Cache to use. If None, a cache in the default directory is used
+    """
+    import graph_helper as gh
+
+    _check_seed(seed)
+    cache = cache or GraphCache()
+
+    def create() -> Dict[str, np.ndarray]:
+        edges, coords = gh.voronoi_arrays(minpoints, seed=seed)
+        return {"edges": edges.astype(np.int32), "coords": coords}
+
+    arrays = cache.get_or_create("voronoi_to_edges", {"minpoints": minpoints}, seed, create)
+    edges, coords = arrays["edges"], arrays["coords"]
+
+    return list(zip(edges[:, 0].tolist(), edges[:, 1].tolist())), dict(enumerate(map(tuple, coords.tolist())))
+
+
+def cached_generate(generator: str,
+                    seed: Optional[int] = None,
+                    cache: Optional[GraphCache] = None,
+                    **params) -> "CSRGraph":
+    """Return the CSRGraph made by one of generator_helper.GENERATORS, from cache if stored
+
+    Parameters
+    ----------
+    generator: str
+        Name of the generator in generator_helper.GENERATORS, eg. 'square' or 'delaunay'
+    seed: Optional[int], default = None
+        Seed passed to random generators, 0 or more. Lattices are deterministic and are always cached
+    cache: Optional[GraphCache], default = None
+        Cache to use. If None, a cache in the default directory is used
+    params:
+        Parameters passed to the generator, eg. rows=1000
+    """
+    from csr_helper import CSRGraph, CSR_FILES
+    from generator_helper import GENERATORS
+
+    cache = cache or GraphCache()
+    function = GENERATORS[generator]
+    random_generator = generator in ("delaunay", "voronoi")
+    if random_generator:
+        _check_seed(seed)
+        params_seed = dict(params, seed=seed)
+    else:
+        params_seed, seed = params, 0
+
+    def create() -> Dict[str, np.ndarray]:
+        graph = function(**params_seed)
+        return {name: getattr(graph, name) for name in CSR_FILES if getattr(graph, name) is not None}
+
+    arrays = cache.get_or_create(generator, params, seed, create)
+
+    return CSRGraph(**{name: arrays.get(name) for name in CSR_FILES})
+
+
+def _check_seed(seed: Optional[int]) -> None:
+    """Raise an exception if seed can not seed a random generator. numpy only accepts integers of 0 or more"""
+
+    if seed is not None and seed < 0:
+        raise Exception(f"cache, the seed of a graph must be 0 or more, not {seed}")
+
+
+class _DirectoryLock:
+    """Context manager holding an exclusive lock on a file, shared between processes where supported"""
+    def __init__(self, path: str) -> None:
+        self._path = path
+        self._file = None
+
+    def __enter__(self) -> "_DirectoryLock":
+        self._file = open(self._path, "a")
+        if fcntl is not None:
+            fcntl.flock(self._file, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if fcntl is not None:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+        self._file.close()
@@ -3,6 +3,7 @@ This module holds various classes essential for simulating the evolution of wild
 
 This module provides:
 - Graphdata:    a special python dataclass for storing data associated with the landpatches on a graph.
+- UpdateClock:  a class that counts the steps and tree updates of a simulation, so tree patches can regrow lazily
 - Landpatch:    a base class that creates patches of land as vertices on a graph
 - Treepatch:    a subclass of landpatch, that specifies patches of land with trees on them. Tree patches have special attributes
 - Rockpatch:    a subclass of landpatch, that specifies patches of land with rock on them. Rock patches can mutate into tree patches
@@ -21,10 +22,13 @@ This module is created as material for the phase 2 project for DM857, DS830 (202
 from dataclasses import dataclass, field
 from typing import List, Optional, Dict, Tuple, Type
 from input_helper import get_valid_string_input
-import matplotlib.pyplot as plt
+import math
 import random
 import time
 
+# Per step series of a simulation, the lists of patch counts of Graphdata without the leading underscore
+SERIES = ("tree_patches", "rock_patches", "ignited_tree_patches")
+
 
 @dataclass
 class Graphdata:
@@ -69,11 +73,6 @@ class Graphdata:
             whether a vertex is a treepatch (ignited or not) or a rockpatch.
         """
 
-        # Store variables for updating patches of instance
-        treepatches = self._tree_patches
-        rockpatches = self._rock_patches
-        forest_fires = self._ignited_tree_patches
-
         # Initialize counters
         treepatches_counter = 0
         rockpatches_counter = 0
@@ -91,9 +90,23 @@ class Graphdata:
                     forest_fires_counter += 1
         
         # Append patch count to instance data
-        treepatches.append(treepatches_counter) 
-        rockpatches.append(rockpatches_counter)
-        forest_fires.append(forest_fires_counter) 
+        self.append_patch_counts(treepatches_counter, rockpatches_counter, forest_fires_counter)
+
+    def append_patch_counts(self, tree_patches: int, rock_patches: int, ignited_tree_patches: int) -> None:
+        """Appends the number of tree patches, rock patches and forest fires of one step, counted by the caller
+
+        Parameters
+        ----------
+        tree_patches: int
+            Number of tree patches, ignited or not
+        rock_patches: int
+            Number of rock patches
+        ignited_tree_patches: int
+            Number of ignited tree patches
+        """
+        self._tree_patches.append(tree_patches)
+        self._rock_patches.append(rock_patches)
+        self._ignited_tree_patches.append(ignited_tree_patches)
 
     def update_rock_to_tree_counter(self) -> None:
         """Updates number of rock patches that swapped to a tree patch"""
@@ -123,6 +136,8 @@ class Graphdata:
         steps: int
             Number of simulation steps
         """
+        # Imported here, so the simulation classes can be used without loading matplotlib
+        import matplotlib.pyplot as plt
 
         # Retrieve data for visualisation
         tree_patches = self._tree_patches
@@ -155,13 +170,66 @@ class Graphdata:
         plt.close()
 
     
+class UpdateClock:
+    """Each instance of this class counts the tree updates of one simulation. Tree patches sharing the clock only store
+    their health when it changes other than by regrowth, and compute the regrown health when it is read. They draw the
+    update they autocombust at ahead, instead of drawing in every update, and rock patches draw the step they turn
+    into a tree at ahead."""
+    def __init__(self) -> None:
+        # Completed steps, and the position in the patch map of the patch being evolved: the patches before it have
+        # been updated this step
+        self.step = 0
+        self.position = 0
+
+    def steps(self, position: int) -> int:
+        """Return the number of steps a patch at position of the patch map has been evolved in
+
+        Parameters
+        ----------
+        position: int
+            Position of the patch in the patch map
+        """
+        return self.step + (1 if position < self.position else 0)
+
+    def updates(self, position: int) -> int:
+        """Return the number of updates of a tree patch at position of the patch map, two per step
+
+        Parameters
+        ----------
+        position: int
+            Position of the patch in the patch map
+        """
+        return 2 * self.steps(position)
+
+    def last_update_of_step(self) -> int:
+        """Return the number of updates of a tree patch once it has been updated in the current step"""
+
+        return 2 * self.step + 2
+
+    @staticmethod
+    def step_of_update(update: float) -> float:
+        """Return the step a tree update is made in, updates 1 and 2 are made in step 0. Infinite for an update that
+        never comes
+
+        Parameters
+        ----------
+        update: float
+            Number of the update, 1 or more
+        """
+        if update == math.inf:
+            return math.inf
+        return (update - 1) // 2
+
+
 class Landpatch():
     """This is the base class for representing patches of land as vertices on a graph. 
     Landpatches in the graph are either of type Tree or type rock."""
     def __init__(
         self,
         id: [int] = None,
-        neighbour_ids: [List[int]] = None) -> None:
+        neighbour_ids: [List[int]] = None,
+        clock: Optional[UpdateClock] = None,
+        position: Optional[int] = None) -> None:
         """
         Parameter
         ---------
@@ -169,10 +237,17 @@ class Landpatch():
             Represents a unique identifier for each unique instance of the class
         neighbour_ids: [List[int]] = None
             List of ids from neighbouring vertices. Necessary to properly identify neighbours of each instance
+        clock: Optional[UpdateClock], default = None
+            Update clock of the simulation. If provided, a tree patch regrows lazily and draws when it autocombusts
+            ahead
+        position: Optional[int], default = None
+            Position of the patch in the patch map of the simulation, needed with a clock
         """
         # Assign id and neighbour parameters to corresponding attributes
         self._id = id
         self._neighbour_ids = neighbour_ids
+        self._clock = clock
+        self._position = position
 
         self._firefighters_list = None
 
@@ -189,8 +264,10 @@ class Rockpatch(Landpatch):
     def __init__(self, 
                  id: int, 
                  neighbour_ids: List[int]=None, 
-                 mutate_chance: Optional[int]=1)->None:
-        super().__init__(id, neighbour_ids=neighbour_ids)
+                 mutate_chance: Optional[int]=1,
+                 clock: Optional[UpdateClock] = None,
+                 position: Optional[int] = None)->None:
+        super().__init__(id, neighbour_ids=neighbour_ids, clock=clock, position=position)
         self._mutate_chance = mutate_chance
         """
         Parameters    
@@ -201,7 +278,30 @@ class Rockpatch(Landpatch):
             List of ids from neighbouring vertices. Necessary to properly identify neighbours of each instance
         mutate_chance: float, default = 1
             Percentage chance for a rockpatch to mutate into treepatch
+        clock, position:
+            As the parameters of Landpatch. With a clock, the step the rock patch turns into a tree at is drawn ahead
+        """
+        if self._clock is not None:
+            self._schedule_mutation(self._clock.steps(self._position))
+
+    def _schedule_mutation(self, steps: int) -> None:
+        """Draws the first step from a number of steps at which the rock turns into a tree. The rock turns into a
+        tree in each step with probability (mutate_chance + 1) / 101, as in mutates_this_step without a clock, so the
+        number of steps until it does is geometric and one draw replaces a draw per step
+
+        Parameters
+        ----------
+        steps: int
+            Number of steps counted by the clock from which the rock waits
         """
+        self._mutates_at = steps + _geometric_wait((self._mutate_chance + 1) / 101)
+
+    def mutates_this_step(self) -> bool:
+        """Return true if the rock patch turns into a tree in the current step"""
+
+        if self._clock is not None:
+            return self._mutates_at <= self._clock.step
+        return random.randint(0, 100) <= self._mutate_chance
 
     def mutate(self, autocombustion_prob:float, tree_health: Optional[int]=256) -> Landpatch:
         """Swaps the land patch instance associated with vertex. """
@@ -209,7 +309,8 @@ class Rockpatch(Landpatch):
         #return Treepatch(id=self._id, neighbour_ids = self._neighbour_ids, self_combustion_prob=autocombustion_prob)
 
         return Treepatch(id=self._id, neighbour_ids = self._neighbour_ids, 
-                         autocombustion_prob=autocombustion_prob, tree_health=tree_health)
+                         autocombustion_prob=autocombustion_prob, tree_health=tree_health,
+                         clock=self._clock, position=self._position)
 
 
 class Treepatch(Landpatch):
@@ -218,9 +319,11 @@ class Treepatch(Landpatch):
                  id: int, 
                  neighbour_ids: list[int] = None, 
                  autocombustion_prob: Optional[int] = 1, 
-                 tree_health: Optional[int] = 256)->None:
+                 tree_health: Optional[int] = 256,
+                 clock: Optional[UpdateClock] = None,
+                 position: Optional[int] = None)->None:
         super().__init__(id, 
-                         neighbour_ids = neighbour_ids)
+                         neighbour_ids = neighbour_ids, clock=clock, position=position)
         """
         Parameters
         ----------
@@ -234,11 +337,80 @@ class Treepatch(Landpatch):
             Represents the probability for each instance of tree patch to self-ignite
         tree_health: Optional[int], default = 256
             Attribute identifies the current health of the treepatch [0-256].
+        clock, position:
+            As the parameters of Landpatch. With a clock, the health of a tree that is not ignited is stored with
+            the update it was last changed at, and regrown when read, and the update it autocombusts at is drawn
+            ahead
         """
         self._autocombustion_prob = autocombustion_prob
+        self._ignited = False
         self._tree_health = tree_health
+        if self._clock is not None:
+            self._schedule_autocombustion(self._touched)
+
+    @property
+    def _tree_health(self) -> int:
+        """Current health of the tree patch"""
+        if self._clock is None or self._ignited:
+            return self._health
+        return self._regrown(self._clock.updates(self._position))
+
+    @_tree_health.setter
+    def _tree_health(self, tree_health: int) -> None:
+        self._health = tree_health
+        self._touched = 0 if self._clock is None else self._clock.updates(self._position)
+
+    def ignite(self, touched: Optional[int] = None) -> None:
+        """Ignites the tree patch, keeping its regrown health
+
+        Parameters
+        ----------
+        touched: Optional[int], default = None
+            Number of updates of a lazily regrowing tree at ignition, if not the number counted by its clock
+        """
+        if self._clock is not None and not self._ignited:
+            if touched is None:
+                touched = self._clock.updates(self._position)
+            self._health = self._regrown(touched)
+            self._touched = touched
+        self._ignited = True
+
+    def extinguish(self) -> None:
+        """Puts out the fire of the tree patch. A lazily regrowing tree regrows from its burned health at the current
+        update, and draws the update it autocombusts at again, as the one drawn before it ignited may have passed"""
+        if self._clock is not None and self._ignited:
+            self._ignited = False
+            # The health of a burning tree is current, it is stored with the update it is put out at
+            self._tree_health = self._health
+            self._schedule_autocombustion(self._touched)
         self._ignited = False
 
+    def quiet_until_next_step(self) -> bool:
+        """Return true if updating a lazily regrowing tree in the current step would only regrow its health, which
+        is done when it is read: it is not burning, not below zero health, and does not autocombust this step"""
+
+        return (self._clock is not None and not self._ignited and self._health >= 0
+                and self._combusts_at > self._clock.last_update_of_step())
+
+    def _regrown(self, updates: int) -> int:
+        """Return the health of a tree that is not ignited after a number of updates, 10 more per update since its
+        health was stored, up to 256"""
+        if updates == self._touched:
+            return self._health
+        return min(self._health + 10 * (updates - self._touched), 256)
+
+    def _schedule_autocombustion(self, updates: int) -> None:
+        """Draws the first update after a number of updates at which the tree autocombusts. The tree autocombusts
+        in each update with probability (autocombustion_prob + 1) / 101, as in check_autocombust, so the number of
+        updates until it does is geometric and one draw replaces a draw per update
+
+        Parameters
+        ----------
+        updates: int
+            Number of updates counted by the clock from which the tree waits
+        """
+        self._combusts_at = updates + 1 + _geometric_wait((self._autocombustion_prob + 1) / 101)
+
     def check_autocombust(self) -> None:
         """Checks and updates wether instance of tree patch spontaniously catches fire."""
 
@@ -247,23 +419,59 @@ class Treepatch(Landpatch):
         if random.randint(0,100) <= autocombustion_prob:
             self._ignited = True
 
-    def updateland(self) -> None:
-        """Update treestats based on the specified conditions."""
+    def updateland(self, update: Optional[int] = 1) -> None:
+        """Update treestats based on the specified conditions.
+
+        Parameters
+        ----------
+        update: Optional[int], default = 1
+            Which of the two updates of a step this is, 1 or 2. A lazily regrowing tree only ignites if this is
+            the update it autocombusts at, its health is regrown when read
+        """
         if self._ignited:
-            self._tree_health -= 20
+            # An ignited tree is updated eagerly, so its health is current when it is extinguished
+            self._health -= 20
+            self._touched += 1
+        elif self._clock is not None:
+            touched = self._clock.updates(self._position) + update
+
+            # A tree put out below zero health regrows eagerly, so the stored health is current while it is below zero
+            if self._health < 0:
+                self._health = self._regrown(touched)
+                self._touched = touched
+
+            # Autocombust, the regrowth up to this update is kept
+            if self._combusts_at == touched:
+                self.ignite(touched)
         else:
-            self._tree_health += 10
+            self._health += 10
 
             # Check health doesn't exceed 256
-            if self._tree_health > 256:
-                self._tree_health = 256
+            if self._health > 256:
+                self._health = 256
 
             # Check for autocombustion
             self.check_autocombust()
 
     def mutate(self) -> Landpatch:
         """Swaps the land patch instance associated with vertex. """
-        return Rockpatch(id=self._id, neighbour_ids=self._neighbour_ids)
+        return Rockpatch(id=self._id, neighbour_ids=self._neighbour_ids, clock=self._clock, position=self._position)
+
+
+def _geometric_wait(chance: float) -> float:
+    """Return a random number of failed tries before the first success, when each try succeeds with chance.
+    Infinite if chance is 0 or less
+
+    Parameters
+    ----------
+    chance: float
+        Probability that a try succeeds
+    """
+    if chance <= 0:
+        return math.inf
+    if chance >= 1:
+        return 0
+    return int(math.log(1.0 - random.random()) / math.log1p(-chance))
 
 
 class Firefighter:
@@ -295,7 +503,7 @@ class Firefighter:
 
         extinguish_probability = self._firefighter_skill/100
         if random.random() <= extinguish_probability:
-            treepatch._ignited = False
+            treepatch.extinguish()
         else:
             self.check_death()
 
@@ -327,11 +535,14 @@ class Firefighter:
 @dataclass(frozen=True)
 class ConfigData():
     """This is a dataclass where each instance represents a collection of data from a privious simulation configuration.
+    The graph is interned once per edge set (see cache_helper.intern_graph), so configurations on the same graph share
+    one copy of its edges and positions. Configurations are compared and hashed by the key of their graph and their
+    parameters, eg. as cache keys.
 
     Parameters
     ----------
     edges: List[(int,int)]
-        List containing the edges (Tuples of 2 vertices) forming the 2D surface for the graph.
+        List containing the edges (Tuples of 2 vertices) forming the 2D surface for the graph, or a CSRGraph.
     pos_nodes: Optional[dict], default = {}
         Optional argument. Stores graph position of nodes if provided.
     firefighters: int
@@ -346,16 +557,29 @@ class ConfigData():
         Probability for a rock patch to randomly mutate into a tree patch
     sim_time: int
         The number of simulation steps for the purpose of simulating wildfire evolution.
+    graph: Optional[str], default = None
+        Key of the graph, the edge set hash of its edges (see cache_helper.edge_set_hash). Computed if None
     """
 
-    edges: List[tuple[int,int]]
-    pos_nodes: Optional[dict] = field(default_factory=dict)
+    edges: List[tuple[int,int]] = field(compare=False, repr=False)
+    pos_nodes: Optional[dict] = field(default_factory=dict, compare=False, repr=False)
     tree_distribution: float = 30
     firefighters: int = 3
     autocombustion: Optional[int] = 1
     fire_spread_prob: Optional[int] = 80
     rock_mutate_prob: Optional[int] = 1
     sim_time: Optional[int] = 10
+    graph: Optional[str] = None
+
+    def __post_init__(self) -> None:
+        import cache_helper as cache
+        key = cache.intern_graph(self.edges, self.pos_nodes, key=self.graph)
+        edges, pos_nodes = cache.interned_graph(key)
+
+        # Keep the shared copy of the graph, the configuration is frozen once created
+        object.__setattr__(self, "graph", key)
+        object.__setattr__(self, "edges", edges)
+        object.__setattr__(self, "pos_nodes", pos_nodes)
 
     def get_config(self) -> Tuple:
         """Return a tuple of all attributes. Used to easily access attributes from previous configurations
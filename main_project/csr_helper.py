@@ -0,0 +1,209 @@
+"""
+This module provides CSRGraph, a compact array representation of an undirected graph, and helper functions, to:
+- csr_from_edges:   build a CSRGraph from an array (or list) of edges
+- load_csr:         open a CSRGraph saved to disk, optionally memory mapped
+
+A CSRGraph stores the neighbours of vertex v in indices[indptr[v]:indptr[v+1]] (compressed sparse row layout).
+Vertices are numbered 0..V-1. If the graph was built from edges with arbitrary vertex ids, vertex_ids maps each
+compact vertex number back to its original id.
+
+Requirements
+------------
+Package numpy https://numpy.org/ which can be installed via PIP.
+Python 3.7 or higher.
+
+Notes
+-----
+This module is created as material for the phase 2 project for DM857, DS830 (2023).
+"""
+import os
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+import numpy as np
+
+# Names of the .npy files holding each array of a CSRGraph saved to disk
+CSR_FILES = ("indptr", "indices", "coords", "vertex_ids")
+
+
+@dataclass
+class CSRGraph:
+    """Each instance of this class stores an undirected graph as compressed sparse row arrays.
+
+    Parameters
+    ----------
+    indptr: np.ndarray
+        (V+1) int64 array. The neighbours of vertex v are indices[indptr[v]:indptr[v+1]]
+    indices: np.ndarray
+        (2E) int32/int64 array of neighbour vertex numbers, each undirected edge is stored in both directions
+    coords: Optional[np.ndarray], default = None
+        (V,2) float array with the position of each vertex, if known
+    vertex_ids: Optional[np.ndarray], default = None
+        (V) int array mapping vertex numbers to the original vertex ids, if the graph was relabelled
+    """
+    indptr: np.ndarray
+    indices: np.ndarray
+    coords: Optional[np.ndarray] = None
+    vertex_ids: Optional[np.ndarray] = None
+
+    def num_vertices(self) -> int:
+        """Return the number of vertices in the graph"""
+
+        return len(self.indptr) - 1
+
+    def num_edges(self) -> int:
+        """Return the number of undirected edges in the graph"""
+
+        return len(self.indices) // 2
+
+    def degrees(self) -> np.ndarray:
+        """Return an array with the number of neighbours of each vertex"""
+
+        return np.diff(self.indptr)
+
+    def ids(self) -> np.ndarray:
+        """Return the (original) id of each vertex"""
+
+        if self.vertex_ids is None:
+            return np.arange(self.num_vertices())
+        return np.asarray(self.vertex_ids)
+
+    def edge_array(self) -> np.ndarray:
+        """Return a (E,2) array with each undirected edge once, as (smaller, larger) vertex numbers"""
+
+        sources = np.repeat(np.arange(self.num_vertices(), dtype=self.indices.dtype), self.degrees())
+        keep = sources < self.indices
+        return np.column_stack((sources[keep], self.indices[keep]))
+
+    def iter_edges(self) -> Iterator[Tuple[int, int]]:
+        """Yield each undirected edge once as a tuple of (original) vertex ids"""
+
+        ids = self.ids()
+        for start in range(0, self.num_vertices(), 65536):
+            stop = min(start + 65536, self.num_vertices())
+            # Process vertices in chunks so no edge list of the whole graph is built
+            chunk = CSRGraph(self.indptr[start:stop + 1] - self.indptr[start],
+                             self.indices[self.indptr[start]:self.indptr[stop]])
+            sources = np.repeat(np.arange(start, stop), chunk.degrees())
+            keep = sources < chunk.indices
+            yield from zip(ids[sources[keep]].tolist(), ids[chunk.indices[keep]].tolist())
+
+    def neighbour_lists(self) -> Dict[int, List[int]]:
+        """Return a dictionary of (original) vertex id as key and list of neighbour ids as value.
+        Vertices without neighbours are left out, like vertices that do not appear in a list of edges."""
+
+        ids = self.ids()
+        flat = ids[np.asarray(self.indices)].tolist()
+        indptr = self.indptr.tolist()
+        vertex_ids = ids.tolist()
+
+        return {vertex_ids[v]: flat[indptr[v]:indptr[v + 1]]
+                for v in range(self.num_vertices()) if indptr[v + 1] > indptr[v]}
+
+    def positions(self) -> Dict[int, Tuple[float, float]]:
+        """Return a dictionary of (original) vertex id as key and (x, y) position as value, empty if unknown"""
+
+        if self.coords is None:
+            return {}
+        return dict(zip(self.ids().tolist(), map(tuple, np.asarray(self.coords).tolist())))
+
+    def save(self, directory: str) -> None:
+        """Saves the arrays of the graph as .npy files in directory
+
+        Parameters
+        ----------
+        directory: str
+            Path of the directory to store the graph in. It is created if it does not exist.
+        """
+        os.makedirs(directory, exist_ok=True)
+        for name in CSR_FILES:
+            array = getattr(self, name)
+            path = os.path.join(directory, name + ".npy")
+            if array is None:
+                # Remove arrays left behind by a previous graph in the same directory
+                if os.path.exists(path):
+                    os.remove(path)
+            elif not _is_memmap_of(array, path):
+                np.save(path, np.asarray(array))
+
+
+def csr_from_edges(edges: Union[np.ndarray, List[Tuple[int, int]]],
+                   num_vertices: Optional[int] = None,
+                   coords: Optional[np.ndarray] = None,
+                   relabel: Optional[bool] = False,
+                   first_seen: Optional[bool] = False) -> CSRGraph:
+    """Return a CSRGraph built from a collection of edges. Self loops and duplicate edges are dropped.
+
+    Parameters
+    ----------
+    edges: Union[np.ndarray, List[(int,int)]]
+        (E,2) array or list of tuples with the edges of the graph
+    num_vertices: Optional[int], default = None
+        Number of vertices. If None, it is one more than the largest vertex number
+    coords: Optional[np.ndarray], default = None
+        (V,2) array with the position of each vertex
+    relabel: Optional[bool], default = False
+        If True, arbitrary vertex ids are compacted to 0..V-1 and kept in vertex_ids
+    first_seen: Optional[bool], default = False
+        If True, relabelled vertices are numbered in the order they first appear in edges, the order of the patches
+        of sim_forest.ForestFireGraph, instead of by id
+    """
+    edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+
+    vertex_ids = None
+    if relabel:
+        vertex_ids, first, edges = np.unique(edges, return_index=True, return_inverse=True)
+        edges = edges.reshape(-1, 2)
+        if first_seen:
+            order = np.argsort(first, kind="stable")
+            vertex_ids = vertex_ids[order]
+            numbers = np.empty(len(order), dtype=np.int64)
+            numbers[order] = np.arange(len(order))
+            edges = numbers[edges]
+        num_vertices = len(vertex_ids)
+    elif num_vertices is None:
+        num_vertices = int(edges.max()) + 1 if len(edges) else 0
+
+    # Store both directions of every edge, without self loops
+    edges = edges[edges[:, 0] != edges[:, 1]]
+    sources = np.concatenate((edges[:, 0], edges[:, 1]))
+    targets = np.concatenate((edges[:, 1], edges[:, 0]))
+
+    # Sorting on a combined key groups neighbours by vertex and exposes duplicates
+    keys = np.unique(sources * num_vertices + targets)
+    sources, targets = np.divmod(keys, num_vertices)
+
+    indptr = np.zeros(num_vertices + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=num_vertices), out=indptr[1:])
+
+    return CSRGraph(indptr, targets.astype(index_dtype(num_vertices)), coords, vertex_ids)
+
+
+def load_csr(directory: str, mmap: Optional[bool] = True) -> CSRGraph:
+    """Return the CSRGraph saved in directory
+
+    Parameters
+    ----------
+    directory: str
+        Path of the directory the graph was saved in
+    mmap: Optional[bool], default = True
+        If True, the arrays are memory mapped read-only instead of read into memory
+    """
+    arrays = {}
+    for name in CSR_FILES:
+        path = os.path.join(directory, name + ".npy")
+        arrays[name] = np.load(path, mmap_mode="r" if mmap else None) if os.path.exists(path) else None
+
+    return CSRGraph(**arrays)
+
+
+def index_dtype(num_vertices: int) -> np.dtype:
+    """Return the smallest integer dtype that can number num_vertices vertices"""
+
+    return np.dtype(np.int32) if num_vertices < 2 ** 31 else np.dtype(np.int64)
+
+
+def _is_memmap_of(array: np.ndarray, path: str) -> bool:
+    """Return true if array is already memory mapped from path"""
+
+    filename = getattr(array, "filename", None)
+    return filename is not None and os.path.abspath(filename) == os.path.abspath(path)
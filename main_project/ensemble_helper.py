@@ -0,0 +1,797 @@
+"""
+This module provides ReplicaEngine, a class that simulates many replicas (independent runs) of one configuration
+together as (replicas, vertices) arrays, PackedReplicaEngine, the same simulation with the tree, burning and burnt
+flags of 64 replicas packed in the bits of one uint64 word per vertex, and helper functions, to:
+- randint_probability:  return the probability of random.randint(0, 100) <= percent, as drawn by the object engine
+- simulate_config:      return the series of replicas of a ConfigData
+- run_replicas:         return the series of replicas of a batch run (an engine of batch_forest.ENGINES)
+- run_packed:           return the series of replicas of a batch run simulated with PackedReplicaEngine
+- encode_patches:       return the health and state code arrays of the patches of a sim_forest.ForestFireGraph
+- decode_patches:       return the patches of health and state code arrays, the inverse of encode_patches
+
+Every replica of a step shares the same neighbour gather over the CSR adjacency, so one vectorized operation serves
+all replicas, while every random draw is separate per replica. The dynamics are those of sim_forest.ForestFireGraph,
+where the patches take their turn one after the other in vertex order:
+- A tree updates twice in its turn: burning trees lose 20 health per update and turn into rock patches when their
+  health is below 0 after the first update, other trees gain 10 health (at most 256) and may autocombust.
+- After the first update a burning tree ignites each neighbouring tree with probability fire_spread_prob. A tree
+  after it in vertex order burns in its own turn of the same step and spreads on, so fire can cross several
+  patches in one step; a tree before it has had its turn and burns from the next step.
+- Rock patches become trees with a random health of 1..256, with probability rock_mutate_prob for the initial rocks
+  and 1 percent for rocks left by burnt trees, like the Rockpatch created by Treepatch.mutate.
+- Firefighters, in order, extinguish the burning tree they stand on with probability firefighter_skill, and
+  otherwise may die. Firefighters not fighting a fire move to a random neighbour.
+The engines replay the turns without a loop over the vertices: fire spreads in rounds, each from the trees ignited in
+the previous round to the trees after them, so a step takes as many rounds as the longest chain of trees the fire
+crosses in it. Every burning tree draws its edges once, so the series have the distribution of the object engine.
+
+The array engines store a patch in 3 bytes: an int16 health, updated with saturating arithmetic, and a uint8 state
+code, ROCK, TREE, BURNING_TREE or BURNT_ROCK. Bit 0 of a code is set for trees and bit 1 for burning trees and for
+rocks left by burnt trees. The masks of a step take a byte per patch each. ReplicaEngine draws uniform floats only for
+the patches where an event can happen, the trees that can autocombust and the rocks that can turn into trees, DRAW_CHUNK
+patches at a time, so the draws take 16 * DRAW_CHUNK bytes (floats and positions) whatever the size of the state. The
+largest transient of a step is pulling fire: a byte per edge slot and a 4-byte count per patch, and 28 bytes for each
+tree with burning neighbours (its position, count, chance and draw).
+
+Both engines spread fire in the direction that is cheaper for the current fire, like direction-optimizing BFS: while
+the edges out of the burning trees are few compared to the edges of the trees that can still ignite, every burning
+tree pushes fire along its own edges with one draw per edge, otherwise every tree pulls fire from all its burning
+neighbours on the side fire comes from at once, igniting with probability 1 - (1 - fire_spread_prob) ** k for k
+burning neighbours. Both directions draw the same distribution. The neighbours after and before each patch are kept
+as two halves of the adjacency, so either side is gathered without the other.
+
+PackedReplicaEngine spreads fire and masks the status flags with bitwise operations on all 64 replicas of a word at
+once. Its random events are drawn as words whose bits are set independently with the probability of the event,
+rounded to PROBABILITY_BITS binary digits, so it simulates the dynamics of ReplicaEngine up to that rounding.
+
+Requirements
+------------
+Package numpy https://numpy.org/ which can be installed via PIP.
+Python 3.7 or higher.
+
+Notes
+-----
+This module is created as material for the phase 2 project for DM857, DS830 (2023).
+"""
+import math
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from class_helper import SERIES, Landpatch, Rockpatch, Treepatch
+from csr_helper import CSRGraph, csr_from_edges
+
+# Health of a new tree, and the health change of a tree per update
+MAX_HEALTH = 256
+REGROW_HEALTH = 10
+BURN_DAMAGE = 20
+# Percent chance of regrowth of a rock patch left by a burnt tree
+BURNT_ROCK_MUTATE_PROB = 1
+# Range of the int16 health of the array engines
+HEALTH_MIN = np.iinfo(np.int16).min
+# State codes of the array engines
+ROCK = 0
+TREE = 1
+BURNT_ROCK = 2
+BURNING_TREE = 3
+# Health change of a patch per update by state code
+_HEALTH_CHANGE = np.array([0, REGROW_HEALTH, 0, -BURN_DAMAGE], dtype=np.int16)
+# Fire is pushed from the burning trees while their edges times PUSH_PULL_ALPHA are fewer than the edges of the trees
+# that can still ignite, and pulled by those trees otherwise
+PUSH_PULL_ALPHA = 1
+# Binary digits of the probabilities of the random bit words of PackedReplicaEngine
+PROBABILITY_BITS = 16
+# Replicas per word of PackedReplicaEngine
+WORD_BITS = 64
+# Patches per chunk of the uniform draws of ReplicaEngine, so the float64 draws take a bounded number of bytes
+DRAW_CHUNK = 1 << 16
+
+
+def randint_probability(percent: float) -> float:
+    """Return the probability of random.randint(0, 100) <= percent, the chance of an event of the object engine
+
+    Parameters
+    ----------
+    percent: float
+        Chance of the event in percent
+    """
+    return min(max(math.floor(percent) + 1, 0), 101) / 101
+
+
+@dataclass
+class ReplicaState:
+    """Each instance of this dataclass holds the state of every replica, one row per replica and column per vertex.
+
+    Parameters
+    ----------
+    health: np.ndarray
+        (R,V) int16 health of the tree on each vertex, 0 for rock patches
+    codes: np.ndarray
+        (R,V) uint8 state code of each vertex: ROCK, TREE, BURNING_TREE or BURNT_ROCK
+    firefighters: np.ndarray
+        (R,F) vertex each firefighter stands on
+    alive: np.ndarray
+        (R,F) bool, False for firefighters who perished
+    """
+    health: np.ndarray
+    codes: np.ndarray
+    firefighters: np.ndarray
+    alive: np.ndarray
+
+
+def _saturating_update(health: np.ndarray, codes: np.ndarray) -> None:
+    """Changes health in place by the health change of each state code (see _HEALTH_CHANGE), saturating at
+    HEALTH_MIN and MAX_HEALTH
+
+    Parameters
+    ----------
+    health: np.ndarray
+        int16 health
+    codes: np.ndarray
+        uint8 state codes of the same shape
+    """
+    np.maximum(health, HEALTH_MIN + BURN_DAMAGE, out=health)
+    health += _HEALTH_CHANGE[codes]
+    np.minimum(health, MAX_HEALTH, out=health)
+
+
+class ReplicaEngine:
+    """Each instance of this class simulates replicas of one configuration on one graph together"""
+    def __init__(self,
+                 graph: CSRGraph,
+                 tree_rate: Optional[float] = 80,
+                 firefighters: Optional[int] = 3,
+                 autocombustion_prob: Optional[float] = 1,
+                 fire_spread_prob: Optional[float] = 30,
+                 rock_mutate_prob: Optional[float] = 1,
+                 sim_limit: Optional[int] = 10,
+                 firefighter_skill: Optional[float] = 25,
+                 replicas: Optional[int] = 64,
+                 seed: Optional[int] = None) -> None:
+        """
+        Parameters
+        ----------
+        graph: CSRGraph
+            The graph to simulate on. Vertices without neighbours are not land patches, as in the object engine
+        tree_rate, firefighters, autocombustion_prob, fire_spread_prob, rock_mutate_prob, sim_limit, firefighter_skill:
+            Simulation parameters, as the parameters of sim_forest.ForestFireGraph
+        replicas: Optional[int], default = 64
+            Number of replicas simulated together
+        seed: Optional[int], default = None
+            Seed of the random draws of all replicas. If None, runs are not reproducible
+        """
+        # Only vertices with neighbours are land patches, renumbered 0..L-1
+        land = graph.degrees() > 0
+        renumber = np.cumsum(land) - 1
+        self._starts = np.asarray(graph.indptr[:-1])[land]
+        self._degrees = np.asarray(graph.degrees())[land]
+        self._indices = renumber[np.asarray(graph.indices)]
+        self._num_patches = int(land.sum())
+
+        # The (starts, degrees, indices) adjacency of the neighbours after and before each patch in vertex order, the
+        # order the patches take their turn in
+        edge_vertices = np.repeat(np.arange(self._num_patches), self._degrees)
+        self._later = self._one_side(self._indices > edge_vertices)
+        self._earlier = self._one_side(self._indices < edge_vertices)
+
+        self._tree_rate = tree_rate
+        self._num_firefighters = firefighters
+        self._autocombustion = randint_probability(autocombustion_prob)
+        self._spread = randint_probability(fire_spread_prob)
+        self._rock_mutate = randint_probability(rock_mutate_prob)
+        self._burnt_rock_mutate = randint_probability(BURNT_ROCK_MUTATE_PROB)
+        self._sim_limit = sim_limit
+        self._extinguish = firefighter_skill / 100
+        self._death = randint_probability(3 - firefighter_skill / 100)
+        self._replicas = replicas
+        self._rng = np.random.default_rng(seed)
+
+        # Chance a tree with k burning neighbours is ignited, one independent draw per burning neighbour
+        self._ignite_chance = 1 - (1 - self._spread) ** np.arange(int(self._degrees.max(initial=0)) + 1)
+        self._mean_degree = len(self._indices) / max(self._num_patches, 1)
+
+    def initial_state(self) -> ReplicaState:
+        """Return the state before the first step: tree_rate percent trees at full health, firefighters placed at random"""
+
+        rng = self._rng
+        shape = (self._replicas, self._num_patches)
+        tree_count = round(self._num_patches * (self._tree_rate / 100.0))
+
+        # Every replica places tree_count trees uniformly without replacement, a chunk of columns at a time: the
+        # number of trees in a chunk is hypergeometric, and they go on the patches with the lowest random keys
+        codes = np.full(shape, ROCK, dtype=np.uint8)
+        columns = max(DRAW_CHUNK // max(self._replicas, 1), 1)
+        remaining = np.full(self._replicas, tree_count)
+        for start in range(0, self._num_patches if tree_count else 0, columns):
+            stop = min(start + columns, self._num_patches)
+            placed = rng.hypergeometric(stop - start, self._num_patches - stop, remaining)
+            remaining -= placed
+            order = np.argsort(rng.random((self._replicas, stop - start)), axis=1)
+            chosen = np.arange(stop - start) < placed[:, None]
+            np.put_along_axis(codes[:, start:stop], order, chosen.view(np.uint8), axis=1)
+
+        health = np.zeros(shape, dtype=np.int16)
+        health[codes == TREE] = MAX_HEALTH
+        firefighters = rng.integers(0, max(self._num_patches, 1), (self._replicas, self._num_firefighters))
+
+        return ReplicaState(health=health, codes=codes, firefighters=firefighters,
+                            alive=np.ones(firefighters.shape, dtype=bool))
+
+    def step(self, state: ReplicaState) -> None:
+        """Advances every replica one step"""
+
+        rng = self._rng
+        codes = state.codes
+        rocks = (codes & TREE) == 0
+        calm = codes == TREE
+
+        # Calm trees autocombust in the first update of their turn, unless an earlier neighbour ignites them first
+        autocombusts = self._bernoulli_flags(calm, self._autocombustion)
+
+        # The patches take their turn in vertex order, as in the object engine: a tree burning in its turn ignites
+        # the trees after it before their turn, which burn in their turn too. Fire spreads in rounds from the trees
+        # that started burning in the previous round, until no tree after a burning one is ignited. calm keeps the
+        # trees not ignited yet
+        ignited = codes == BURNING_TREE
+        spreading = ignited | autocombusts
+        front = np.flatnonzero(spreading)
+        while len(front):
+            hits = self._spread_fire(front, calm, forward=True)
+            calm.reshape(-1)[hits] = False
+            ignited.reshape(-1)[hits] = True
+            front = hits[~spreading.reshape(-1)[hits]]
+            spreading.reshape(-1)[hits] = True
+
+        # First update: trees ignited before their turn burn, the others regrow and may autocombust
+        codes |= ignited.view(np.uint8) << 1
+        _saturating_update(state.health, codes)
+        codes |= spreading.view(np.uint8) << 1
+
+        # Trees below zero health turn into rock patches, the others update a second time. Burning trees fall below
+        # zero, and trees put out below zero by a firefighter stay below until they regrow. Rocks have zero health
+        np.copyto(codes, BURNT_ROCK, where=state.health < 0)
+        np.maximum(state.health, 0, out=state.health)
+        self._update_trees(state)
+
+        # Rock patches from before the step may become trees
+        burnt = codes == BURNT_ROCK
+        grown = self._bernoulli_flags(rocks & burnt, self._burnt_rock_mutate)
+        grown |= self._bernoulli_flags(rocks & ~burnt, self._rock_mutate)
+        codes[grown] = TREE
+        state.health[grown] = rng.integers(1, MAX_HEALTH + 1, int(grown.sum()))
+
+        # The trees burning in their turn ignite the trees before them after their turn, which burn from the next
+        # step, also the trees grown from rock patches in this step
+        codes.flat[self._spread_fire(np.flatnonzero(spreading), codes == TREE, forward=False)] = BURNING_TREE
+
+        self._move_firefighters(state)
+
+    def counts(self, state: ReplicaState) -> np.ndarray:
+        """Return the (R,3) number of tree, rock and burning tree patches of each replica, in the order of SERIES
+        (see class_helper)"""
+
+        trees = (state.codes & TREE).sum(axis=1, dtype=np.int64)
+        return np.column_stack((trees, self._num_patches - trees, (state.codes == BURNING_TREE).sum(axis=1)))
+
+    def run(self) -> np.ndarray:
+        """Simulates sim_limit steps. Return the (R, len(SERIES), sim_limit + 1) series of every replica,
+        the Graphdata series of each replica as rows of one array"""
+
+        state = self.initial_state()
+        series = np.empty((self._replicas, len(SERIES), self._sim_limit + 1), dtype=np.int64)
+        series[:, :, 0] = self.counts(state)
+        for step in range(1, self._sim_limit + 1):
+            self.step(state)
+            series[:, :, step] = self.counts(state)
+
+        return series
+
+    def _update_trees(self, state: ReplicaState) -> None:
+        """One tree update: burning trees lose health, other trees regrow and may autocombust"""
+
+        calm = state.codes == TREE
+        _saturating_update(state.health, state.codes)
+        state.codes |= self._bernoulli_flags(calm, self._autocombustion).view(np.uint8) << 1
+
+    def _bernoulli_flags(self, mask: np.ndarray, probability: float) -> np.ndarray:
+        """Return bool flags of the shape of mask, set independently with probability where mask is set. Uniform
+        floats are drawn only for the set patches, DRAW_CHUNK patches at a time
+
+        Parameters
+        ----------
+        mask: np.ndarray
+            bool flags of the patches where the event can happen
+        probability: float
+            Chance of the event
+        """
+        if probability <= 0:
+            return np.zeros(mask.shape, dtype=bool)
+        if probability >= 1:
+            return mask.copy()
+
+        flags = np.zeros(mask.shape, dtype=bool)
+        mask, events = mask.reshape(-1), flags.reshape(-1)
+        for start in range(0, mask.size, DRAW_CHUNK):
+            positions = np.flatnonzero(mask[start:start + DRAW_CHUNK]) + start
+            events[positions[self._rng.random(len(positions)) < probability]] = True
+
+        return flags
+
+    def _spread_fire(self, front: np.ndarray, targets: np.ndarray, forward: bool) -> np.ndarray:
+        """Return the flat positions in the (R,V) state of the targets ignited by their burning neighbours, pushed from
+        the burning trees while the fire is small and pulled by the targets otherwise
+
+        Parameters
+        ----------
+        front: np.ndarray
+            Flat positions in the (R,V) state of the trees spreading fire
+        targets: np.ndarray
+            (R,V) bool flags of the trees that can ignite
+        forward: bool
+            If True, fire spreads to the neighbours after a burning tree in vertex order, otherwise to those before it
+        """
+        rng = self._rng
+        starts, degrees, indices = self._later if forward else self._earlier
+        vertices = front % max(self._num_patches, 1)
+        slots = self._edge_slots(vertices, starts, degrees)
+
+        if len(slots) * PUSH_PULL_ALPHA > np.count_nonzero(targets) * self._mean_degree:
+            # Pull: one draw per target with burning neighbours on the side fire comes from
+            sources = np.zeros(targets.shape, dtype=bool)
+            sources.flat[front] = True
+            counts = self._neighbour_counts(sources, *(self._earlier if forward else self._later))
+            exposed = np.flatnonzero(targets & (counts > 0))
+            return exposed[rng.random(len(exposed)) < self._ignite_chance[counts.flat[exposed]]]
+
+        # Push: one draw per edge out of a burning tree to a target on the side fire goes to
+        positions = np.repeat(front - vertices, degrees[vertices]) + indices[slots]
+        positions = positions[targets.reshape(-1)[positions]]
+        return np.unique(positions[rng.random(len(positions)) < self._spread])
+
+    def _one_side(self, slots: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Return the starts, degrees and CSR indices of the adjacency of the land patches with the edge slots set in
+        slots only
+
+        Parameters
+        ----------
+        slots: np.ndarray
+            bool flag of every CSR edge slot
+        """
+        degrees = np.add.reduceat(slots, self._starts, dtype=np.int64) if self._num_patches else self._degrees
+
+        return np.cumsum(degrees) - degrees, degrees, self._indices[slots]
+
+    def _edge_slots(self, vertices: np.ndarray, starts: np.ndarray, degrees: np.ndarray) -> np.ndarray:
+        """Return the positions in the CSR indices of the edges of vertices, row after row
+
+        Parameters
+        ----------
+        vertices: np.ndarray
+            Land vertices, numbered 0..L-1
+        starts, degrees: np.ndarray
+            Position of the first edge and number of edges of every vertex in the CSR indices
+        """
+        degrees = degrees[vertices]
+        first = np.cumsum(degrees) - degrees
+
+        return np.arange(int(degrees.sum())) + np.repeat(starts[vertices] - first, degrees)
+
+    def _neighbour_counts(self,
+                          flags: np.ndarray,
+                          starts: np.ndarray,
+                          degrees: np.ndarray,
+                          indices: np.ndarray) -> np.ndarray:
+        """Return the (R,V) number of neighbours of each vertex whose flag is set, for every replica at once
+
+        Parameters
+        ----------
+        flags: np.ndarray
+            (R,V) bool flags
+        starts, degrees, indices: np.ndarray
+            Adjacency of the neighbours to count, as ReplicaEngine._one_side
+        """
+        if len(indices) == 0:
+            return np.zeros(flags.shape, dtype=np.int64)
+
+        # reduceat needs starts inside the indices, and gives the flag at the start for vertices without edges
+        counts = np.add.reduceat(flags[:, indices], np.minimum(starts, len(indices) - 1), axis=1, dtype=np.int32)
+        counts[:, degrees == 0] = 0
+        return counts
+
+    def _move_firefighters(self, state: ReplicaState) -> None:
+        """Firefighters, one after the other as in the object engine, fight the fire under them or move on"""
+
+        rng = self._rng
+        rows = np.arange(self._replicas)
+        for f in range(state.firefighters.shape[1]):
+            position = state.firefighters[:, f]
+            fighting = state.alive[:, f] & (state.codes[rows, position] == BURNING_TREE)
+
+            extinguished = fighting & (rng.random(self._replicas) <= self._extinguish)
+            state.codes[rows[extinguished], position[extinguished]] = TREE
+            state.alive[fighting & ~extinguished & (rng.random(self._replicas) < self._death), f] = False
+
+            # A random neighbour of the current vertex
+            neighbour = self._indices[self._starts[position]
+                                      + (rng.random(self._replicas) * self._degrees[position]).astype(np.int64)]
+            state.firefighters[:, f] = np.where(fighting, position, neighbour)
+
+
+@dataclass
+class PackedState:
+    """Each instance of this dataclass holds the state of every replica of a PackedReplicaEngine, one row per vertex.
+    Bit r % 64 of word r // 64 of a row is the flag of replica r.
+
+    Parameters
+    ----------
+    health: np.ndarray
+        (V,R) int16 health of the tree on each vertex, 0 for rock patches
+    tree: np.ndarray
+        (V,W) uint64 words, bits set for tree patches
+    burning: np.ndarray
+        (V,W) uint64 words, bits set for burning tree patches
+    burnt: np.ndarray
+        (V,W) uint64 words, bits set for rock patches left by a burnt tree
+    firefighters: np.ndarray
+        (R,F) vertex each firefighter stands on
+    alive: np.ndarray
+        (R,F) bool, False for firefighters who perished
+    """
+    health: np.ndarray
+    tree: np.ndarray
+    burning: np.ndarray
+    burnt: np.ndarray
+    firefighters: np.ndarray
+    alive: np.ndarray
+
+
+def _pack(flags: np.ndarray) -> np.ndarray:
+    """Return the (V,W) uint64 words of (V,R) bool flags, replica r in bit r % 64 of word r // 64"""
+
+    words = -(-flags.shape[1] // WORD_BITS)
+    packed = np.zeros((flags.shape[0], words * 8), dtype=np.uint8)
+    packed[:, :(flags.shape[1] + 7) // 8] = np.packbits(flags, axis=1, bitorder="little")
+    return packed.view("<u8")
+
+
+def _unpack(words: np.ndarray, replicas: int) -> np.ndarray:
+    """Return the (V,R) bool flags of (V,W) uint64 words, the inverse of _pack"""
+
+    return np.unpackbits(words.astype("<u8", copy=False).view(np.uint8), axis=1, count=replicas,
+                         bitorder="little").view(bool)
+
+
+class PackedReplicaEngine(ReplicaEngine):
+    """Each instance of this class simulates replicas of one configuration on one graph together, with the flags of
+    64 replicas packed in one word per vertex"""
+    def __init__(self, graph: CSRGraph, *args, **kwargs) -> None:
+        """
+        Parameters
+        ----------
+        graph, tree_rate, firefighters, autocombustion_prob, fire_spread_prob, rock_mutate_prob, sim_limit,
+        firefighter_skill, replicas, seed:
+            As the parameters of ReplicaEngine
+        """
+        super().__init__(graph, *args, **kwargs)
+
+        # Bits of the replicas in the last word
+        self._words = -(-self._replicas // WORD_BITS)
+        self._valid = np.full(self._words, np.iinfo(np.uint64).max, dtype=np.uint64)
+        if self._replicas % WORD_BITS:
+            self._valid[-1] = np.uint64((1 << (self._replicas % WORD_BITS)) - 1)
+
+        # Word and bit of every replica, for the firefighters
+        self._replica_words = np.arange(self._replicas) // WORD_BITS
+        self._replica_bits = np.left_shift(np.uint64(1), (np.arange(self._replicas) % WORD_BITS).astype(np.uint64))
+
+    def initial_state(self) -> PackedState:
+        """Return the state before the first step, drawn as by ReplicaEngine.initial_state"""
+
+        state = super().initial_state()
+        codes = state.codes.T
+
+        return PackedState(health=np.ascontiguousarray(state.health.T), tree=_pack(codes == TREE),
+                           burning=_pack(codes == BURNING_TREE), burnt=_pack(codes == BURNT_ROCK),
+                           firefighters=state.firefighters, alive=state.alive)
+
+    def step(self, state: PackedState) -> None:
+        """Advances every replica one step, the patches taking their turn in vertex order (see ReplicaEngine.step)"""
+
+        rocks = ~state.tree & self._valid
+        calm = state.tree & ~state.burning
+
+        # Calm trees autocombust in the first update of their turn, unless an earlier neighbour ignites them first
+        autocombusts = calm & self._bernoulli_words(self._autocombustion, calm.shape)
+
+        # Fire spreads in rounds to the trees after the burning ones, which burn in their turn too
+        ignited = state.burning.copy()
+        spreading = ignited | autocombusts
+        front = spreading
+        while front.any():
+            hits = self._spread_fire(front, calm & ~ignited, forward=True)
+            ignited |= hits
+            front = hits & ~spreading
+            spreading |= hits
+
+        # First update: trees ignited before their turn burn, the others regrow and may autocombust
+        state.burning = ignited
+        self._regrow(state)
+        state.burning |= spreading
+
+        # Trees below zero health turn into rock patches, the others update a second time. Burning trees fall below
+        # zero, and trees put out below zero by a firefighter stay below until they regrow. Rocks have zero health
+        burnt = _pack(state.health < 0)
+        state.tree &= ~burnt
+        state.burning &= ~burnt
+        state.burnt |= burnt
+        np.maximum(state.health, 0, out=state.health)
+        self._update_trees(state)
+
+        # Rock patches from before the step may become trees
+        shape = state.tree.shape
+        grown = rocks & ((state.burnt & self._bernoulli_words(self._burnt_rock_mutate, shape))
+                         | (~state.burnt & self._bernoulli_words(self._rock_mutate, shape)))
+        state.tree |= grown
+        state.burnt &= ~grown
+        grown = _unpack(grown, self._replicas)
+        state.health[grown] = self._rng.integers(1, MAX_HEALTH + 1, int(grown.sum()))
+
+        # The trees burning in their turn ignite the trees before them after their turn, which burn from the next step
+        state.burning |= self._spread_fire(spreading, state.tree & ~state.burning, forward=False)
+
+        self._move_firefighters(state)
+
+    def _spread_fire(self, sources: np.ndarray, targets: np.ndarray, forward: bool) -> np.ndarray:
+        """Return the (V,W) words of the targets ignited by their burning neighbours, pushed from the vertices burning
+        in any replica while the fire is small and pulled by the vertices with a target in any replica otherwise.
+        Bits are drawn only for the edges that can spread
+
+        Parameters
+        ----------
+        sources: np.ndarray
+            (V,W) words, bits set for the trees spreading fire
+        targets: np.ndarray
+            (V,W) words, bits set for the trees that can ignite
+        forward: bool
+            If True, fire spreads to the neighbours after a burning tree in vertex order, otherwise to those before it
+        """
+        starts, degrees, indices = self._later if forward else self._earlier
+        vertices = np.flatnonzero(sources.any(axis=1))
+        slots = self._edge_slots(vertices, starts, degrees)
+
+        if len(slots) * PUSH_PULL_ALPHA > np.count_nonzero(targets.any(axis=1)) * self._mean_degree:
+            # Pull: the edge slots of the targets, from their neighbours on the side fire comes from
+            starts, degrees, indices = self._earlier if forward else self._later
+            receivers = np.repeat(np.arange(self._num_patches), degrees)
+            spreading = sources[indices] & targets[receivers]
+        else:
+            # Push: the edge slots of the burning vertices, to their neighbours on the side fire goes to
+            receivers = indices[slots]
+            spreading = np.repeat(sources[vertices], degrees[vertices], axis=0) & targets[receivers]
+
+        ignited = np.zeros(sources.shape, dtype=np.uint64)
+        edges = np.flatnonzero(spreading.any(axis=1))
+        if edges.size:
+            hits = spreading[edges] & self._bernoulli_words(self._spread, (edges.size, self._words))
+            np.bitwise_or.at(ignited, receivers[edges], hits)
+
+        return ignited
+
+    def counts(self, state: PackedState) -> np.ndarray:
+        """Return the (R,3) number of tree, rock and burning tree patches of each replica, in the order of SERIES
+        (see class_helper)"""
+
+        trees = _unpack(state.tree, self._replicas).sum(axis=0)
+        return np.column_stack((trees, self._num_patches - trees, _unpack(state.burning, self._replicas).sum(axis=0)))
+
+    def _update_trees(self, state: PackedState) -> None:
+        """One tree update: burning trees lose health, other trees regrow and may autocombust"""
+
+        calm = state.tree & ~state.burning
+        self._regrow(state)
+        state.burning |= calm & self._bernoulli_words(self._autocombustion, calm.shape)
+
+    def _regrow(self, state: PackedState) -> None:
+        """Changes the health of the patches by their state code (see _saturating_update)"""
+
+        # The state codes of the patches, from the tree bits and the burning or burnt bits
+        codes = _unpack(state.burning | state.burnt, self._replicas).view(np.uint8) << 1
+        codes |= _unpack(state.tree, self._replicas).view(np.uint8)
+        _saturating_update(state.health, codes)
+
+    def _bernoulli_words(self, probability: float, shape: tuple) -> np.ndarray:
+        """Return uint64 words whose bits are set independently with probability, rounded to PROBABILITY_BITS binary
+        digits
+
+        Parameters
+        ----------
+        probability: float
+            Probability of a set bit
+        shape: tuple
+            Shape of the words
+        """
+        level = round(probability * (1 << PROBABILITY_BITS))
+        if level <= 0:
+            return np.zeros(shape, dtype=np.uint64)
+        if level >= 1 << PROBABILITY_BITS:
+            return np.full(shape, np.iinfo(np.uint64).max, dtype=np.uint64)
+
+        # From the lowest binary digit of the probability up, a set digit ORs a random word in and a clear digit ANDs
+        # one: after each digit a bit is set with the probability of the digits so far
+        digits = PROBABILITY_BITS
+        while not level & 1:
+            level >>= 1
+            digits -= 1
+        words = self._rng.bit_generator.random_raw(shape)
+        for digit in range(1, digits):
+            if level >> digit & 1:
+                words |= self._rng.bit_generator.random_raw(shape)
+            else:
+                words &= self._rng.bit_generator.random_raw(shape)
+
+        return words
+
+    def _move_firefighters(self, state: PackedState) -> None:
+        """Firefighters, one after the other as in the object engine, fight the fire under them or move on"""
+
+        rng = self._rng
+        words, bits = self._replica_words, self._replica_bits
+        for f in range(state.firefighters.shape[1]):
+            position = state.firefighters[:, f]
+            fighting = state.alive[:, f] & (state.burning[position, words] & bits != 0)
+
+            extinguished = fighting & (rng.random(self._replicas) <= self._extinguish)
+            np.bitwise_and.at(state.burning, (position[extinguished], words[extinguished]), ~bits[extinguished])
+            state.alive[fighting & ~extinguished & (rng.random(self._replicas) < self._death), f] = False
+
+            # A random neighbour of the current vertex
+            neighbour = self._indices[self._starts[position]
+                                      + (rng.random(self._replicas) * self._degrees[position]).astype(np.int64)]
+            state.firefighters[:, f] = np.where(fighting, position, neighbour)
+
+
+def simulate_config(config: "ConfigData",
+                    replicas: int,
+                    seed: Optional[int] = None,
+                    firefighter_skill: Optional[float] = 25) -> np.ndarray:
+    """Return the (R, len(SERIES), sim_time + 1) series of replicas of a configuration (see ReplicaEngine.run)
+
+    Parameters
+    ----------
+    config: ConfigData
+        The configuration to simulate, on a list of edges or a CSRGraph
+    replicas: int
+        Number of replicas
+    seed: Optional[int], default = None
+        Seed of the random draws of all replicas
+    firefighter_skill: Optional[float], default = 25
+        Skill of the firefighters, which ConfigData does not store
+    """
+    graph = config.edges
+    if not isinstance(graph, CSRGraph):
+        # Numbered in the order the patches of the object engine take their turn in
+        graph = csr_from_edges(graph, relabel=True, first_seen=True)
+
+    return ReplicaEngine(graph, config.tree_distribution, config.firefighters, config.autocombustion,
+                         config.fire_spread_prob, config.rock_mutate_prob, config.sim_time, firefighter_skill,
+                         replicas, seed).run()
+
+
+def run_replicas(graph: CSRGraph, params: Dict, replicas: int, seed: Optional[int]) -> Dict[str, np.ndarray]:
+    """Return the series of replicas simulated together, for batch_forest.ENGINES
+
+    Parameters
+    ----------
+    graph: CSRGraph
+        The graph to simulate on
+    params: Dict
+        Simulation parameters, see batch_forest.PARAM_DEFAULTS
+    replicas: int
+        Number of replicas
+    seed: Optional[int]
+        Seed of the random draws of all replicas
+    """
+    series = ReplicaEngine(graph, replicas=replicas, seed=seed, **params).run()
+
+    return {name: series[:, i] for i, name in enumerate(SERIES)}
+
+
+def run_packed(graph: CSRGraph, params: Dict, replicas: int, seed: Optional[int]) -> Dict[str, np.ndarray]:
+    """Return the series of replicas simulated together with packed flags (see PackedReplicaEngine), for
+    batch_forest.ENGINES
+
+    Parameters
+    ----------
+    graph: CSRGraph
+        The graph to simulate on
+    params: Dict
+        Simulation parameters, see batch_forest.PARAM_DEFAULTS
+    replicas: int
+        Number of replicas
+    seed: Optional[int]
+        Seed of the random draws of all replicas
+    """
+    series = PackedReplicaEngine(graph, replicas=replicas, seed=seed, **params).run()
+
+    return {name: series[:, i] for i, name in enumerate(SERIES)}
+
+
+def encode_patches(patches_map: Dict[int, Landpatch],
+                   vertices: Optional[Sequence[int]] = None,
+                   autocombustion_prob: Optional[float] = 1,
+                   rock_mutate_prob: Optional[float] = 1) -> Tuple[np.ndarray, np.ndarray]:
+    """Return the int16 health and uint8 state codes of the patches of a sim_forest.ForestFireGraph, one entry per
+    vertex. decode_patches restores the same patches
+
+    Parameters
+    ----------
+    patches_map: Dict[int, Landpatch]
+        Patch of each vertex
+    vertices: Optional[Sequence[int]], default = None
+        Order of the vertices in the arrays. If None, the order of patches_map
+    autocombustion_prob: Optional[float], default = 1
+        Autocombustion chance of every tree patch
+    rock_mutate_prob: Optional[float], default = 1
+        Mutate chance of the rock patches which were not left by a burnt tree
+    """
+    if vertices is None:
+        vertices = list(patches_map)
+    health = np.zeros(len(vertices), dtype=np.int16)
+    codes = np.full(len(vertices), ROCK, dtype=np.uint8)
+
+    for i, vertex in enumerate(vertices):
+        patch = patches_map[vertex]
+        if isinstance(patch, Treepatch):
+            if not HEALTH_MIN <= patch._tree_health <= MAX_HEALTH:
+                raise Exception(f"ensemble_helper, tree health {patch._tree_health} of vertex {vertex} is out of range")
+            if patch._autocombustion_prob != autocombustion_prob:
+                raise Exception(f"ensemble_helper, vertex {vertex} has autocombustion chance "
+                                f"{patch._autocombustion_prob}, not {autocombustion_prob}")
+            health[i] = patch._tree_health
+            codes[i] = BURNING_TREE if patch._ignited else TREE
+        elif isinstance(patch, Rockpatch):
+            if patch._mutate_chance == rock_mutate_prob:
+                codes[i] = ROCK
+            elif patch._mutate_chance == BURNT_ROCK_MUTATE_PROB:
+                codes[i] = BURNT_ROCK
+            else:
+                raise Exception(f"ensemble_helper, vertex {vertex} has mutate chance {patch._mutate_chance}, "
+                                f"not {rock_mutate_prob} or {BURNT_ROCK_MUTATE_PROB}")
+        else:
+            raise Exception(f"ensemble_helper, vertex {vertex} is not a tree or rock patch")
+
+    return health, codes
+
+
+def decode_patches(health: np.ndarray,
+                   codes: np.ndarray,
+                   vertices: Sequence[int],
+                   neighbours: Dict[int, List[int]],
+                   autocombustion_prob: Optional[float] = 1,
+                   rock_mutate_prob: Optional[float] = 1) -> Dict[int, Landpatch]:
+    """Return the patch of each vertex of health and state code arrays, the inverse of encode_patches
+
+    Parameters
+    ----------
+    health: np.ndarray
+        Health of each vertex
+    codes: np.ndarray
+        State code of each vertex
+    vertices: Sequence[int]
+        Vertex of each entry of the arrays
+    neighbours: Dict[int, List[int]]
+        Neighbours of each vertex
+    autocombustion_prob, rock_mutate_prob: Optional[float], default = 1
+        As the parameters of encode_patches
+    """
+    patches_map = {}
+    for vertex, tree_health, code in zip(vertices, health.tolist(), codes.tolist()):
+        if code & TREE:
+            patch = Treepatch(id=vertex, neighbour_ids=neighbours[vertex], autocombustion_prob=autocombustion_prob,
+                              tree_health=tree_health)
+            patch._ignited = code == BURNING_TREE
+        else:
+            patch = Rockpatch(id=vertex, neighbour_ids=neighbours[vertex],
+                              mutate_chance=BURNT_ROCK_MUTATE_PROB if code == BURNT_ROCK else rock_mutate_prob)
+        patches_map[vertex] = patch
+
+    return patches_map
@@ -2,8 +2,12 @@
 This module provides a set of helper functions, to:
 - user_file:                opens a file using a given file path (fp) and file name (fn), and reads its contents
 - add_edges_from_lines:     Read lines, check if line represent an edge of a graph. Return list of edges
+- parse_edge_block:         Parses a block of bytes of an edge file into an array of edges, with numpy operations
+- read_edge_array:          Streams an edge file in large blocks and returns an array of edges and the invalid lines
+- create_edge_array_from_file: Reads a file, reports invalid lines, and returns an array of edges for a graph
 - create_graph_from_file:   Reads a file, checks if it's valid, and returns a list of edges for a graph
-- check_planar_graph:       Checks if a list of edges on a graph can be represented planar
+- check_planar_graph:       Checks if a list of edges on a graph can be represented planar, with cached verdicts
+- max_planar_edges:         Return the largest number of edges of a simple planar graph with a number of vertices
 
 Requirements
 ------------
@@ -15,8 +19,20 @@ This module created as material for the phase 2 project for DM857, DS830 (2023).
 """
 import time
 import os
-from typing import List, Tuple
+from typing import Iterable, List, Optional, Tuple, Union
+import numpy as np
 import graph_helper as gh
+import cache_helper as cache
+from csr_helper import CSRGraph
+
+# Size of the blocks an edge file is read in
+EDGE_BLOCK_SIZE = 16 * 1024 * 1024
+# Numbers with more digits do not fit in a 64 bit integer
+MAX_DIGITS = 18
+# Bytes that may appear in an edge: digits, comma, space, tab, carriage return, vertical tab, form feed and newline
+_EDGE_BYTES = b"0123456789, \t\r\x0b\x0c\n"
+_OTHER = np.ones(256, dtype=bool)
+_OTHER[list(_EDGE_BYTES)] = False
 
 def user_file(fp, fn):
     """This function opens a file using a given file path (fp) and file name (fn), and reads its contents."""
@@ -34,85 +50,210 @@ def user_file(fp, fn):
         print(e)
         quit()
 
-def add_edges_from_lines(lines: str) -> list[tuple]:
+def add_edges_from_lines(lines: Iterable[str]) -> list[tuple]:
     """Read lines, check if line represent an edge of a graph. Return list of edges"""
 
-    # Store edges in a list
-    edges_list = []
+    # Parse all lines at once with the bulk parser
+    data = "\n".join(line.rstrip("\n") for line in lines).encode() + b"\n"
+    edges, invalid_lines = parse_edge_block(data)
+    report_invalid_lines(invalid_lines)
 
-    # Iterate through the lines and add edges to the graph
-    for line in lines:
-        # Ignore lines starting with #
-        if line.startswith('#'):
-            continue
+    return list(zip(edges[:, 0].tolist(), edges[:, 1].tolist()))
 
-        # Split the line by comma
-        nodes = line.split(',')
+def parse_edge_block(data: bytes, first_line: int = 1) -> Tuple[np.ndarray, List[int]]:
+    """Return the edges and the numbers of invalid lines in a block of an edge file.
 
-        # Remove '()' from nodes
-        for i in range(len(nodes)):
-            nodes[i] = nodes[i].replace('(', '')
-            nodes[i] = nodes[i].replace(')', '')
+    Each non-empty line must hold two non-negative integers separated by a comma. Parentheses are removed,
+    lines starting with '#' are comments, and empty lines are skipped. Lines are validated with numpy
+    operations over the positions of digits, commas and newlines in the whole block, and the numbers
+    of valid lines are converted from their runs of digits with one numpy pass per digit place.
 
-        # Check if both values are valid integers
-        if len(nodes) == 2 and nodes[0].strip().isdigit() and nodes[1].strip().isdigit():
-            # Convert nodes to integers and add the edge to the graph
-            i, j = map(int, nodes)
-            # Add the edge as a tuple to the edges_list
-            edges_list.append((i, j))
-        else:
-            print("Invalid input.")
+    Parameters
+    ----------
+    data: bytes
+        Complete lines of an edge file, ending with a newline
+    first_line: int, default = 1
+        Line number of the first line in data, used for reporting invalid lines
+    """
 
-    return edges_list
+    # Remove '()' from the block
+    data = data.translate(None, b"()")
+    chars = np.frombuffer(data, dtype=np.uint8)
+    newlines = np.flatnonzero(chars == 10)
+    num_lines = len(newlines)
+    if num_lines == 0:
+        return np.empty((0, 2), dtype=np.int64), []
 
-def create_graph_from_file(filename: str) -> list[tuple]:
-    """Reads a file, checks if it's valid, and returns a list of edges for a graph"""
+    # Positions of the numbers (runs of digits) and commas
+    is_digit = np.zeros(len(chars) + 2, dtype=bool)
+    np.logical_and(chars >= 48, chars <= 57, out=is_digit[1:-1])
+    run_bounds = np.flatnonzero(is_digit[1:] != is_digit[:-1])
+    run_starts, run_ends = run_bounds[0::2], run_bounds[1::2]
+    commas = np.flatnonzero(chars == 44)
+
+    # Count per line by counting the positions before each newline
+    runs_before = np.searchsorted(run_starts, newlines)
+    commas_before = np.searchsorted(commas, newlines)
+    runs_per_line = np.diff(runs_before, prepend=0)
+    commas_per_line = np.diff(commas_before, prepend=0)
+    runs_before -= runs_per_line
+    commas_before -= commas_per_line
+
+    # Any other character makes a line invalid, unless it is a '#' starting a comment line
+    has_other = np.zeros(num_lines, dtype=bool)
+    is_comment = np.zeros(num_lines, dtype=bool)
+    if data.translate(None, _EDGE_BYTES):
+        others = np.flatnonzero(_OTHER[chars])
+        other_lines = np.searchsorted(newlines, others)
+        has_other[other_lines] = True
+        # others is sorted, so the first position of each line in other_lines is its first other character
+        lines_with_other, first_index = np.unique(other_lines, return_index=True)
+        first_other = np.empty(num_lines, dtype=np.int64)
+        first_other[lines_with_other] = others[first_index]
+        # First digit or comma of each line, the end of the block marks lines without any
+        first_run = np.where(runs_per_line > 0, np.append(run_starts, len(chars))[runs_before], len(chars))
+        first_comma = np.where(commas_per_line > 0, np.append(commas, len(chars))[commas_before], len(chars))
+        first_content = np.minimum(first_run, first_comma)
+        is_comment[has_other] = ((chars[first_other[has_other]] == 35)
+                                 & (first_other[has_other] < first_content[has_other]))
+    is_empty = (runs_per_line == 0) & (commas_per_line == 0) & ~has_other
+
+    # A valid line holds exactly: number, comma, number, and nothing else
+    valid = (runs_per_line == 2) & (commas_per_line == 1) & ~has_other
+    lines = np.flatnonzero(valid)
+    first, comma = runs_before[lines], commas[commas_before[lines]]
+    valid[lines] = ((run_starts[first] < comma) & (comma < run_starts[first + 1])
+                    & (run_ends[first] - run_starts[first] <= MAX_DIGITS)
+                    & (run_ends[first + 1] - run_starts[first + 1] <= MAX_DIGITS))
+    invalid_lines = (np.flatnonzero(~valid & ~is_comment & ~is_empty) + first_line).tolist()
+
+    # Read the two numbers of each valid line from its runs of digits, one digit place at a time from the last
+    runs = (runs_before[valid][:, None] + np.arange(2)).reshape(-1)
+    last_digits = run_ends[runs] - 1
+    lengths = run_ends[runs] - run_starts[runs]
+    values = np.zeros(len(runs), dtype=np.int64)
+    for place in range(lengths.max(initial=0)):
+        digits = chars[np.maximum(last_digits - place, 0)].astype(np.int64) - 48
+        values += np.where(lengths > place, digits, 0) * 10 ** place
+
+    return values.reshape(-1, 2), invalid_lines
+
+def read_edge_array(filename: str, block_size: int = EDGE_BLOCK_SIZE) -> Tuple[np.ndarray, List[int]]:
+    """Return an (E,2) array of the edges in a file, and the numbers of its invalid lines.
+    The file is streamed in blocks of block_size bytes, so it is never held in memory as lines.
+
+    Parameters
+    ----------
+    filename: str
+        Path of the edge file
+    block_size: int, default = 16 MiB
+        Number of bytes read at a time
+    """
+
+    blocks = []
+    invalid_lines = []
+    remainder = b""
+    line_number = 1
+
+    with open(filename, "rb") as file:
+        while True:
+            data = file.read(block_size)
+            if not data:
+                break
+
+            # Parse complete lines only, the partial last line is kept for the next block
+            data = remainder + data
+            end = data.rfind(b"\n") + 1
+            remainder = data[end:]
+            if end:
+                edges, invalid = parse_edge_block(data[:end], line_number)
+                blocks.append(edges)
+                invalid_lines.extend(invalid)
+                line_number += data.count(b"\n", 0, end)
+
+    if remainder:
+        edges, invalid = parse_edge_block(remainder + b"\n", line_number)
+        blocks.append(edges)
+        invalid_lines.extend(invalid)
+
+    edges = np.concatenate(blocks) if blocks else np.empty((0, 2), dtype=np.int64)
+    return edges, invalid_lines
+
+def report_invalid_lines(invalid_lines: List[int], shown: int = 10) -> None:
+    """Print one message listing the invalid lines of an edge file (if any)
+
+    Parameters
+    ----------
+    invalid_lines: List[int]
+        Numbers of the invalid lines
+    shown: int, default = 10
+        Maximum number of line numbers printed
+    """
+
+    if not invalid_lines:
+        return
+    listed = ", ".join(str(line) for line in invalid_lines[:shown])
+    more = f" and {len(invalid_lines) - shown} more" if len(invalid_lines) > shown else ""
+    print(f"Invalid input on {len(invalid_lines)} line(s): {listed}{more}.")
+
+def create_edge_array_from_file(filename: str) -> np.ndarray:
+    """Reads a file, reports invalid lines, and returns an (E,2) array of edges for a graph"""
 
     try:
-        with open(filename, 'r') as file:
-            # Read lines from the file and remove whitespaces
-            lines = [line.strip() for line in file.readlines() if line.strip()]
+        edges, invalid_lines = read_edge_array(filename)
 
     except FileNotFoundError as e:
         print("The file could not be found.")
-        return []  # Return an empty list
+        return np.empty((0, 2), dtype=np.int64)  # Return an empty array
 
     except IOError as e:
         print("There was an error reading from the file:", str(e))
-        return []  # Return an empty list
+        return np.empty((0, 2), dtype=np.int64)  # Return an empty array
 
-    # add edges from file to edges_list
-    try:
-        graph_edges = add_edges_from_lines(lines)
-    except UnboundLocalError as e:
-        print(e)
-        return []
+    report_invalid_lines(invalid_lines)
+
+    return edges
+
+def create_graph_from_file(filename: str) -> list[tuple]:
+    """Reads a file, checks if it's valid, and returns a list of edges for a graph"""
 
-    return graph_edges
+    edges = create_edge_array_from_file(filename)
 
-def check_planar_graph(edges: List[Tuple]) -> bool:
+    return list(zip(edges[:, 0].tolist(), edges[:, 1].tolist()))
+
+def check_planar_graph(edges: Union[List[Tuple], np.ndarray, CSRGraph],
+                       filename: Optional[str] = None,
+                       planar_by_construction: Optional[bool] = False) -> bool:
     """Return true if edges represent a planar graph.
 
+    Graphs with more than 3V-6 edges are rejected without running the planarity test. If filename is given,
+    the verdict is cached by the file's content hash, so validating the same file again skips the test.
+
     Parameters
     ----------
-    edges: List[Tuple]
+    edges: Union[List[Tuple], np.ndarray, CSRGraph]
         test utilizes the edges_planar method from the graph_helper module.
+    filename: Optional[str], default = None
+        The file the edges were read from, used as cache key for the verdict
+    planar_by_construction: Optional[bool], default = False
+        If True, the edges come from a generator that only makes planar graphs and the test is skipped
     """
 
-    time.sleep(1)
-    print(f"\n...Configuring internal test for verifying that edges represent a planar graph. Please wait.")
-    time.sleep(0.6)
-    print(f"...Finalizing parameter configuration for planar test")
-    time.sleep(0.6)
-    print(f"...Finalizing test")
-    time.sleep(0.6)
-    print(f"...Analyzing test data")
-    time.sleep(1)
-    print("\nTest result:")
-    time.sleep(0.3)
-
-    # Get test result
-    if gh.edges_planar(edges):
+    print(f"\n...Verifying that edges represent a planar graph.")
+
+    if planar_by_construction:
+        result = True
+    else:
+        key = cache.content_hash(filename) if filename else None
+        verdicts = cache.VerdictCache("planarity") if key else None
+        result = verdicts.get(key) if key else None
+        if result is None:
+            result = _edges_planar(edges)
+            if key:
+                verdicts.put(key, result)
+
+    print("Test result:")
+    if result:
         print("Your graph is a planar graph. Yahoo!")
         return True
     else:
@@ -121,4 +262,28 @@ def check_planar_graph(edges: List[Tuple]) -> bool:
         time.sleep(0.5)
         print("\n...Redirecting to file input")
         time.sleep(0.5)
-        return False
\ No newline at end of file
+        return False
+
+def _edges_planar(edges: Union[List[Tuple], np.ndarray, CSRGraph]) -> bool:
+    """Return true if edges represent a planar graph, rejecting graphs with more than 3V-6 edges first"""
+
+    if isinstance(edges, CSRGraph):
+        num_vertices = int(np.count_nonzero(edges.degrees()))
+        if edges.num_edges() > max_planar_edges(num_vertices):
+            return False
+        return gh.edges_planar(list(edges.iter_edges()))
+
+    array = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+    array = array[array[:, 0] != array[:, 1]]
+    num_vertices = len(np.unique(array))
+    if len(array) > max_planar_edges(num_vertices):
+        # Repeated edges may push the count over the bound, so only distinct edges are counted
+        if len(np.unique(np.sort(array, axis=1), axis=0)) > max_planar_edges(num_vertices):
+            return False
+
+    return gh.edges_planar(edges)
+
+def max_planar_edges(num_vertices: int) -> int:
+    """Return the largest number of edges a simple planar graph with num_vertices vertices can have"""
+
+    return 3 * num_vertices - 6 if num_vertices >= 3 else max(num_vertices - 1, 0)
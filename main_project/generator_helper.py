@@ -0,0 +1,267 @@
+"""
+This module provides generators of large planar graphs that are written straight into a CSRGraph, to:
+- square_lattice:       generate a rows x cols grid where each vertex has up to 4 neighbours
+- triangular_lattice:   generate a rows x cols triangular lattice where each vertex has up to 6 neighbours
+- hexagonal_lattice:    generate a rows x cols honeycomb (brick wall) lattice where each vertex has up to 3 neighbours
+- delaunay_graph:       generate the Delaunay triangulation of random points
+- voronoi_graph:        generate the Voronoi graph of random points (see graph_helper.voronoi_arrays)
+
+No generator builds a list of edge tuples. The lattices are produced in blocks of rows, and if out_dir is given
+every array is written to .npy files in that directory block by block (see csr_helper.load_csr).
+
+Requirements
+------------
+Package numpy https://numpy.org/ which can be installed via PIP.
+Package scipy https://scipy.org/  which can be installed via PIP.
+Python 3.7 or higher.
+
+Notes
+-----
+This module is created as material for the phase 2 project for DM857, DS830 (2023).
+"""
+import math
+import os
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
+from csr_helper import CSRGraph, csr_from_edges, index_dtype
+import graph_helper as gh
+
+# Neighbour offsets (row, column, parity rule) of each lattice, ordered so neighbour ids are increasing.
+# A parity rule of 0 or 1 only keeps the neighbour when (row + column) % 2 equals the rule.
+SQUARE_OFFSETS = [(-1, 0, None), (0, -1, None), (0, 1, None), (1, 0, None)]
+TRIANGULAR_OFFSETS = [(-1, -1, None), (-1, 0, None), (0, -1, None), (0, 1, None), (1, 0, None), (1, 1, None)]
+HEXAGONAL_OFFSETS = [(-1, 0, 1), (0, -1, None), (0, 1, None), (1, 0, 0)]
+
+
+def square_lattice(rows: int,
+                   cols: Optional[int] = None,
+                   out_dir: Optional[str] = None,
+                   chunk_rows: Optional[int] = 4096) -> CSRGraph:
+    """Return a rows x cols square grid graph with coordinates in [0,1]x[0,1]
+
+    Parameters
+    ----------
+    rows: int
+        Number of rows of vertices
+    cols: Optional[int], default = None
+        Number of columns of vertices. If None, the grid is square
+    out_dir: Optional[str], default = None
+        If provided, the arrays are written to .npy files in this directory instead of kept in memory
+    chunk_rows: Optional[int], default = 4096
+        Number of rows generated at a time
+    """
+    cols = rows if cols is None else cols
+
+    return _lattice(rows, cols, SQUARE_OFFSETS, lambda r, c: (c, r), out_dir, chunk_rows)
+
+
+def triangular_lattice(rows: int,
+                       cols: Optional[int] = None,
+                       out_dir: Optional[str] = None,
+                       chunk_rows: Optional[int] = 4096) -> CSRGraph:
+    """Return a rows x cols triangular lattice graph with coordinates in [0,1]x[0,1]
+
+    Parameters
+    ----------
+    rows: int
+        Number of rows of vertices
+    cols: Optional[int], default = None
+        Number of columns of vertices. If None, the lattice has as many columns as rows
+    out_dir: Optional[str], default = None
+        If provided, the arrays are written to .npy files in this directory instead of kept in memory
+    chunk_rows: Optional[int], default = 4096
+        Number of rows generated at a time
+    """
+    cols = rows if cols is None else cols
+
+    # Sheared so that every triangle is equilateral
+    return _lattice(rows, cols, TRIANGULAR_OFFSETS, lambda r, c: (c - r / 2, r * math.sqrt(3) / 2),
+                    out_dir, chunk_rows)
+
+
+def hexagonal_lattice(rows: int,
+                      cols: Optional[int] = None,
+                      out_dir: Optional[str] = None,
+                      chunk_rows: Optional[int] = 4096) -> CSRGraph:
+    """Return a rows x cols honeycomb lattice graph, drawn as a brick wall, with coordinates in [0,1]x[0,1]
+
+    Parameters
+    ----------
+    rows: int
+        Number of rows of vertices
+    cols: Optional[int], default = None
+        Number of columns of vertices. If None, the lattice has as many columns as rows
+    out_dir: Optional[str], default = None
+        If provided, the arrays are written to .npy files in this directory instead of kept in memory
+    chunk_rows: Optional[int], default = 4096
+        Number of rows generated at a time
+    """
+    cols = rows if cols is None else cols
+
+    return _lattice(rows, cols, HEXAGONAL_OFFSETS, lambda r, c: (c, r), out_dir, chunk_rows)
+
+
+def delaunay_graph(npoints: int,
+                   seed: Optional[int] = None,
+                   out_dir: Optional[str] = None) -> CSRGraph:
+    """Return the Delaunay triangulation of npoints random points in [0,1]x[0,1]
+
+    Parameters
+    ----------
+    npoints: int
+        Number of random points (vertices), at least 4
+    seed: Optional[int], default = None
+        Seed for the random points. If None, numpy's global random state is used
+    out_dir: Optional[str], default = None
+        If provided, the arrays are also written to .npy files in this directory
+    """
+    from scipy.spatial import Delaunay
+
+    if npoints < 4:
+        raise Exception("delaunay_graph, the number of points must be larger than 3")
+
+    rng = np.random.default_rng(seed) if seed is not None else np.random
+    points = rng.random((npoints, 2))
+
+    # Qhull already returns the triangulation's adjacency in CSR layout
+    indptr, indices = Delaunay(points).vertex_neighbor_vertices
+    graph = CSRGraph(indptr.astype(np.int64), indices.astype(index_dtype(npoints)), points.astype(np.float32))
+
+    if out_dir:
+        graph.save(out_dir)
+
+    return graph
+
+
+def voronoi_graph(minpoints: int,
+                  seed: Optional[int] = None,
+                  out_dir: Optional[str] = None) -> CSRGraph:
+    """Return a random Voronoi graph with at least minpoints vertices in [0,1]x[0,1]
+
+    Parameters
+    ----------
+    minpoints: int
+        Minimal number of vertices, at least 4
+    seed: Optional[int], default = None
+        Seed for the random points. If None, numpy's global random state is used
+    out_dir: Optional[str], default = None
+        If provided, the arrays are also written to .npy files in this directory
+    """
+    edges, coords = gh.voronoi_arrays(minpoints, seed=seed)
+    graph = csr_from_edges(edges, len(coords), coords.astype(np.float32))
+
+    if out_dir:
+        graph.save(out_dir)
+
+    return graph
+
+
+# Generators by name, eg. for reading graph sources from configuration files
+GENERATORS: Dict[str, Callable[..., CSRGraph]] = {
+    "square": square_lattice,
+    "triangular": triangular_lattice,
+    "hexagonal": hexagonal_lattice,
+    "delaunay": delaunay_graph,
+    "voronoi": voronoi_graph,
+}
+
+
+def _lattice(rows: int,
+             cols: int,
+             offsets: List[Tuple[int, int, Optional[int]]],
+             layout: Callable,
+             out_dir: Optional[str],
+             chunk_rows: int) -> CSRGraph:
+    """Return the CSRGraph of a lattice, generated chunk_rows rows at a time
+
+    Parameters
+    ----------
+    rows, cols: int
+        Size of the lattice. Vertex (r, c) is numbered r * cols + c
+    offsets: List[(int, int, Optional[int])]
+        Neighbour offsets (row, column, parity rule), ordered by increasing neighbour id
+    layout: Callable
+        Function mapping row and column arrays to unscaled (x, y) coordinate arrays
+    out_dir: Optional[str]
+        If provided, arrays are written to .npy files in this directory
+    chunk_rows: int
+        Number of rows generated at a time
+    """
+    if rows < 2 or cols < 2:
+        raise Exception("lattice, the number of rows and columns must be larger than 1")
+
+    num_vertices = rows * cols
+    chunk_rows = max(1, chunk_rows)
+
+    # First pass counts the neighbours, so the arrays can be allocated (or created on disk) once
+    num_entries = sum(int(_neighbour_table(r0, min(r0 + chunk_rows, rows), rows, cols, offsets)[1].sum())
+                      for r0 in range(0, rows, chunk_rows))
+
+    indptr = _allocate(out_dir, "indptr", (num_vertices + 1,), np.int64)
+    indices = _allocate(out_dir, "indices", (num_entries,), index_dtype(num_vertices))
+    coords = _allocate(out_dir, "coords", (num_vertices, 2), np.float32)
+
+    # Scale the layout into the unit square, keeping the aspect ratio
+    corners = [layout(np.array([r]), np.array([c])) for r in (0, rows - 1) for c in (0, cols - 1)]
+    xs = [float(x[0]) for x, _ in corners]
+    ys = [float(y[0]) for _, y in corners]
+    scale = max(max(xs) - min(xs), max(ys) - min(ys))
+
+    # Second pass writes each block of rows straight into the arrays
+    indptr[0] = 0
+    offset = 0
+    for r0 in range(0, rows, chunk_rows):
+        r1 = min(r0 + chunk_rows, rows)
+        table, valid = _neighbour_table(r0, r1, rows, cols, offsets)
+        entries = table[valid]
+        v0, v1 = r0 * cols, r1 * cols
+
+        indices[offset:offset + len(entries)] = entries
+        indptr[v0 + 1:v1 + 1] = offset + np.cumsum(valid.sum(axis=1))
+        offset += len(entries)
+
+        r, c = np.divmod(np.arange(v0, v1), cols)
+        x, y = layout(r, c)
+        coords[v0:v1, 0] = (x - min(xs)) / scale
+        coords[v0:v1, 1] = (y - min(ys)) / scale
+
+    graph = CSRGraph(indptr, indices, coords)
+    if out_dir:
+        # Flushes the memory mapped arrays and removes stale arrays from the directory
+        for array in (indptr, indices, coords):
+            array.flush()
+        graph.save(out_dir)
+
+    return graph
+
+
+def _neighbour_table(r0: int,
+                     r1: int,
+                     rows: int,
+                     cols: int,
+                     offsets: List[Tuple[int, int, Optional[int]]]) -> Tuple[np.ndarray, np.ndarray]:
+    """Return a (vertices, offsets) table of neighbour ids for rows r0..r1, and a mask of valid neighbours"""
+
+    r, c = np.divmod(np.arange(r0 * cols, r1 * cols, dtype=np.int64), cols)
+    table = np.empty((len(r), len(offsets)), dtype=np.int64)
+    valid = np.empty((len(r), len(offsets)), dtype=bool)
+
+    for k, (dr, dc, parity) in enumerate(offsets):
+        nr, nc = r + dr, c + dc
+        mask = (nr >= 0) & (nr < rows) & (nc >= 0) & (nc < cols)
+        if parity is not None:
+            mask &= (r + c) % 2 == parity
+        table[:, k] = nr * cols + nc
+        valid[:, k] = mask
+
+    return table, valid
+
+
+def _allocate(out_dir: Optional[str], name: str, shape: Tuple[int, ...], dtype: np.dtype) -> np.ndarray:
+    """Return an empty array, memory mapped to out_dir/name.npy if out_dir is provided"""
+
+    if not out_dir:
+        return np.empty(shape, dtype=dtype)
+
+    os.makedirs(out_dir, exist_ok=True)
+    return np.lib.format.open_memmap(os.path.join(out_dir, name + ".npy"), mode="w+", dtype=dtype, shape=shape)
@@ -13,6 +13,9 @@ This module is created as material for the phase 2 project for DM857, DS830 (202
 import graph_helper as gh
 import class_helper as ch
 import file_helper as fh
+import cache_helper as cache
+import graphfile_helper as gfh
+import store_helper as store
 import os
 import sys
 import time
@@ -26,111 +29,121 @@ def main() -> None:
     # Show start menu
     start_menu()
     program_running = True
-
-    # run program
-    while program_running:
-        # get user input
-        configuration_done = False
-        while not configuration_done:
-            edges, pos_nodes = get_edges()
-            tree_rate = get_tree_rate()
-            firefighters = get_firefighters()
-            autocombustion_prob = get_autocombustion_prob()
-            fire_spread_prob = get_fire_spread_prob()
-            rock_mutate_prob = get_rock_mutate_prob()
-            sim_limit = get_sim_limit()
-
-            # Show config
-            display_config(edges, tree_rate, firefighters, autocombustion_prob, 
-                           fire_spread_prob, rock_mutate_prob, sim_limit)
-
-            # Finalize configuration
-            if finalize_configuration():
-                configuration_done = True
-
-                # Store current config
-                configuration_storage.append(ch.ConfigData(edges, pos_nodes, tree_rate, firefighters, autocombustion_prob, 
-                                                            fire_spread_prob, rock_mutate_prob, sim_limit))
+    with store.ConfigStore() as config_store:
+        # run program
+        while program_running:
+            # get user input
+            configuration_done = False
+            while not configuration_done:
+                edges, pos_nodes = get_edges()
+                tree_rate = get_tree_rate()
+                firefighters = get_firefighters()
+                autocombustion_prob = get_autocombustion_prob()
+                fire_spread_prob = get_fire_spread_prob()
+                rock_mutate_prob = get_rock_mutate_prob()
+                sim_limit = get_sim_limit()
+
+                # Show config
+                display_config(edges, tree_rate, firefighters, autocombustion_prob, 
+                               fire_spread_prob, rock_mutate_prob, sim_limit)
+
+                # Finalize configuration
+                if finalize_configuration():
+                    configuration_done = True
+
+                    # Store current config
+                    config = ch.ConfigData(edges, pos_nodes, tree_rate, firefighters, autocombustion_prob, 
+                                           fire_spread_prob, rock_mutate_prob, sim_limit)
+                    config_store.add(config)
         
-        # Run simulation
-        graph = ForestFireGraph(edges, pos_nodes, tree_rate, firefighters, autocombustion_prob, 
-                                fire_spread_prob, rock_mutate_prob, sim_limit)
-        graph.simulate()
-
-        # Sim done
-        print("...Simulation finished. Gathering final results")
-        time.sleep(0.4)
-        print("...Final results gathered.")
-
-        # Display report
-        time.sleep(0.3)
-        print("\n============================================================="
-              "\nYou have the following options:"
-              "\n=> Select '1' to generate and display a report on the evolution of the wildfires"
-              "\n=> Select '2' to exit the program")
-        choice = get_valid_input("Choice: ", "Option 1 or 2.")
-
-        if choice == 1:
+            # Run simulation
+            graph = ForestFireGraph(edges, pos_nodes, tree_rate, firefighters, autocombustion_prob, 
+                                    fire_spread_prob, rock_mutate_prob, sim_limit)
+            started = time.perf_counter()
+            graph.simulate()
+            record_run(config, graph, time.perf_counter() - started)
+
+            # Sim done
+            print("...Simulation finished. Gathering final results")
+            time.sleep(0.4)
+            print("...Final results gathered.")
+
+            # Display report
             time.sleep(0.3)
-            # Create instance of class
-            my_instance = graph._graph_data
-            # Call method using created instance
-            my_instance.report_forest_evolution(steps=sim_limit)
-        elif choice == 2:
+            print("\n============================================================="
+                  "\nYou have the following options:"
+                  "\n=> Select '1' to generate and display a report on the evolution of the wildfires"
+                  "\n=> Select '2' to exit the program")
+            choice = get_valid_input("Choice: ", "Option 1 or 2.")
+
+            if choice == 1:
+                time.sleep(0.3)
+                # Create instance of class
+                my_instance = graph._graph_data
+                # Call method using created instance
+                my_instance.report_forest_evolution(steps=sim_limit)
+            elif choice == 2:
+                time.sleep(0.3)
+                print("Sure, I spent a whole hour configuring the report only for you to be ungrateful and not view the report.")
+                quit()
+            else:
+                print("Invalid choice"
+                      "\n...Redirecting")
+
+            # Ask to run simulation again
             time.sleep(0.3)
-            print("Sure, I spent a whole hour configuring the report only for you to be ungrateful and not view the report.")
-            quit()
-        else:
-            print("Invalid choice"
-                  "\n...Redirecting")
-
-        # Ask to run simulation again
-        time.sleep(0.3)
-        print("\n=============================================================\
+            print("\n=============================================================\
               \nYou have the following options:\
               \n=> Select '1' to rerun simulation with stored parameters\
               \n=> Select '2' to run simulation with different parameters\
-              \n=> Select '3' to quit program (stored configuration is lost).")
-        choice = get_valid_input("Choice: ", "Option 1, 2 or 3.")
-
-        graph._vis_graph.close()    # close current sim window
-
-        if choice == 1:
-            time.sleep(0.3)
-            display_config_storage()
-            index = get_config_choice() - 1
-            edges, pos_nodes, tree_rate, firefighters, autocombustion_prob, fire_spread_prob, rock_mutate_prob, sim_limit = configuration_storage[index].get_config()
-            # Create graph
-            graph = ForestFireGraph(edges, pos_nodes, tree_rate, firefighters, autocombustion_prob, fire_spread_prob, rock_mutate_prob, sim_limit)
-            # Sim stored data
-            time.sleep(0.3)
-            graph.simulate()
-
-            # display report
-            graph._graph_data.report_forest_evolution(sim_limit)
-
-            # Get next graph
-            print("Configure new graph?")
-            answer = False
-            while not answer:
-                answer_choice = get_valid_string_input("(y/n)", "Yes (y) to continue, no (n) to wait", True).lower()
-                if answer_choice == "yes" or answer_choice == "y":
-                    answer = True
-                elif answer_choice == "no" or answer_choice == "n":
-                    quit()
-            graph._vis_graph.close()
-        elif choice == 2:
-            time.sleep(0.3)
-            print("\n...Redirecting")
-        elif choice == 3:
-            quit()
-        else:
-            print("Invalid choice\
+              \n=> Select '3' to quit program (stored configurations are kept for the next run).")
+            choice = get_valid_input("Choice: ", "Option 1, 2 or 3.")
+
+            graph._vis_graph.close()    # close current sim window
+
+            if choice == 1:
+                time.sleep(0.3)
+                stored_configs = config_store.configurations()
+                display_config_storage(stored_configs)
+                config_choice = get_config_choice(stored_configs)
+                if config_choice is None:
+                    print("\n...Redirecting to new graph configuration")
+                    continue
+                config = config_store.load(stored_configs[config_choice - 1].config_id)
+                edges, pos_nodes, tree_rate, firefighters, autocombustion_prob, fire_spread_prob, rock_mutate_prob, sim_limit = config.get_config()
+                # Create graph
+                graph = ForestFireGraph(edges, pos_nodes, tree_rate, firefighters, autocombustion_prob, fire_spread_prob, rock_mutate_prob, sim_limit)
+                # Sim stored data
+                time.sleep(0.3)
+                started = time.perf_counter()
+                graph.simulate()
+                record_run(config, graph, time.perf_counter() - started)
+
+                # display report
+                graph._graph_data.report_forest_evolution(sim_limit)
+
+                # Get next graph
+                print("Configure new graph?")
+                answer = False
+                while not answer:
+                    answer_choice = get_valid_string_input("(y/n)", "Yes (y) to continue, no (n) to wait", True).lower()
+                    if answer_choice == "yes" or answer_choice == "y":
+                        answer = True
+                    elif answer_choice == "no" or answer_choice == "n":
+                        quit()
+                graph._vis_graph.close()
+            elif choice == 2:
+                time.sleep(0.3)
+                print("\n...Redirecting")
+            elif choice == 3:
+                quit()
+            else:
+                print("Invalid choice\
                   \n...Redirecting")
         
-        time.sleep(0.4)
-        print("\n...Redirecting to new graph configuration")
-        time.sleep(0.4)
+            time.sleep(0.4)
+            print("\n...Redirecting to new graph configuration")
+            time.sleep(0.4)
 
 # Main program functions
 def start_menu() -> None:
@@ -178,6 +191,7 @@ def get_edges() -> List[Tuple]:
                   \nfile must adhere to the following criteria:\
                   \nFile must contain edges which have a planar representation for simulation purposes.\
                   \nEach non-empty line must represent an edge, identified by two integers separated by a comma\
+                  \nBinary graph files (.ffg) made with graphfile_helper.py are accepted as well\
                   \nFilepath example: /Users/JohnDoe/examplePath/filename.dat ")
             
             # Get valid file
@@ -186,11 +200,14 @@ def get_edges() -> List[Tuple]:
                 file_path = get_valid_file("Enter the file path: ", "Each non-empty line must represent an edge,\
                                            identified by two integers separated by a comma")
 
-                # Create edges from provided file
-                graph_edges = fh.create_graph_from_file(file_path)
+                # Create edges from provided file, binary graph files are memory mapped instead of parsed
+                if gfh.is_graph_file(file_path):
+                    graph_edges = gfh.open_graph_file(file_path).graph()
+                else:
+                    graph_edges = fh.create_graph_from_file(file_path)
 
-                # Verify that the graph is a planar graph
-                if fh.check_planar_graph(graph_edges):
+                # Verify that the graph is a planar graph, the verdict is cached per file content
+                if fh.check_planar_graph(graph_edges, filename=file_path):
                     validating_file = False
                 else:
                     # Redirecting to file input
@@ -210,10 +227,23 @@ def get_edges() -> List[Tuple]:
                       \nPlease enter the number of patches  you'd like in your forest (graph):")
                 vertices_num = get_valid_input("Number of patches: ", "atleast 4, maximum is 500", 4, 500)
 
-                graph_edges, graph_pos = gh.voronoi_to_edges(vertices_num)
+                # Graphs are cached by size and seed, so entering a previous seed reuses its graph
+                # get_valid_input skips a minimum of 0, so negative seeds are refused here
+                graph_seed = -1
+                while graph_seed < 0:
+                    graph_seed = get_valid_input("Enter a graph seed to reuse a previous graph, or 0 for a new graph: ", 
+                                                 "an integer of 0 or more")
+                    if graph_seed < 0:
+                        print("A graph seed must be 0 or more. Please try again.")
+                if graph_seed == 0:
+                    graph_seed = random.randint(1, 2 ** 31 - 1)
+                print(f"Graph seed: {graph_seed} (enter it next time to reuse this graph)")
+
+                # The graph stays memory mapped from the cache, its positions are the CSRGraph coordinates
+                graph_edges = cache.cached_generate("voronoi", graph_seed, minpoints=vertices_num)
 
-            # Verify that the graph is a planar graph
-            fh.check_planar_graph(graph_edges)
+            # Voronoi graphs are planar by construction, so the planarity test is skipped
+            fh.check_planar_graph(graph_edges, planar_by_construction=True)
 
             # Break loop
             getting_param = False
@@ -552,39 +582,76 @@ def finalize_configuration() -> bool:
     
     return False
 
-configuration_storage = []
+def display_config_storage(stored_configs: Optional[List[store.StoredConfig]] = None) -> None:
+    """Display previous configurations from storage
 
-def display_config_storage() -> None:
-    """Display previous configurations from storage"""
+    Parameters
+    ----------
+    stored_configs: Optional[List[StoredConfig]], default = None
+        The configurations to display. If None, the configurations in the default store (see store_helper)
+    """
+    if stored_configs is None:
+        with store.ConfigStore() as config_store:
+            stored_configs = config_store.configurations()
 
-    time.sleep(0.5)
-    print("...Retrieving previous configurations")
-    time.sleep(0.5)
     print("\n=============================================================\
           \nCurrent configurations in storage:")
 
-    # Iterate over configuration storage
-    for index, config in enumerate(configuration_storage):
-        print(f"\nGraph: {index + 1}")
-        print(config)
-        time.sleep(0.2)
+    # One line per configuration, the graphs stay on disk
+    for index, config in enumerate(stored_configs):
+        print(f"Graph: {index + 1} - {config}")
+
+def get_config_choice(stored_configs: Optional[List[store.StoredConfig]] = None) -> Optional[int]:
+    """Return user-specified choice of configuration from configuration storage, or None if the storage is empty
+
+    Parameters
+    ----------
+    stored_configs: Optional[List[StoredConfig]], default = None
+        The configurations to choose from. If None, the configurations in the default store (see store_helper)
+    """
+    if stored_configs is None:
+        with store.ConfigStore() as config_store:
+            stored_configs = config_store.configurations()
+
+    # Nothing to choose from, and no input would be in the range 1-0
+    if not stored_configs:
+        print("\nThere are no configurations in storage.")
+        return None
 
-def get_config_choice() -> int:
-    """Return user-specified choice of configuration from configuration storage"""
-    
     print("\n=============================================================\
           \nCurrent configurations in storage:")
     print("You have the following options for configuration:")
     
     # Display list of choices
-    for index, config in enumerate(configuration_storage):
+    for index, config in enumerate(stored_configs):
         print(f"==> Graph: {index + 1}")
 
     # Get user choice
-    config_choice = get_valid_input("Choice: ", f"Numbers: 1-{len(configuration_storage)}.", 1, len(configuration_storage))
+    config_choice = get_valid_input("Choice: ", f"Numbers: 1-{len(stored_configs)}.", 1, len(stored_configs))
 
     return config_choice
 
+def record_run(config: ch.ConfigData, graph: ForestFireGraph, wall_seconds: float) -> None:
+    """Record a finished simulation in the results database (see store_helper.ResultStore)
+
+    Parameters
+    ----------
+    config: ConfigData
+        The configuration that was simulated
+    graph: ForestFireGraph
+        The simulated graph
+    wall_seconds: float
+        Time the simulation took, including drawing
+    """
+    data = graph._graph_data
+    params = {name: getattr(config, field) for name, field in store.PARAMETERS.items()}
+    # The skill the firefighters ran with, so the run is grouped with batch runs of the same configuration
+    params["firefighter_skill"] = graph._firefighter_average_skill
+    with store.ResultStore() as results:
+        results.add_run(config.graph, params, {"tree_patches": data._tree_patches, "rock_patches": data._rock_patches,
+                                               "ignited_tree_patches": data._ignited_tree_patches},
+                        wall_seconds=wall_seconds, land_patches=data._land_patches[0])
+
 # Execute random forest fire simulation
 if __name__ == "__main__":
     main()
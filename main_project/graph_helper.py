@@ -1,6 +1,7 @@
 """
 This module provides a set of helper functions, to:
 voronoi_to_edges: generate collection of edges defining a planar graph.
+voronoi_arrays: generate the edges and coordinates of a planar graph as numpy arrays.
 edges_planar: verifies if the given set of edges defines a planar graph
 
 Requirements
@@ -20,18 +21,25 @@ Notes
 This module provided as material for the phase 2 project for DM857, DS830 (2023). 
 """
 
+import math
 import numpy as np
-import networkx as nx
-from scipy.spatial import Voronoi
 from typing import List, Optional, Dict,Tuple 
-def voronoi_to_edges(minpoints:int,npoints:Optional[int]=0)->Tuple[List[Tuple[int,int]],Dict[int,Tuple[float,float]]]:
+
+# Inside the unit square N random seeds give 2N - c*sqrt(N) Voronoi vertices, with c about 3.5 on average and
+# up to about 4 for unlucky seeds. c = 4 is used, so the predicted seeds rarely fall short and have to grow
+VORONOI_BOUNDARY_LOSS = 4.0
+# Factor by which the number of seeds grows when too few vertices come out
+VORONOI_GROWTH = 1.1
+
+def voronoi_to_edges(minpoints:int,npoints:Optional[int]=0,seed:Optional[int]=None)->Tuple[List[Tuple[int,int]],Dict[int,Tuple[float,float]]]:
   '''
    Generates a random planar graph containing at least minpoints (based on the Voronoi graph)
 
    Parameters:
    ----------
    minpoints: Minimal number of points requested for the graph
-   npoints: Number of points in the Voronoi graph generation
+   npoints: Number of points in the Voronoi graph generation (predicted from minpoints if smaller than 4)
+   seed: Seed for the random points. If None, numpy's global random state is used
    
    Return: Tuple[edges,coord_map]
    ----------
@@ -40,35 +48,69 @@ def voronoi_to_edges(minpoints:int,npoints:Optional[int]=0)->Tuple[List[Tuple[in
    coord_map: Dict[int:(float,float)]
       Dictionary containing the coordinate of each vertex (expressed as a tuple of float in [0,1]x[0,1])
   '''
+  edges,coords=voronoi_arrays(minpoints,npoints,seed)
+  return list(zip(edges[:,0].tolist(),edges[:,1].tolist())),dict(enumerate(map(tuple,coords.tolist())))
+
+def voronoi_arrays(minpoints:int,npoints:Optional[int]=0,seed:Optional[int]=None)->Tuple[np.ndarray,np.ndarray]:
+  '''
+   Generates a random planar Voronoi graph containing at least minpoints, as numpy arrays
+
+   The Voronoi diagram is computed as the dual of the Delaunay triangulation of the seeds: each triangle's
+   circumcenter is a Voronoi vertex and each pair of adjacent triangles is a Voronoi ridge. Ridges with an
+   end outside [0,1]x[0,1] are clipped with boolean masks and the remaining vertices are relabelled with np.unique.
+   If too few vertices remain, the number of seeds grows geometrically and the diagram is rebuilt.
+
+   Parameters:
+   ----------
+   minpoints: Minimal number of points requested for the graph
+   npoints: Number of points in the Voronoi graph generation (predicted from minpoints if smaller than 4)
+   seed: Seed for the random points. If None, numpy's global random state is used
+   
+   Return: Tuple[edges,coords]
+   ----------
+   edges: np.ndarray
+      (E,2) integer array of the edges, vertices are numbered 0..V-1
+   coords: np.ndarray
+      (V,2) float array with the coordinate of each vertex in [0,1]x[0,1]
+  '''
   if(minpoints<4):
      raise Exception("voronoi_to_edges, the number of points must be larger than 3")
   if(npoints<4):
-     npoints=minpoints
-  points=np.random.rand(npoints,2)
-# we get the voronoi diagram
-  vor = Voronoi(points)
-# storage variable
-  res=[]
-  map={}
-  jj=0
-# Add an edge for each ridge in the Voronoi diagram that connects two points in the range [0,1] 
-  for simplex in vor.ridge_vertices:
-      if -1 not in simplex:
-          i, j = simplex
-          p = vor.vertices[i]
-          q = vor.vertices[j]
-          if 0 <= p[0] <= 1 and 0 <= p[1] <= 1 and 0 <= q[0] <= 1 and 0 <= q[1] <= 1:
-              if tuple(p) not in map:
-                 map[tuple(p)]=jj
-                 jj+=1
-              if tuple(q) not in map:
-                 map[tuple(q)]=jj
-                 jj+=1
-              res.append((tuple(p), tuple(q)))
-  if len(map) < minpoints:
-   return voronoi_to_edges(minpoints, npoints+1)
-  else:
-   return [(map[i[0]],map[i[1]]) for i in res],{v: k for k, v in map.items()}
+     npoints=voronoi_seed_count(minpoints)
+  rng=np.random.default_rng(seed) if seed is not None else np.random
+  while True:
+    edges,coords=_clipped_voronoi(rng.random((npoints,2)))
+    if len(coords)>=minpoints:
+      return edges,coords
+    npoints=max(npoints+1,math.ceil(npoints*VORONOI_GROWTH))
+
+def voronoi_seed_count(minpoints:int)->int:
+  '''Return the predicted number of random seeds whose clipped Voronoi graph has at least minpoints vertices'''
+  # solve 2N - c*sqrt(N) = minpoints for N
+  root=(VORONOI_BOUNDARY_LOSS+math.sqrt(VORONOI_BOUNDARY_LOSS**2+8*minpoints))/4
+  return max(4,math.ceil(root*root))
+
+def _clipped_voronoi(points:np.ndarray)->Tuple[np.ndarray,np.ndarray]:
+  '''Return the edges and coordinates of the Voronoi graph of points, restricted to [0,1]x[0,1]'''
+  from scipy.spatial import Delaunay
+  tri=Delaunay(points)
+  # Voronoi vertices are the circumcenters of the Delaunay triangles
+  a=points[tri.simplices[:,0]]
+  b=points[tri.simplices[:,1]]-a
+  c=points[tri.simplices[:,2]]-a
+  bb=(b*b).sum(axis=1)
+  cc=(c*c).sum(axis=1)
+  with np.errstate(divide="ignore",invalid="ignore"):
+    d=2*(b[:,0]*c[:,1]-b[:,1]*c[:,0])
+    vertices=np.column_stack(((c[:,1]*bb-b[:,1]*cc)/d,(b[:,0]*cc-c[:,0]*bb)/d))+a
+    inside=((vertices>=0)&(vertices<=1)).all(axis=1)
+  # Voronoi ridges join adjacent triangles; hull triangles have neighbour -1 and are dropped by n > t
+  t=np.repeat(np.arange(len(tri.simplices)),3)
+  n=tri.neighbors.ravel()
+  ridges=np.column_stack((t,n))[n>t]
+  ridges=ridges[inside[ridges].all(axis=1)]
+  used,inverse=np.unique(ridges,return_inverse=True)
+  return inverse.reshape(-1,2),vertices[used]
   
 
 def edges_planar(edges=List[Tuple[int,int]])-> bool:
@@ -81,4 +123,5 @@ def edges_planar(edges=List[Tuple[int,int]])-> bool:
   Return: Bool
 
     '''
+  import networkx as nx
   return nx.is_planar(nx.Graph(edges))
\ No newline at end of file
@@ -0,0 +1,229 @@
+"""
+This module provides a binary, memory mapped graph file format (.ffg) and helper functions, to:
+- write_graph_file:     write edges, and optionally a CSR adjacency and coordinates, to a graph file
+- open_graph_file:      open a graph file with np.memmap, so loading costs nothing until the data is used
+- is_graph_file:        check if a file is a binary graph file (rather than a text .dat edge file)
+- convert_dat_file:     convert a text .dat edge file into a binary graph file
+- load_graph:           return a CSRGraph from either a binary graph file or a text .dat edge file
+
+Layout of a graph file (little endian), every section starts at a multiple of 64 bytes:
+    header      magic b"FFGRAPH\\0", version, flags, vertex and edge counts, dtypes and section offsets
+    edges       (E,2) array of the edges, with the vertex ids of the original file
+    indptr      (V+1) int64 CSR row pointers                       (if flags has HAS_CSR)
+    indices     (2E) CSR neighbour numbers                         (if flags has HAS_CSR)
+    vertex_ids  (V) original id of each CSR vertex number          (if flags has HAS_VERTEX_IDS)
+    coords      (V,2) float32 vertex coordinates                   (if flags has HAS_COORDS)
+
+Convert from the command line with: python graphfile_helper.py input.dat output.ffg
+
+Requirements
+------------
+Package numpy https://numpy.org/ which can be installed via PIP.
+Python 3.7 or higher.
+
+Notes
+-----
+This module is created as material for the phase 2 project for DM857, DS830 (2023).
+"""
+import os
+import struct
+import sys
+from dataclasses import dataclass
+from typing import Optional
+import numpy as np
+from csr_helper import CSRGraph, csr_from_edges, index_dtype
+
+MAGIC = b"FFGRAPH\0"
+VERSION = 1
+HAS_CSR = 1
+HAS_COORDS = 2
+HAS_VERTEX_IDS = 4
+ALIGNMENT = 64
+
+# magic, version, flags, num_vertices, num_edges, edge dtype, index dtype,
+# offsets of edges, indptr, indices, vertex_ids, coords
+_HEADER = struct.Struct("<8sIIQQ8s8sQQQQQ")
+_SECTIONS = ("edges", "indptr", "indices", "vertex_ids", "coords")
+
+
+@dataclass
+class GraphFile:
+    """Each instance of this class holds the memory mapped sections of an opened graph file.
+
+    Parameters
+    ----------
+    edges: np.ndarray
+        (E,2) array of the edges with their original vertex ids
+    csr: Optional[CSRGraph], default = None
+        The stored CSR adjacency (with coordinates and vertex ids), if any
+    """
+    edges: np.ndarray
+    csr: Optional[CSRGraph] = None
+
+    def graph(self) -> CSRGraph:
+        """Return the CSR adjacency of the file, building it from the edges if none is stored"""
+
+        if self.csr is not None:
+            return self.csr
+        return csr_from_edges(self.edges, relabel=True)
+
+
+def write_graph_file(path: str,
+                     edges: np.ndarray,
+                     csr: Optional[CSRGraph] = None) -> None:
+    """Writes edges, and optionally the CSR adjacency with its coordinates and vertex ids, to a graph file
+
+    Parameters
+    ----------
+    path: str
+        Path of the graph file to write
+    edges: np.ndarray
+        (E,2) array (or list of tuples) of edges
+    csr: Optional[CSRGraph], default = None
+        CSR adjacency of the same graph, stored so it does not have to be rebuilt when opened
+    """
+    edges = np.asarray(edges).reshape(-1, 2)
+    largest = int(edges.max()) if len(edges) else 0
+    edges = edges.astype(np.int32 if -2 ** 31 <= int(edges.min(initial=0)) and largest < 2 ** 31 else np.int64)
+
+    arrays = {"edges": edges}
+    flags = 0
+    num_vertices = len(np.unique(edges)) if csr is None else csr.num_vertices()
+    if csr is not None:
+        flags |= HAS_CSR
+        arrays["indptr"] = np.asarray(csr.indptr, dtype=np.int64)
+        arrays["indices"] = np.asarray(csr.indices, dtype=index_dtype(num_vertices))
+        if csr.vertex_ids is not None:
+            flags |= HAS_VERTEX_IDS
+            arrays["vertex_ids"] = np.asarray(csr.vertex_ids, dtype=edges.dtype)
+        if csr.coords is not None:
+            flags |= HAS_COORDS
+            arrays["coords"] = np.asarray(csr.coords, dtype=np.float32)
+
+    # Lay out sections after the header, aligned so each can be memory mapped efficiently
+    offsets = {}
+    position = _align(_HEADER.size)
+    for name in _SECTIONS:
+        if name in arrays:
+            offsets[name] = position
+            position = _align(position + arrays[name].nbytes)
+
+    header = _HEADER.pack(MAGIC, VERSION, flags, num_vertices, len(edges),
+                          edges.dtype.str.encode(), arrays.get("indices", edges).dtype.str.encode(),
+                          *(offsets.get(name, 0) for name in _SECTIONS))
+
+    # Write to a temporary file first, so readers never see a partial graph file
+    temporary = f"{path}.tmp-{os.getpid()}"
+    with open(temporary, "wb") as file:
+        file.write(header)
+        for name in _SECTIONS:
+            if name in arrays:
+                file.seek(offsets[name])
+                file.write(np.ascontiguousarray(arrays[name]).tobytes())
+        file.truncate(position)
+    os.replace(temporary, path)
+
+
+def open_graph_file(path: str) -> GraphFile:
+    """Return the sections of a graph file, memory mapped read-only
+
+    Parameters
+    ----------
+    path: str
+        Path of the graph file
+    """
+    with open(path, "rb") as file:
+        fields = _HEADER.unpack(file.read(_HEADER.size))
+    magic, version, flags, num_vertices, num_edges, edge_dtype, index_dtype_code = fields[:7]
+    offsets = dict(zip(_SECTIONS, fields[7:]))
+
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a graph file")
+    if version > VERSION:
+        raise ValueError(f"{path} has graph file version {version}, only up to {VERSION} is supported")
+
+    edge_dtype = np.dtype(edge_dtype.rstrip(b"\0").decode())
+    index_dtype_code = np.dtype(index_dtype_code.rstrip(b"\0").decode())
+
+    def section(name: str, dtype: np.dtype, shape: tuple) -> np.ndarray:
+        if shape[0] == 0:
+            return np.empty(shape, dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode="r", offset=offsets[name], shape=shape)
+
+    edges = section("edges", edge_dtype, (num_edges, 2))
+    csr = None
+    if flags & HAS_CSR:
+        indptr = section("indptr", np.int64, (num_vertices + 1,))
+        csr = CSRGraph(indptr, section("indices", index_dtype_code, (int(indptr[-1]),)))
+        if flags & HAS_VERTEX_IDS:
+            csr.vertex_ids = section("vertex_ids", edge_dtype, (num_vertices,))
+        if flags & HAS_COORDS:
+            csr.coords = section("coords", np.float32, (num_vertices, 2))
+
+    return GraphFile(edges, csr)
+
+
+def is_graph_file(path: str) -> bool:
+    """Return true if path is a binary graph file
+
+    Parameters
+    ----------
+    path: str
+        Path of the file to check
+    """
+    try:
+        with open(path, "rb") as file:
+            return file.read(len(MAGIC)) == MAGIC
+    except IOError:
+        return False
+
+
+def convert_dat_file(dat_path: str,
+                     graph_path: str,
+                     with_csr: Optional[bool] = True) -> GraphFile:
+    """Converts a text .dat edge file into a binary graph file and returns the opened graph file
+
+    Parameters
+    ----------
+    dat_path: str
+        Path of the text edge file (see file_helper.create_graph_from_file)
+    graph_path: str
+        Path of the graph file to write
+    with_csr: Optional[bool], default = True
+        If True, the CSR adjacency is stored as well
+    """
+    import file_helper as fh
+
+    edges = fh.create_edge_array_from_file(dat_path)
+    write_graph_file(graph_path, edges, csr_from_edges(edges, relabel=True) if with_csr else None)
+
+    return open_graph_file(graph_path)
+
+
+def load_graph(path: str) -> CSRGraph:
+    """Return the CSRGraph of a binary graph file or of a text .dat edge file
+
+    Parameters
+    ----------
+    path: str
+        Path of the graph file or edge file
+    """
+    if is_graph_file(path):
+        return open_graph_file(path).graph()
+
+    import file_helper as fh
+    return csr_from_edges(fh.create_edge_array_from_file(path), relabel=True)
+
+
+def _align(position: int) -> int:
+    """Return position rounded up to the section alignment"""
+
+    return -(-position // ALIGNMENT) * ALIGNMENT
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python graphfile_helper.py input.dat output.ffg")
+        sys.exit(1)
+    graph_file = convert_dat_file(sys.argv[1], sys.argv[2])
+    print(f"Wrote {len(graph_file.edges)} edges to {sys.argv[2]}")
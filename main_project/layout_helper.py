@@ -0,0 +1,154 @@
+"""
+This module provides layouts for graphs without vertex coordinates, and helper functions, to:
+- spectral_layout:  place vertices by the low eigenvectors of the graph Laplacian, fast on large sparse graphs
+- compute_layout:   return the layout of a graph by method name ('spring', 'spectral' or 'auto')
+- cached_layout:    return the layout of a graph, computed once per edge set and method and cached on disk
+
+Layouts are cached in default_cache_dir()/layouts (see cache_helper), keyed by the content hash of the edge set,
+so re-running the same graph, in this or another process, reuses its layout.
+
+Requirements
+------------
+Package numpy https://numpy.org/ which can be installed via PIP.
+Package scipy https://scipy.org/  which can be installed via PIP.
+Package networkx https://networkx.org/ which can be installed via PIP.
+Python 3.7 or higher.
+
+Notes
+-----
+This module is created as material for the phase 2 project for DM857, DS830 (2023).
+"""
+import math
+import os
+from typing import Dict, Optional, Tuple
+import numpy as np
+import networkx as nx
+import cache_helper as cache
+
+# Graphs with more vertices get the spectral layout when the layout method is 'auto'
+SPRING_LAYOUT_MAX_NODES = 2000
+# Components this small are laid out with a dense eigensolver
+DENSE_EIGEN_MAX_NODES = 200
+LAYOUT_METHODS = ("spring", "spectral", "auto")
+
+
+def spectral_layout(graph: nx.Graph) -> Dict[int, Tuple[float, float]]:
+    """Return positions in [0,1]x[0,1] from the second and third eigenvectors of the Laplacian of each component.
+    Components are laid out separately and packed side by side, largest first.
+
+    Parameters
+    ----------
+    graph: nx.Graph
+        The graph to lay out
+    """
+    from scipy.sparse.csgraph import connected_components
+
+    nodes = list(graph.nodes())
+    if not nodes:
+        return {}
+    adjacency = nx.to_scipy_sparse_array(graph, nodelist=nodes, weight=None, format="csr").astype(float)
+    num_components, labels = connected_components(adjacency, directed=False)
+
+    coords = np.zeros((len(nodes), 2))
+    members = np.argsort(labels, kind="stable")
+    sizes = np.bincount(labels, minlength=num_components)
+    starts = np.concatenate(([0], np.cumsum(sizes)))
+
+    # Each component gets a square box with area proportional to its size, placed on shelves
+    width = math.sqrt(len(nodes)) * 1.2
+    x = y = shelf_height = 0.0
+    for component in np.argsort(-sizes, kind="stable"):
+        index = members[starts[component]:starts[component + 1]]
+        side = math.sqrt(len(index))
+        if x > 0 and x + side > width:
+            x, y, shelf_height = 0.0, y + shelf_height, 0.0
+        coords[index] = np.array([x, y]) + side * _component_layout(adjacency[index][:, index])
+        x += side * 1.1
+        shelf_height = max(shelf_height, side * 1.1)
+
+    # Scale into the unit square
+    coords -= coords.min(axis=0)
+    coords /= max(coords.max(), 1e-12)
+
+    return dict(zip(nodes, map(tuple, coords.tolist())))
+
+
+def compute_layout(graph: nx.Graph, method: Optional[str] = "auto") -> Dict[int, Tuple[float, float]]:
+    """Return the layout of graph
+
+    Parameters
+    ----------
+    graph: nx.Graph
+        The graph to lay out
+    method: Optional[str], default = 'auto'
+        'spring' (networkx spring layout), 'spectral' (see spectral_layout), or 'auto' for spring layout on graphs
+        with at most SPRING_LAYOUT_MAX_NODES vertices and spectral layout on larger graphs
+    """
+    method = _resolve(graph, method)
+    if method == "spring":
+        return {node: tuple(xy) for node, xy in nx.spring_layout(graph, k=2).items()}
+
+    return spectral_layout(graph)
+
+
+def cached_layout(graph: nx.Graph,
+                  method: Optional[str] = "auto",
+                  layout_cache: Optional["cache.GraphCache"] = None) -> Dict[int, Tuple[float, float]]:
+    """Return the layout of graph, from the layout cache if this edge set was laid out before with the same method
+
+    Parameters
+    ----------
+    graph: nx.Graph
+        The graph to lay out
+    method: Optional[str], default = 'auto'
+        Layout method, see compute_layout
+    layout_cache: Optional[GraphCache], default = None
+        Cache to use. If None, a cache in default_cache_dir()/layouts is used
+    """
+    method = _resolve(graph, method)
+    layout_cache = layout_cache or cache.GraphCache(os.path.join(cache.default_cache_dir(), "layouts"))
+
+    def create() -> Dict[str, np.ndarray]:
+        layout = compute_layout(graph, method)
+        return {"nodes": np.fromiter(layout.keys(), dtype=np.int64, count=len(layout)),
+                "coords": np.array(list(layout.values()), dtype=float).reshape(-1, 2)}
+
+    # Layouts are deterministic once cached, so the seed is fixed
+    key_params = {"edges": cache.edge_set_hash(np.array(list(graph.edges()), dtype=np.int64))}
+    arrays = layout_cache.get_or_create("layout_" + method, key_params, 0, create)
+
+    return dict(zip(arrays["nodes"].tolist(), map(tuple, np.asarray(arrays["coords"]).tolist())))
+
+
+def _resolve(graph: nx.Graph, method: str) -> str:
+    """Return the layout method used for graph, replacing 'auto' by 'spring' or 'spectral'"""
+
+    if method not in LAYOUT_METHODS:
+        raise Exception(f"layout, unknown layout method '{method}', use one of {', '.join(LAYOUT_METHODS)}")
+    if method == "auto":
+        return "spring" if graph.number_of_nodes() <= SPRING_LAYOUT_MAX_NODES else "spectral"
+    return method
+
+
+def _component_layout(adjacency) -> np.ndarray:
+    """Return (n,2) coordinates in [0,1]x[0,1] for one connected component given its sparse adjacency matrix"""
+
+    from scipy.sparse import diags
+    from scipy.sparse.linalg import eigsh
+
+    n = adjacency.shape[0]
+    if n <= 2:
+        return np.array([[0.0, 0.0], [1.0, 1.0]])[:n]
+
+    degrees = np.asarray(adjacency.sum(axis=1)).ravel()
+    laplacian = diags(degrees) - adjacency
+    if n <= DENSE_EIGEN_MAX_NODES:
+        _, vectors = np.linalg.eigh(laplacian.toarray())
+    else:
+        # Shift-invert just below zero finds the smallest eigenvalues with one sparse factorization
+        values, vectors = eigsh(laplacian.tocsc(), k=3, sigma=-1e-3, which="LM")
+        vectors = vectors[:, np.argsort(values)]
+
+    xy = vectors[:, 1:3]
+    xy = xy - xy.min(axis=0)
+    return xy / np.maximum(xy.max(axis=0), 1e-12)
@@ -0,0 +1,274 @@
+"""
+This module provides a set of helpers for accounting the memory used by a simulation, to:
+- deep_getsizeof:       Return the structural size (in bytes) of an object and everything it references
+- memory_breakdown:     Return the structural size of each subsystem of a ForestFireGraph
+- AllocationTracer:     A class that takes tracemalloc snapshots at chosen simulation steps
+- TraceSnapshot:        A dataclass storing the top allocation sites and growth at one simulation step
+- MemoryReport:         A dataclass collecting the breakdown and snapshots of one simulation run
+
+Requirements
+------------
+Python 3.7 or higher.
+
+Notes
+-----
+This module is created as material for the phase 2 project for DM857, DS830 (2023).
+"""
+import sys
+import tracemalloc
+import types
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+# Objects of these types are shared by the whole interpreter and are never charged to a subsystem
+_SHARED_TYPES = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType,
+                 types.MethodType, types.CodeType, types.FrameType)
+
+# Allocations made by the tracer itself are hidden from snapshots
+_TRACE_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+]
+
+
+@dataclass
+class TraceSnapshot:
+    """Each instance of this class stores the allocation statistics recorded at one simulation step.
+
+    Parameters
+    ----------
+    step: int
+        The simulation step at which the snapshot was taken (0 is before the first step)
+    total_bytes: int
+        Total size of the traced memory blocks still allocated at this step
+    top_sites: List[Tuple[str, int, int]]
+        The largest allocation sites as (file:line, size in bytes, number of blocks)
+    growth: List[Tuple[str, int, int]]
+        Allocation sites that grew the most since the previous snapshot as (file:line, size difference, block difference)
+    """
+    step: int
+    total_bytes: int = 0
+    top_sites: List[Tuple[str, int, int]] = field(default_factory=list)
+    growth: List[Tuple[str, int, int]] = field(default_factory=list)
+
+
+@dataclass
+class MemoryReport:
+    """Each instance of this class collects the memory accounting of one simulation run.
+
+    Parameters
+    ----------
+    breakdown: Dict[str, int], default = {}
+        Structural size in bytes of each subsystem of the simulated graph
+    snapshots: List[TraceSnapshot], default = []
+        tracemalloc snapshots taken at the requested simulation steps
+    """
+    breakdown: Dict[str, int] = field(default_factory=dict)
+    snapshots: List[TraceSnapshot] = field(default_factory=list)
+
+    def total(self) -> int:
+        """Return the summed structural size of all subsystems in bytes"""
+
+        return sum(self.breakdown.values())
+
+    def report(self) -> None:
+        """Prints the subsystem breakdown and allocation snapshots of the run"""
+
+        print("================================================")
+        print("Memory report")
+        print("================================================")
+
+        if self.breakdown:
+            print("Structural size per subsystem:")
+            for subsystem, size in sorted(self.breakdown.items(), key=lambda item: item[1], reverse=True):
+                print(f"  {subsystem:<22}{_format_bytes(size):>12}")
+            print(f"  {'total':<22}{_format_bytes(self.total()):>12}")
+
+        for snapshot in self.snapshots:
+            print(f"\nStep {snapshot.step}: {_format_bytes(snapshot.total_bytes)} traced")
+            print("  Top allocation sites:")
+            for location, size, count in snapshot.top_sites:
+                print(f"    {_format_bytes(size):>12} in {count:>8} blocks  {location}")
+            if snapshot.growth:
+                print("  Growth since previous snapshot:")
+                for location, size_diff, count_diff in snapshot.growth:
+                    print(f"    {_format_bytes(size_diff, signed=True):>12} {count_diff:>+9} blocks  {location}")
+
+
+class AllocationTracer:
+    """Each instance of this class takes tracemalloc snapshots at chosen steps of a simulation"""
+    def __init__(self, steps: List[int], top: Optional[int] = 10) -> None:
+        """
+        Parameters
+        ----------
+        steps: List[int]
+            Simulation steps after which a snapshot is taken. Step 0 is taken before the first step.
+        top: Optional[int], default = 10
+            Number of allocation sites stored per snapshot
+        """
+        self._steps = set(steps)
+        self._top = top
+        self._snapshots: List[TraceSnapshot] = []
+        self._previous: Optional[tracemalloc.Snapshot] = None
+        self._started_tracing = False
+
+    def start(self) -> None:
+        """Starts tracing memory allocations, unless tracemalloc is already running"""
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    def stop(self) -> List[TraceSnapshot]:
+        """Stops tracing (if this tracer started it) and returns the snapshots taken"""
+
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        self._previous = None
+
+        return self._snapshots
+
+    def snapshot(self, step: int) -> None:
+        """Takes a snapshot if step is one of the requested steps.
+
+        Parameters
+        ----------
+        step: int
+            The simulation step that has just completed
+        """
+        if step not in self._steps or not tracemalloc.is_tracing():
+            return
+
+        current = tracemalloc.take_snapshot().filter_traces(_TRACE_FILTERS)
+        statistics = current.statistics("lineno")
+
+        trace = TraceSnapshot(step=step, total_bytes=sum(stat.size for stat in statistics))
+        trace.top_sites = [(_format_location(stat.traceback), stat.size, stat.count)
+                           for stat in statistics[:self._top]]
+
+        # Compare with the previous snapshot to find the sites that grew
+        if self._previous is not None:
+            differences = current.compare_to(self._previous, "lineno")
+            trace.growth = [(_format_location(diff.traceback), diff.size_diff, diff.count_diff)
+                            for diff in differences[:self._top] if diff.size_diff > 0]
+
+        self._previous = current
+        self._snapshots.append(trace)
+
+
+def deep_getsizeof(obj: object, seen: Optional[Set[int]] = None) -> int:
+    """Return the size in bytes of obj and every object reachable from it.
+
+    Parameters
+    ----------
+    obj: object
+        The object to measure
+    seen: Optional[Set[int]], default = None
+        ids of objects that are already accounted for. Objects in seen are not counted again,
+        which makes it possible to charge shared objects to only one owner.
+    """
+    if seen is None:
+        seen = set()
+
+    size = 0
+    stack = [obj]
+
+    # Walk the reference graph iteratively, as patch maps are too large for recursion
+    while stack:
+        current = stack.pop()
+        if id(current) in seen or isinstance(current, _SHARED_TYPES):
+            continue
+        seen.add(id(current))
+        size += sys.getsizeof(current)
+
+        # numpy arrays that do not own their buffer are views, charge the buffer to the owner
+        base = getattr(current, "base", None)
+        if base is not None and hasattr(current, "nbytes"):
+            stack.append(base)
+
+        if isinstance(current, dict):
+            stack.extend(current.keys())
+            stack.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset)):
+            stack.extend(current)
+
+        # Follow instance attributes of regular and slotted classes
+        attributes = getattr(current, "__dict__", None)
+        if isinstance(attributes, dict):
+            stack.append(attributes)
+        for slot in getattr(type(current), "__slots__", ()):
+            if isinstance(slot, str) and hasattr(current, slot):
+                stack.append(getattr(current, slot))
+
+    return size
+
+
+def memory_breakdown(graph: object) -> Dict[str, int]:
+    """Return the structural size in bytes of each subsystem of a ForestFireGraph.
+
+    Objects referenced by several subsystems (eg. neighbour lists shared by the neighbour dictionary
+    and the patches) are charged to the first subsystem in the breakdown that references them. Whatever no
+    subsystem references (the graph object itself, its parameters and the rest of the visualiser) is charged
+    to "other", so the breakdown adds up to deep_getsizeof(graph).
+
+    Parameters
+    ----------
+    graph: ForestFireGraph
+        The graph to measure
+    """
+    seen: Set[int] = set()
+    breakdown = {}
+
+    # Order matters, shared objects are charged to the first subsystem listing them
+    subsystems = [
+        ("edges", "_edges"),
+        ("vertices_list", "_vertices_list"),
+        ("neighbour_lists", "_vertices_neighbours"),
+        ("clock", "_clock"),
+        ("patches_map", "_patches_map"),
+        ("pos_nodes", "_pos_nodes"),
+        ("color_map", "_color_map"),
+        ("firefighters", "_firefighters_list"),
+        ("components", "_components"),
+        ("component_of", "_component_of"),
+        ("component_counts", "_component_counts"),
+        ("patch_counts", "_patch_counts"),
+        ("graph_data", "_graph_data"),
+    ]
+    for name, attribute in subsystems:
+        breakdown[name] = deep_getsizeof(getattr(graph, attribute, None), seen)
+
+    # The visualiser is split into its graph, layout and matplotlib figure
+    visualiser = getattr(graph, "_vis_graph", None)
+    if visualiser is not None:
+        breakdown["vis_graph"] = deep_getsizeof(getattr(visualiser, "_H", None), seen)
+        breakdown["vis_layout"] = deep_getsizeof(getattr(visualiser, "_pos", None), seen)
+        breakdown["vis_colours"] = deep_getsizeof(getattr(visualiser, "_cmap", None), seen)
+        breakdown["vis_figure"] = deep_getsizeof(getattr(visualiser, "_fig", None), seen)
+
+    breakdown["other"] = deep_getsizeof(graph, seen)
+
+    return breakdown
+
+
+def _format_location(traceback: tracemalloc.Traceback) -> str:
+    """Return 'file:line' for the most recent frame of a traceback"""
+
+    frame = traceback[0]
+    return f"{frame.filename}:{frame.lineno}"
+
+
+def _format_bytes(size: int, signed: Optional[bool] = False) -> str:
+    """Return size as a human readable string, eg. '1.5 MiB'"""
+
+    sign = "+" if signed and size > 0 else ""
+    value = float(size)
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if abs(value) < 1024 or unit == "GiB":
+            break
+        value /= 1024
+
+    return f"{sign}{value:.1f} {unit}" if unit != "B" else f"{sign}{size} B"
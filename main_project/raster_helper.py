@@ -0,0 +1,271 @@
+"""
+This module provides RasterVisualiser, a class that displays the status of a simulation as an image instead of
+drawing a marker per vertex, and a helper function, to:
+- pixel_indices:    map vertex coordinates to pixels of an image of a given resolution
+
+Each vertex is binned into the pixel under its position. A pixel shows fire if any of its vertices is ignited
+(red, by the mean health of the burning trees), otherwise the mean health of its trees (green), otherwise grey for
+rock patches. Colours are looked up in one 8 bit table, so drawing a frame costs a few numpy passes over the vertices
+and the pixels, and the matplotlib work only depends on the resolution of the image.
+
+RasterVisualiser has the same methods as visualiser_random_forest_graph.Visualiser, so ForestFireGraph can use either.
+
+Requirements
+------------
+Package numpy https://numpy.org/ which can be installed via PIP.
+Package matplotlib https://matplotlib.org/ which can be installed via PIP.
+Python 3.7 or higher.
+
+Notes
+-----
+This module is created as material for the phase 2 project for DM857, DS830 (2023).
+"""
+from typing import Dict, List, Optional, Tuple, Union
+import numpy as np
+import matplotlib.pyplot as plt
+from csr_helper import CSRGraph
+
+# Colour lookup tables with a row per colour value 0..256, like Visualiser.colour_map
+GREENS = (plt.cm.Greens(np.arange(257))[:, :3] * 255).astype(np.uint8)
+REDS = (plt.cm.Reds(np.arange(257))[:, :3] * 255).astype(np.uint8)
+NO_COLOUR = (np.array(plt.cm.Greys(100)[:3]) * 255).astype(np.uint8)
+BACKGROUND = np.array([255, 255, 255], dtype=np.uint8)
+HIGHLIGHT = np.array([0, 0, 255], dtype=np.uint8)
+# Every pixel colour in one table: background, rock patches, trees by health, burning trees by health
+PALETTE = np.vstack([BACKGROUND, NO_COLOUR, GREENS, REDS])
+_TREES = 2
+_FIRE = _TREES + len(GREENS)
+
+
+def pixel_indices(coords: np.ndarray, resolution: int) -> Tuple[np.ndarray, int, int]:
+    """Return the flat pixel index of each vertex, and the width and height of the image.
+    The longest side of the coordinates gets resolution pixels, keeping the aspect ratio.
+
+    Parameters
+    ----------
+    coords: np.ndarray
+        (V,2) array of vertex positions
+    resolution: int
+        Number of pixels along the longest side of the image
+    """
+    coords = np.asarray(coords, dtype=float).reshape(-1, 2)
+    low = coords.min(axis=0) if len(coords) else np.zeros(2)
+    extent = coords.max(axis=0) - low if len(coords) else np.ones(2)
+    scale = (resolution - 1) / max(float(extent.max()), 1e-12)
+
+    width, height = (np.floor(extent * scale).astype(int) + 1).tolist()
+    columns = np.floor((coords[:, 0] - low[0]) * scale).astype(np.int64)
+    # Image rows grow downwards, so y is flipped
+    rows = height - 1 - np.floor((coords[:, 1] - low[1]) * scale).astype(np.int64)
+
+    return rows * width + columns, width, height
+
+
+class RasterVisualiser:
+    """Each instance of this class maintains a window displaying the status of the vertices of a simulation as an image"""
+    def __init__(self,
+                 edges: Union[List[Tuple[int, int]], CSRGraph],
+                 Colour_map: Optional[Dict[int, int]] = {},
+                 pos_nodes: Optional[Dict[int, Tuple[float, float]]] = {},
+                 resolution: Optional[int] = 800,
+                 window_title: Optional[str] = None,
+                 frame_pause: Optional[float] = 0.2,
+                 layout: Optional[str] = "auto",
+                 show: Optional[bool] = True) -> None:
+        """
+        Parameters
+        ----------
+        edges: Union[List[(int,int)], CSRGraph]
+            List containing the edges (Tuples of 2 vertices) of the graph, or a CSRGraph
+        Colour_map: Optional[Dict[int,int]], default = {}
+            Dictionary containing the identity and colour of each vertex,
+            from -256 (full red, burning) to 256 (full green). Vertices not in the map are rock patches
+        pos_nodes: Optional[Dict[int,(float,float)]], default = {}
+            Position of each vertex. If empty, the coordinates of a CSRGraph or a (cached) layout are used
+        resolution: Optional[int], default = 800
+            Number of pixels along the longest side of the image
+        window_title: Optional[str], default = None
+            The title of the window
+        frame_pause: Optional[float], default = 0.2
+            Seconds each frame is shown for
+        layout: Optional[str], default = "auto"
+            Layout used when there are no positions (see layout_helper)
+        show: Optional[bool], default = True
+            If False, no window is opened. Frames can still be saved or recorded
+        """
+        ids, coords = self._positions(edges, pos_nodes, layout)
+        self._ids = ids
+        self._pixels, self._width, self._height = pixel_indices(coords, resolution)
+        self._occupied = np.bincount(self._pixels, minlength=self._width * self._height) > 0
+        # Ids 0..V-1 in order index themselves, other ids are looked up in a dictionary
+        self._identity = bool(np.array_equal(ids, np.arange(len(ids))))
+        self._node_index = None if self._identity else {vertex: i for i, vertex in enumerate(ids.tolist())}
+
+        self._values = np.zeros(len(ids), dtype=np.int64)
+        self._is_tree = np.zeros(len(ids), dtype=bool)
+        self._highlighted = np.empty(0, dtype=np.int64)
+        self._image = np.empty((self._height, self._width, 3), dtype=np.uint8)
+        self._recorder = None
+        self._frame_pause = frame_pause
+
+        self._show = show
+        self._is_open = show
+        self._fig = None
+        if show:
+            self._fig, self._ax = plt.subplots()
+            self._ax.set_axis_off()
+            if window_title:
+                self._fig.canvas.manager.set_window_title(window_title)
+            def on_close(_) -> None:
+                self._is_open = False
+            self._fig.canvas.mpl_connect('close_event', on_close)
+            self._artist = None
+
+        self._set_colour_map(Colour_map)
+
+    def is_open(self) -> bool:
+        """Whether the window managed by the visualiser is open or not."""
+
+        return self._is_open
+
+    def close(self) -> None:
+        """Closes the window destroying this visualiser."""
+
+        if self._fig is not None:
+            plt.close(self._fig)
+        self._is_open = False
+
+    def wait_close(self) -> None:
+        """Suspends the current execution until the visualiser window is manually closed by the user."""
+
+        if self._fig is not None:
+            plt.show()
+
+    def set_recorder(self, recorder) -> None:
+        """Sends every following frame to recorder (see recorder_helper). Pass None to stop recording."""
+
+        self._recorder = recorder
+
+    def update_node_colours(self, Colour_map: Dict[int, int]) -> None:
+        """Informs this visualiser that the status of its colours has been updated."""
+
+        self._set_colour_map(Colour_map)
+        self._replot()
+
+    def update_node_values(self, values: np.ndarray, is_tree: Optional[np.ndarray] = None) -> None:
+        """Informs this visualiser of the colour value of every vertex, as an array in vertex order.
+        This avoids building a colour map dictionary for array based simulations.
+
+        Parameters
+        ----------
+        values: np.ndarray
+            (V) colour value of each vertex, from -256 (burning) to 256
+        is_tree: Optional[np.ndarray], default = None
+            (V) bool array, False for rock patches. If None, vertices with value 0 are rock patches
+        """
+        self._values = np.asarray(values, dtype=np.int64)
+        self._is_tree = self._values != 0 if is_tree is None else np.asarray(is_tree, dtype=bool)
+        self._replot()
+
+    def update_node_edges(self, lab_map: List[int]) -> None:
+        """Informs this visualiser of the vertices to highlight (eg. firefighters)."""
+
+        self._highlighted = self._index(lab_map)
+        self._replot()
+
+    def update_nodes(self, Colour_map: Dict[int, int], lab_map: List[int]) -> None:
+        """Informs this visualiser of the colours and the vertices to highlight of a step, drawing one frame."""
+
+        self._set_colour_map(Colour_map)
+        self._highlighted = self._index(lab_map)
+        self._replot()
+
+    def image(self) -> np.ndarray:
+        """Return the (height, width, 3) uint8 image of the current frame"""
+
+        return self._render()
+
+    def save(self, path: str) -> None:
+        """Saves the current frame as an image, eg. a .png file"""
+
+        plt.imsave(path, self._render())
+
+    def _set_colour_map(self, Colour_map: Dict[int, int]) -> None:
+        """Stores the colour map as arrays in vertex order"""
+
+        self._values = np.zeros(len(self._ids), dtype=np.int64)
+        self._is_tree = np.zeros(len(self._ids), dtype=bool)
+        if Colour_map:
+            index = self._index(Colour_map.keys())
+            self._values[index] = np.fromiter(Colour_map.values(), dtype=np.int64, count=len(Colour_map))
+            self._is_tree[index] = True
+
+    def _index(self, vertices) -> np.ndarray:
+        """Return the position of each vertex id in vertex order"""
+
+        if self._identity:
+            return np.fromiter(vertices, dtype=np.int64)
+        return np.fromiter((self._node_index[vertex] for vertex in vertices), dtype=np.int64)
+
+    def _render(self) -> np.ndarray:
+        """Return the image of the current vertex values, aggregated per pixel"""
+
+        size = self._width * self._height
+        pixels, values = self._pixels, self._values
+        if not self._is_tree.all():
+            pixels, values = pixels[self._is_tree], values[self._is_tree]
+
+        # One pass counts and sums trees (even keys) and burning trees (odd keys) of each pixel
+        keys = pixels * 2 + (values <= 0)
+        counts = np.bincount(keys, minlength=2 * size).reshape(size, 2)
+        sums = np.bincount(keys, weights=np.abs(values), minlength=2 * size).reshape(size, 2)
+        means = np.minimum(sums / np.maximum(counts, 1), 256).astype(np.int64)
+
+        # Every pixel gets a code into PALETTE: background, rock, tree health or fire, fire drawn over trees
+        # so fire fronts stay visible at any resolution
+        codes = np.where(counts[:, 1] > 0, _FIRE + means[:, 1],
+                         np.where(counts[:, 0] > 0, _TREES + means[:, 0], self._occupied.astype(np.int64)))
+        image = self._image.reshape(size, 3)
+        np.take(PALETTE, codes, axis=0, out=image)
+        if len(self._highlighted):
+            image[self._pixels[self._highlighted]] = HIGHLIGHT
+
+        return self._image
+
+    def _replot(self) -> None:
+        """Renders the frame, then displays and records it"""
+
+        image = self._render()
+        if self._recorder is not None:
+            self._recorder.record(image)
+        if not self._show or not self._is_open:
+            return
+
+        if self._artist is None:
+            self._artist = self._ax.imshow(image, interpolation="nearest")
+        else:
+            self._artist.set_data(image)
+        self._fig.canvas.draw_idle()
+        plt.show(block=False)
+        plt.pause(self._frame_pause)
+
+    @staticmethod
+    def _positions(edges: Union[List[Tuple[int, int]], CSRGraph],
+                   pos_nodes: Dict[int, Tuple[float, float]],
+                   layout: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the vertex ids and a (V,2) array of their positions"""
+
+        if pos_nodes:
+            ids = np.fromiter(pos_nodes.keys(), dtype=np.int64, count=len(pos_nodes))
+            return ids, np.array(list(pos_nodes.values()), dtype=float).reshape(-1, 2)
+        if isinstance(edges, CSRGraph) and edges.coords is not None:
+            return edges.ids(), np.asarray(edges.coords, dtype=float)
+
+        import networkx as nx
+        from layout_helper import cached_layout
+
+        graph = nx.Graph()
+        graph.add_edges_from(edges.iter_edges() if isinstance(edges, CSRGraph) else edges)
+        layout_pos = cached_layout(graph, layout)
+        ids = np.fromiter(layout_pos.keys(), dtype=np.int64, count=len(layout_pos))
+        return ids, np.array(list(layout_pos.values()), dtype=float).reshape(-1, 2)
@@ -0,0 +1,196 @@
+"""
+This module provides FrameRecorder, a class that writes the frames of a simulation to disk on a background thread.
+Frames are RGB(A) image arrays, eg. the canvas of a Visualiser, and are written as:
+- numbered PNG images:  if the path is a directory (or has no file extension), eg. 'frames/' -> frames/frame_00000.png
+- a GIF animation:      if the path ends with .gif
+- an MP4 video:         if the path ends with .mp4 (requires the ffmpeg program)
+
+Frames wait in a bounded queue. When the writer falls behind and the queue is full, recording a frame blocks
+until there is room again, so memory use stays bounded while encoding happens off the simulation thread.
+PNG images and MP4 videos are written frame by frame. A GIF animation is written when the recorder is closed, so its
+frames are kept until then, as palette images of a byte per pixel (about 300 KB for a 640x480 figure). GIF
+recordings are therefore limited to MAX_GIF_FRAMES frames; record longer runs as MP4 or PNG images.
+
+Requirements
+------------
+Package numpy https://numpy.org/ which can be installed via PIP.
+Package pillow https://python-pillow.org/ which is installed with matplotlib.
+Python 3.7 or higher.
+
+Notes
+-----
+This module is created as material for the phase 2 project for DM857, DS830 (2023).
+"""
+import os
+import queue
+import shutil
+import subprocess
+import threading
+from typing import List, Optional
+import numpy as np
+
+# Placed in the queue to tell the writer thread that no more frames follow
+_STOP = None
+# Most frames of a GIF animation, which are kept in memory until it is written
+MAX_GIF_FRAMES = 500
+
+
+class FrameRecorder:
+    """Each instance of this class encodes recorded frames to image files or an animation on a background thread"""
+    def __init__(self,
+                 path: str,
+                 fps: Optional[float] = 5,
+                 queue_size: Optional[int] = 8,
+                 frames: Optional[int] = None) -> None:
+        """
+        Parameters
+        ----------
+        path: str
+            Directory for numbered PNG images, or a file path ending with .gif or .mp4
+        fps: Optional[float], default = 5
+            Frames per second of GIF and MP4 animations
+        queue_size: Optional[int], default = 8
+            Number of frames that can wait to be written before record blocks
+        frames: Optional[int], default = None
+            Number of frames that will be recorded, if known. A GIF animation of more than MAX_GIF_FRAMES frames
+            is then refused here, before any frame is drawn, instead of when its frames run out
+        """
+        self._path = path
+        self._fps = fps
+        self._format = self._detect_format(path)
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._error: Optional[BaseException] = None
+        self._frames_written = 0
+        self._frames_recorded = 0
+        self._closed = False
+
+        # State of the encoders
+        self._gif_frames: List = []
+        self._ffmpeg: Optional[subprocess.Popen] = None
+
+        if self._format == "gif" and frames is not None and frames > MAX_GIF_FRAMES:
+            raise self._gif_limit_error()
+        if self._format == "png":
+            os.makedirs(path, exist_ok=True)
+        elif self._format == "mp4" and shutil.which("ffmpeg") is None:
+            raise Exception("FrameRecorder, recording .mp4 files requires the ffmpeg program")
+
+        self._thread = threading.Thread(target=self._write_frames, name="FrameRecorder", daemon=True)
+        self._thread.start()
+
+    def __enter__(self) -> "FrameRecorder":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def frames_written(self) -> int:
+        """Return the number of frames encoded so far"""
+
+        return self._frames_written
+
+    def record(self, frame: np.ndarray) -> None:
+        """Queues a copy of frame for writing, waiting for room if the queue is full
+
+        Parameters
+        ----------
+        frame: np.ndarray
+            (height, width, 3) or (height, width, 4) uint8 image
+        """
+        if self._closed:
+            raise Exception("FrameRecorder, cannot record frames after close")
+        if self._error is not None:
+            raise self._error
+        if self._format == "gif" and self._frames_recorded >= MAX_GIF_FRAMES:
+            raise self._gif_limit_error()
+
+        # The caller may reuse its buffer (eg. the canvas) for the next frame, so a copy is queued
+        self._queue.put(np.array(frame[..., :3], dtype=np.uint8, copy=True))
+        self._frames_recorded += 1
+
+    def close(self) -> None:
+        """Writes the remaining frames and finishes the output file. Raises any error from the writer thread"""
+
+        if not self._closed:
+            self._closed = True
+            self._queue.put(_STOP)
+            self._thread.join()
+
+        if self._error is not None:
+            raise self._error
+
+    def _write_frames(self) -> None:
+        """Writes frames from the queue until close is called (runs on the writer thread)"""
+
+        while True:
+            frame = self._queue.get()
+            if frame is _STOP:
+                break
+            if self._error is not None:
+                # Keep emptying the queue so record never blocks after an error
+                continue
+            try:
+                self._write(frame)
+                self._frames_written += 1
+            except Exception as error:
+                self._error = error
+
+        try:
+            self._finish()
+        except Exception as error:
+            self._error = self._error or error
+
+    def _write(self, frame: np.ndarray) -> None:
+        """Encodes one frame"""
+
+        from PIL import Image
+
+        if self._format == "png":
+            Image.fromarray(frame).save(os.path.join(self._path, f"frame_{self._frames_written:05d}.png"))
+        elif self._format == "gif":
+            # Palette images take a byte per pixel, so frames are kept until the animation is written
+            self._gif_frames.append(Image.fromarray(frame).quantize(colors=256))
+        else:
+            if self._ffmpeg is None:
+                self._ffmpeg = self._start_ffmpeg(frame.shape[1], frame.shape[0])
+            self._ffmpeg.stdin.write(frame.tobytes())
+
+    def _finish(self) -> None:
+        """Writes the animation file, if any"""
+
+        if self._format == "gif" and self._gif_frames:
+            self._gif_frames[0].save(self._path, save_all=True, append_images=self._gif_frames[1:],
+                                     duration=int(1000 / self._fps), loop=0)
+            self._gif_frames = []
+        elif self._format == "mp4" and self._ffmpeg is not None:
+            self._ffmpeg.stdin.close()
+            if self._ffmpeg.wait() != 0:
+                raise Exception(f"FrameRecorder, ffmpeg failed writing {self._path}")
+
+    def _start_ffmpeg(self, width: int, height: int) -> subprocess.Popen:
+        """Return an ffmpeg process encoding raw RGB frames of the given size from its standard input"""
+
+        # H.264 needs even dimensions, so odd frames are padded by a pixel
+        return subprocess.Popen(
+            ["ffmpeg", "-y", "-loglevel", "error", "-f", "rawvideo", "-pix_fmt", "rgb24",
+             "-s", f"{width}x{height}", "-r", str(self._fps), "-i", "-",
+             "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2", "-pix_fmt", "yuv420p", self._path],
+            stdin=subprocess.PIPE)
+
+    @staticmethod
+    def _gif_limit_error() -> Exception:
+        """Return the error raised when a GIF animation would hold more than MAX_GIF_FRAMES frames"""
+
+        return Exception(f"FrameRecorder, a GIF animation holds at most {MAX_GIF_FRAMES} frames, "
+                         f"record to .mp4 or a directory of PNG images instead")
+
+    @staticmethod
+    def _detect_format(path: str) -> str:
+        """Return 'png', 'gif' or 'mp4' depending on the path"""
+
+        extension = os.path.splitext(path)[1].lower()
+        if extension == "" or path.endswith(os.sep) or os.path.isdir(path):
+            return "png"
+        if extension in (".gif", ".mp4"):
+            return extension[1:]
+        raise Exception(f"FrameRecorder, unsupported recording format '{extension}', use a directory, .gif or .mp4")
@@ -0,0 +1,157 @@
+"""
+This module provides functions that renumber the vertices of a CSRGraph so neighbouring vertices get nearby numbers,
+and the neighbour gathers of the array engines read memory close together, to:
+- hilbert_order:    return the vertex order along a Hilbert curve over the vertex positions
+- morton_order:     return the vertex order along a Morton (Z-order) curve over the vertex positions
+- rcm_order:        return the reverse Cuthill-McKee order of the vertices, for graphs without positions
+- reorder_csr:      return a CSRGraph with its vertices renumbered in one of the orders above
+
+Reordering is transparent: the original id of every vertex is kept in the vertex_ids of the reordered graph, so
+neighbour_lists, positions and iter_edges return the same ids as before.
+
+Requirements
+------------
+Package numpy https://numpy.org/ which can be installed via PIP.
+Package scipy https://scipy.org/ which can be installed via PIP, for rcm_order only.
+Python 3.7 or higher.
+
+Notes
+-----
+This module is created as material for the phase 2 project for DM857, DS830 (2023).
+"""
+from typing import Callable, Dict, Optional
+import numpy as np
+from csr_helper import CSRGraph
+
+# Bits per coordinate of the grid the positions are snapped to for the space filling curves
+CURVE_BITS = 16
+
+
+def _grid_coordinates(coords: np.ndarray, bits: int) -> np.ndarray:
+    """Return the (V,2) int64 cells of positions on a 2**bits x 2**bits grid over their bounding box"""
+
+    coords = np.asarray(coords, dtype=np.float64)
+    low = coords.min(axis=0)
+    extent = np.maximum(coords.max(axis=0) - low, np.finfo(np.float64).tiny)
+    cells = (coords - low) / extent * ((1 << bits) - 1)
+
+    return np.rint(cells).astype(np.int64)
+
+
+def hilbert_order(coords: np.ndarray, bits: Optional[int] = CURVE_BITS) -> np.ndarray:
+    """Return the vertex numbers sorted along a Hilbert curve over their positions
+
+    Parameters
+    ----------
+    coords: np.ndarray
+        (V,2) position of each vertex
+    bits: Optional[int], default = CURVE_BITS
+        Bits per coordinate of the curve
+    """
+    if len(coords) == 0:
+        return np.zeros(0, dtype=np.int64)
+    cells = _grid_coordinates(coords, bits)
+    x, y = cells[:, 0], cells[:, 1]
+    keys = np.zeros(len(cells), dtype=np.int64)
+
+    # From the largest quadrant down, add the quadrant number along the curve and rotate the quadrant into place
+    side = 1 << bits
+    s = side >> 1
+    while s > 0:
+        rx = (x & s) > 0
+        ry = (y & s) > 0
+        keys += s * s * ((3 * rx) ^ ry)
+        flip = ~ry & rx
+        x = np.where(flip, side - 1 - x, x)
+        y = np.where(flip, side - 1 - y, y)
+        x, y = np.where(ry, x, y), np.where(ry, y, x)
+        s >>= 1
+
+    return np.argsort(keys, kind="stable")
+
+
+def morton_order(coords: np.ndarray, bits: Optional[int] = CURVE_BITS) -> np.ndarray:
+    """Return the vertex numbers sorted along a Morton (Z-order) curve over their positions
+
+    Parameters
+    ----------
+    coords: np.ndarray
+        (V,2) position of each vertex
+    bits: Optional[int], default = CURVE_BITS
+        Bits per coordinate of the curve
+    """
+    if len(coords) == 0:
+        return np.zeros(0, dtype=np.int64)
+    cells = _grid_coordinates(coords, bits)
+
+    # Interleave the bits of the two coordinates, x in the even bits
+    keys = np.zeros(len(cells), dtype=np.int64)
+    for bit in range(bits):
+        keys |= ((cells[:, 0] >> bit) & 1) << (2 * bit)
+        keys |= ((cells[:, 1] >> bit) & 1) << (2 * bit + 1)
+
+    return np.argsort(keys, kind="stable")
+
+
+def rcm_order(graph: CSRGraph) -> np.ndarray:
+    """Return the vertex numbers in reverse Cuthill-McKee order, which keeps neighbours close without positions
+
+    Parameters
+    ----------
+    graph: CSRGraph
+        The graph to order
+    """
+    from scipy.sparse import csr_matrix
+    from scipy.sparse.csgraph import reverse_cuthill_mckee
+
+    num_vertices = graph.num_vertices()
+    matrix = csr_matrix((np.ones(len(graph.indices), dtype=np.int8), np.asarray(graph.indices),
+                         np.asarray(graph.indptr)), shape=(num_vertices, num_vertices))
+
+    return np.asarray(reverse_cuthill_mckee(matrix, symmetric_mode=True), dtype=np.int64)
+
+
+# Vertex orders by name. Each takes a graph and returns the old vertex number of each new vertex number
+ORDERS: Dict[str, Callable[[CSRGraph], np.ndarray]] = {
+    "hilbert": lambda graph: hilbert_order(graph.coords),
+    "morton": lambda graph: morton_order(graph.coords),
+    "rcm": rcm_order,
+}
+
+
+def reorder_csr(graph: CSRGraph, order: Optional[str] = "auto") -> CSRGraph:
+    """Return the graph with its vertices renumbered in an order of ORDERS, keeping the original vertex ids
+
+    Parameters
+    ----------
+    graph: CSRGraph
+        The graph to reorder
+    order: Optional[str], default = "auto"
+        Name of an order in ORDERS, or "auto" for a Hilbert curve if the graph has positions and reverse
+        Cuthill-McKee otherwise
+    """
+    if order == "auto":
+        order = "hilbert" if graph.coords is not None else "rcm"
+    if order not in ORDERS:
+        raise Exception(f"reorder_csr, unknown order '{order}', use one of auto, {', '.join(ORDERS)}")
+    if order != "rcm" and graph.coords is None:
+        raise Exception(f"reorder_csr, the {order} order needs vertex positions")
+
+    # permutation[new] is the old number of a vertex, rank[old] its new number
+    permutation = ORDERS[order](graph)
+    rank = np.empty_like(permutation)
+    rank[permutation] = np.arange(len(permutation))
+
+    # Rows in the new order, with the neighbours of each row renumbered and sorted again
+    degrees = graph.degrees()[permutation]
+    indptr = np.zeros(len(permutation) + 1, dtype=np.int64)
+    np.cumsum(degrees, out=indptr[1:])
+    old_starts = np.asarray(graph.indptr)[permutation]
+    slots = np.arange(indptr[-1]) + np.repeat(old_starts - indptr[:-1], degrees)
+    rows = np.repeat(np.arange(len(permutation)), degrees)
+    neighbours = rank[np.asarray(graph.indices)[slots]]
+    indices = neighbours[np.lexsort((neighbours, rows))].astype(graph.indices.dtype)
+
+    coords = None if graph.coords is None else np.asarray(graph.coords)[permutation]
+
+    return CSRGraph(indptr, indices, coords, graph.ids()[permutation])
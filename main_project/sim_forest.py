@@ -1,8 +1,23 @@
+import heapq
+import sys
 import time
-from class_helper import Firefighter, Treepatch, Rockpatch, Graphdata
-from visualiser_random_forest_graph import Visualiser
+from class_helper import Firefighter, Treepatch, Rockpatch, Graphdata, UpdateClock
+from memory_helper import AllocationTracer, MemoryReport, memory_breakdown
+import math
 import random
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Optional, Tuple, Union, TYPE_CHECKING
+
+# The renderers (matplotlib, networkx), the recorder and numpy are imported when used, so headless runs start fast
+if TYPE_CHECKING:
+    from csr_helper import CSRGraph
+
+
+def _is_csr_graph(edges) -> bool:
+    """Return true if edges is a CSRGraph. A CSRGraph can only exist once csr_helper is imported, so it is not imported here"""
+
+    csr_helper = sys.modules.get("csr_helper")
+    return csr_helper is not None and isinstance(edges, csr_helper.CSRGraph)
+
 
 class ForestFireGraph:
     """This is the base class for representing patches of land as a vertices on a graph. 
@@ -13,7 +28,7 @@ class ForestFireGraph:
 
     def __init__(
         self,
-        edges: Optional[List[Tuple[int,int]]],
+        edges: Optional[Union[List[Tuple[int,int]], "CSRGraph"]],
         pos_nodes: Optional[Dict] = {},
         tree_distribution: Optional[int] = 80,
         firefighters: Optional[int] = 3,
@@ -21,15 +36,17 @@ class ForestFireGraph:
         fire_spread_prob: Optional[int] = 30,
         rock_mutate_prob: Optional[int] = 1,
         sim_time: Optional[int] = 10,
-        firefighter_average_skill: Optional[int] = 25
+        firefighter_average_skill: Optional[int] = 25,
+        renderer: Optional[str] = "graph"
         ):
         """
         Parameters
         ----------
-        edges: List[(int,int)]
-            List containing the edges (Tuples of 2 vertices) forming the 2D surface for the graph.
+        edges: Union[List[(int,int)], CSRGraph]
+            List containing the edges (Tuples of 2 vertices) forming the 2D surface for the graph,
+            or a CSRGraph (eg. from generator_helper) holding the adjacency as arrays.
         pos_nodes: Optional[dict], default = {}
-            Optional argument. Stores graph position of nodes if provided.
+            Optional argument. Stores graph position of nodes if provided. Taken from the CSRGraph coordinates if empty.
         firefighters: Optional[int], default = 3
             Firefighters for initializing firefighter class
         tree_distribution: Optional[int], default = 80
@@ -44,10 +61,16 @@ class ForestFireGraph:
             The number of simulation steps for the purpose of simulating wildfire evolution.
         firefighter_average_skill: Optional[int], default = 25
             The average skill of instances of class firefighter
+        renderer: Optional[str], default = "graph"
+            "graph" draws every patch and edge (Visualiser), "raster" draws the patches as an image (RasterVisualiser),
+            which stays fast on graphs with millions of patches. None runs headless: nothing is drawn and
+            simulate does not pause between steps
         """
 
         self._edges = edges
         self._pos_nodes = pos_nodes
+        if _is_csr_graph(edges) and not pos_nodes:
+            self._pos_nodes = edges.positions()
         self._number_of_firefighters = firefighters
         self._autocombustion = autocombustion
         self._tree_distribution = tree_distribution
@@ -56,7 +79,13 @@ class ForestFireGraph:
         self._sim_time = sim_time
         self._vertices_list = self._create_vertices_list()
         self._vertices_neighbours = self._create_neighbour_dict()
+        self._clock = UpdateClock()                                     # Tree patches regrow lazily by this clock
         self._patches_map = self._populate_patches()                    # Map patch type to vertex
+        self._components = self._find_components()                      # Connected components, evolved separately
+        self._component_of = {vertex: index                             # Map vertex to the index of its component
+                              for index, component in enumerate(self._components) for _, vertex in component}
+        self._component_counts: List[List[int]] = []                    # Patch counts per component, see _count_components
+        self._patch_counts: List[int] = []                              # Patch counts of the whole graph
         self._color_map : List[Tuple[int,int]] = {}                     # Map colors to vertices
 
         # Create firefighters for the simulation
@@ -65,11 +94,19 @@ class ForestFireGraph:
         self._deploy_firefighters()                                     # Map firefighters to vertex
 
         # Create visual representation of ForestFireGraph
-        self._vis_graph = Visualiser(self._edges, vis_labels=True, node_size=50, pos_nodes=self._pos_nodes)
+        if renderer is None:
+            self._vis_graph = None
+        elif renderer == "raster":
+            from raster_helper import RasterVisualiser
+            self._vis_graph = RasterVisualiser(self._edges, pos_nodes=self._pos_nodes)
+        else:
+            from visualiser_random_forest_graph import Visualiser
+            self._vis_graph = Visualiser(self._edges, vis_labels=True, node_size=50, pos_nodes=self._pos_nodes)
     
         # Initial mapping of landpatches color
-        self._update_color_map()
-        self._vis_graph.update_node_colours(self._color_map)
+        if self._vis_graph is not None:
+            self._update_color_map()
+            self._vis_graph.update_node_colours(self._color_map)
 
         # Create data class instance to store graph data
         self._graph_data = Graphdata()
@@ -82,6 +119,10 @@ class ForestFireGraph:
 
         edges = self._edges
 
+        # Vertices of a CSRGraph are read from its arrays, without building edge tuples
+        if _is_csr_graph(edges):
+            return edges.ids()[edges.degrees() > 0].tolist()
+
         # Create vertices list
         graph_vertices = []
 
@@ -101,6 +142,9 @@ class ForestFireGraph:
 
         vertices_list = self._vertices_list
         edges = self._edges
+
+        if _is_csr_graph(edges):
+            return edges.neighbour_lists()
         vertices_neighbours = {}
 
         # add neighbours to dictionary
@@ -125,6 +169,36 @@ class ForestFireGraph:
 
         return vertices_neighbours
 
+    def _find_components(self) -> List[List[Tuple[int, int]]]:
+        """Return the connected components of the graph, each a list of (position, vertex) sorted by the position of
+        the vertex in the patch map. The components are ordered by their first vertex"""
+
+        neighbours = self._vertices_neighbours
+        positions = {vertex: position for position, vertex in enumerate(self._vertices_list)}
+
+        components = []
+        seen = set()
+        for vertex in self._vertices_list:
+            if vertex in seen:
+                continue
+
+            # Collect the component of vertex by depth first search
+            seen.add(vertex)
+            stack = [vertex]
+            component = []
+            while stack:
+                current = stack.pop()
+                component.append((positions[current], current))
+                for neighbour in neighbours[current]:
+                    if neighbour not in seen:
+                        seen.add(neighbour)
+                        stack.append(neighbour)
+
+            component.sort()
+            components.append(component)
+
+        return components
+
     # Landpatces specific methods
     def _populate_patches(self) -> Dict:
         """Populates the vertices of a graph by connecting it to an instance of either Rockpatch or Treepatch class"""
@@ -134,19 +208,19 @@ class ForestFireGraph:
         neighbours = self._vertices_neighbours
 
         # Randomly select 'tree_count' vertices to be tree patches
-        tree_vertices = random.sample(vertices, tree_count)
+        tree_vertices = set(random.sample(vertices, tree_count))
 
         # Dictionary mapping vertex to patch class
         patch_map = {}
 
-        for vertex in vertices:
+        for position, vertex in enumerate(vertices):
             # Check if the current vertex should be a tree or rock patch
             if vertex in tree_vertices:
                 patch_map[vertex] = Treepatch(id = vertex, autocombustion_prob=self._autocombustion, 
-                                              neighbour_ids=neighbours[vertex])
+                                              neighbour_ids=neighbours[vertex], clock=self._clock, position=position)
             else:
                 patch_map[vertex] = Rockpatch(id = vertex, mutate_chance = self._rock_mutate_prob, 
-                                              neighbour_ids=neighbours[vertex]) 
+                                              neighbour_ids=neighbours[vertex], clock=self._clock, position=position)
         
         return patch_map
     
@@ -193,60 +267,277 @@ class ForestFireGraph:
         data._firefighters = [self._number_of_firefighters]
         data._ignited_tree_patches = [0]
 
-    def simulate(self):
-        """Simulates the evolution of wildfire by evolving the patches and fire fighters, storing data, and updating the graph visualisation"""
-        simulation_count = 0
-        while simulation_count < self._sim_time:
-            
-            # Evolve patches 1 evolution step
-            # Iterates over patches map
-            for vertex, patch in self._patches_map.items():
-                # Applies treepatch dynamics
-                if isinstance(patch, Treepatch):
-                    patch.updateland() #fix evolve method and replace with updateland method ## create autocombustion in updateland
-                    if patch._ignited:
-                        self.spread_fire(patch._neighbour_ids)
-
-                    if patch._tree_health < 0:
-                        self._patches_map[vertex] = patch.mutate()
-                    else:
-                        patch.updateland()
-                
-                if isinstance(patch, Rockpatch):
-                    # Probability for rocpatches turning into treepatches
-                    if random.randint(0, 100) <= patch._mutate_chance:
-                        self._patches_map[vertex] = patch.mutate(autocombustion_prob=self._autocombustion, 
-                                                                 tree_health=random.randint(1, 256))
-
-            # Evolve firefighters 1 evolution step
-            for firefighter in self._firefighters_list:
-                firefighter_patch = self._patches_map[firefighter._current_patch]
-                if isinstance(firefighter_patch, Treepatch) and firefighter_patch._ignited and firefighter.isAlive:
-                    firefighter.extinguish_fire(firefighter_patch)
-                else:
-                    for id in firefighter_patch.get_neighbour_ids():
-                        if(isinstance(self._patches_map[id], Treepatch) and self._patches_map[id]._ignited):
-                            firefighter._current_patch = id
+    def _patch_state(self, patch: Union[Treepatch, Rockpatch]) -> Tuple[int, int, int, int]:
+        """Return the counts a patch adds to the patch counts: tree patches, rock patches, ignited tree patches and
+        tree patches put out below zero health (which still regrow eagerly and may turn into rock)
+
+        Parameters
+        ----------
+        patch: Union[Treepatch, Rockpatch]
+            The patch to count
+        """
+        if isinstance(patch, Rockpatch):
+            return 0, 1, 0, 0
+        if patch._ignited:
+            return 1, 0, 1, 0
+        return 1, 0, 0, 1 if patch._health < 0 else 0
 
-                    #change firefighters _current_patch attribute
-                    firefighter._current_patch = random.sample(firefighter_patch.get_neighbour_ids(), 1)[0]
+    def _count_components(self) -> None:
+        """Counts the patches of each component and of the whole graph, see _patch_state. The counts are kept up to
+        date by _recount_patch while simulating"""
 
-            # Update data
-            self._graph_data.update_patches(self._patches_map)
+        self._component_counts = []
+        for component in self._components:
+            counts = [0, 0, 0, 0]
+            for position, vertex in component:
+                for index, count in enumerate(self._patch_state(self._patches_map[vertex])):
+                    counts[index] += count
+            self._component_counts.append(counts)
 
-            # update graph
-            self._update_color_map()
-            self._vis_graph.update_node_colours(self._color_map) 
+        self._patch_counts = [sum(counts[index] for counts in self._component_counts) for index in range(3)]
+
+    def _recount_patch(self, vertex: int, before: Tuple[int, int, int, int]) -> None:
+        """Updates the patch counts after the patch of a vertex changed
 
-            # add firefigther patch ids to list of ids, and use this to color map edges blue where firefighters are present
-            firefighter_patch_ids = []
-            for firefighter in self._firefighters_list:
-                firefighter_patch_ids.append(firefighter._current_patch)
-            self._vis_graph.update_node_edges(firefighter_patch_ids)
+        Parameters
+        ----------
+        vertex: int
+            The vertex of the patch
+        before: Tuple[int,int,int,int]
+            _patch_state of the patch before it changed
+        """
+        after = self._patch_state(self._patches_map[vertex])
+        if after == before:
+            return
+
+        counts = self._component_counts[self._component_of[vertex]]
+        for index in range(4):
+            counts[index] += after[index] - before[index]
+        for index in range(3):
+            self._patch_counts[index] += after[index] - before[index]
+
+    def _component_wake(self, index: int) -> float:
+        """Return the first step a component needs to be evolved in. A component with fire, or with trees put out below
+        zero health, is evolved in every step. In a component without them nothing changes until a tree autocombusts
+        or a rock turns into a tree: its trees only regrow, which the clock does for them, and nothing reaches them
+        from other components. Infinite if nothing ever changes
+
+        Parameters
+        ----------
+        index: int
+            Index of the component in _components
+        """
+        counts = self._component_counts[index]
+        if counts[2] or counts[3]:
+            return 0
+
+        wake = math.inf
+        for position, vertex in self._components[index]:
+            patch = self._patches_map[vertex]
+            # Patches without a clock draw in every step, so their component never sleeps
+            if patch._clock is None:
+                return 0
+            if isinstance(patch, Rockpatch):
+                wake = min(wake, patch._mutates_at)
+            else:
+                wake = min(wake, UpdateClock.step_of_update(patch._combusts_at))
+
+        return wake
+
+    def simulate(self, 
+                 memory_report: Optional[bool] = False, 
+                 trace_steps: Optional[List[int]] = None, 
+                 trace_top: Optional[int] = 10,
+                 record_to: Optional[str] = None,
+                 record_fps: Optional[float] = 5) -> Optional[MemoryReport]:
+        """Simulates the evolution of wildfire by evolving the patches and fire fighters, storing data, and updating the graph visualisation
 
-            simulation_count += 1
+        Parameters
+        ----------
+        memory_report: Optional[bool], default = False
+            If True, the structural size of each subsystem of the graph is measured after the simulation
+        trace_steps: Optional[List[int]], default = None
+            If provided, tracemalloc snapshots of the top allocation sites are taken after each listed step
+            (step 0 is taken before the first step)
+        trace_top: Optional[int], default = 10
+            Number of allocation sites stored per tracemalloc snapshot
+        record_to: Optional[str], default = None
+            If provided, the frames are recorded in the background to a directory of PNG images, a .gif or an .mp4
+            file (see recorder_helper), instead of saving each frame to generic_graph_1.pdf. One frame is recorded
+            per step, and a .gif is refused before the run if sim_time is above recorder_helper.MAX_GIF_FRAMES
+        record_fps: Optional[float], default = 5
+            Frames per second of a recorded animation
+
+        Return: Optional[MemoryReport]
+        ----------
+            The memory report of the run if memory_report or trace_steps is set, None otherwise
+        """
+        tracer = None
+        recorder = None
+        snapshots = None
+        try:
+            if trace_steps:
+                tracer = AllocationTracer(trace_steps, top=trace_top)
+                tracer.start()
+                tracer.snapshot(0)
+
+            # Frames are encoded on a background thread while the simulation runs
+            if record_to:
+                if self._vis_graph is None:
+                    raise Exception("simulate, frames can not be recorded without a renderer")
+                from recorder_helper import FrameRecorder
+                recorder = FrameRecorder(record_to, fps=record_fps, frames=self._sim_time)
+                self._vis_graph.set_recorder(recorder)
+
+            # The clock tells lazily regrowing tree patches which patches have been updated, see UpdateClock
+            clock = self._clock
+
+            # Components without fire sleep until a tree autocombusts or a rock turns into a tree (see
+            # _component_wake), waiting in a heap by the step they wake at. The patch counts are kept up to date
+            # as patches change, so sleeping components cost nothing
+            components = self._components
+            self._count_components()
+            active = []
+            sleeping = []
+            for index in range(len(components)):
+                wake = self._component_wake(index)
+                if wake < math.inf:
+                    sleeping.append((wake, index))
+            heapq.heapify(sleeping)
+
+            simulation_count = 0
+            while simulation_count < self._sim_time:
+                # Wake the components where a patch changes in this step
+                while sleeping and sleeping[0][0] <= simulation_count:
+                    active.append(heapq.heappop(sleeping)[1])
+                active.sort()
+            
+                # Evolve patches 1 evolution step
+                # Iterates over the patches of the active components
+                for index in active:
+                    for position, vertex in components[index]:
+                        self._evolve_patch(position, vertex, self._patches_map[vertex])
+
+                clock.position = len(self._patches_map)
+
+                # Evolve firefighters 1 evolution step
+                for firefighter in self._firefighters_list:
+                    firefighter_patch = self._patches_map[firefighter._current_patch]
+                    if isinstance(firefighter_patch, Treepatch) and firefighter_patch._ignited and firefighter.isAlive:
+                        before = self._patch_state(firefighter_patch)
+                        firefighter.extinguish_fire(firefighter_patch)
+                        self._recount_patch(firefighter._current_patch, before)
+                    else:
+                        for id in firefighter_patch.get_neighbour_ids():
+                            if(isinstance(self._patches_map[id], Treepatch) and self._patches_map[id]._ignited):
+                                firefighter._current_patch = id
+
+                        #change firefighters _current_patch attribute
+                        firefighter._current_patch = random.sample(firefighter_patch.get_neighbour_ids(), 1)[0]
+
+                # Components left without fire, or trees put out below zero health, fall asleep
+                still_active = []
+                for index in active:
+                    wake = self._component_wake(index)
+                    if wake <= simulation_count + 1:
+                        still_active.append(index)
+                    elif wake < math.inf:
+                        heapq.heappush(sleeping, (wake, index))
+                active = still_active
+
+                # Update data
+                self._graph_data.append_patch_counts(*self._patch_counts)
+
+                # update graph, headless runs skip drawing
+                if self._vis_graph is not None:
+                    self._update_color_map()
+
+                    # add firefigther patch ids to list of ids, and use this to color map edges blue where firefighters are present
+                    firefighter_patch_ids = []
+                    for firefighter in self._firefighters_list:
+                        firefighter_patch_ids.append(firefighter._current_patch)
+                    # One frame per step, so recordings hold sim_time frames
+                    self._vis_graph.update_nodes(self._color_map, firefighter_patch_ids)
+
+                simulation_count += 1
+                clock.step = simulation_count
+                clock.position = 0
+
+                if tracer:
+                    tracer.snapshot(simulation_count)
+
+                if self._vis_graph is not None:
+                    time.sleep(0.9) # add delay to show graph between steps
+        finally:
+            # Wait for the remaining frames to be written, also when the run is interrupted, so the output file is
+            # finished and the writer thread and ffmpeg are not left running
+            if recorder:
+                self._vis_graph.set_recorder(None)
+                recorder.close()
+
+            # Tracing is stopped also when the run fails, so tracemalloc does not run on for the rest of the process
+            if tracer:
+                snapshots = tracer.stop()
+
+        # Collect memory accounting of the run
+        if not (memory_report or tracer):
+            return None
+
+        report = MemoryReport()
+        if tracer:
+            report.snapshots = snapshots
+        if memory_report:
+            report.breakdown = memory_breakdown(self)
+
+        return report
+
+    def _evolve_patch(self, position: int, vertex: int, patch: Union[Treepatch, Rockpatch]) -> None:
+        """Evolves the patch of a vertex 1 evolution step
 
-            time.sleep(0.9) # add delay to show graph between steps
+        Parameters
+        ----------
+        position: int
+            Position of the patch in the patch map
+        vertex: int
+            The vertex of the patch
+        patch: Union[Treepatch, Rockpatch]
+            The patch to evolve
+        """
+        # Patches are evolved by component, so the clock is told which patch is evolved
+        clock = self._clock
+        clock.position = position
+
+        # Applies treepatch dynamics
+        if isinstance(patch, Treepatch):
+            # A lazily regrowing tree that is not burning, and does not autocombust in this step, has nothing to
+            # update: its health is regrown when read
+            if patch.quiet_until_next_step():
+                return
+
+            before = self._patch_state(patch)
+            patch.updateland() #fix evolve method and replace with updateland method ## create autocombustion in updateland
+            if patch._ignited:
+                self._recount_patch(vertex, before)
+                before = self._patch_state(patch)
+                self.spread_fire(patch._neighbour_ids)
+
+            # The stored health is current for trees below zero health, see Treepatch.updateland
+            if patch._health < 0:
+                # The new rock counts as evolved this step
+                clock.position = position + 1
+                self._patches_map[vertex] = patch.mutate()
+            else:
+                patch.updateland(2)
+            self._recount_patch(vertex, before)
+
+        if isinstance(patch, Rockpatch):
+            # Probability for rocpatches turning into treepatches
+            if patch.mutates_this_step():
+                # The new tree counts as updated this step
+                clock.position = position + 1
+                self._patches_map[vertex] = patch.mutate(autocombustion_prob=self._autocombustion, 
+                                                         tree_health=random.randint(1, 256))
+                self._recount_patch(vertex, (0, 1, 0, 0))
 
     def spread_fire(self, neighbour_ids: List[int]) -> None:
         """If treepatch is ignited, spread fire to any adjacent Treepatch(es)."""
@@ -257,4 +548,6 @@ class ForestFireGraph:
 
             # Check if neighbor is tree patch AND simulate chance of igniting
             if isinstance(current_neighbour, Treepatch) and random.randint(0, 100) <= self._fire_spread_prob:   
-                current_neighbour._ignited = True
+                before = self._patch_state(current_neighbour)
+                current_neighbour.ignite()
+                self._recount_patch(neighbor_id, before)
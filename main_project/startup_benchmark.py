@@ -0,0 +1,88 @@
+"""
+This module measures the cold start time of a headless simulation: the time a fresh Python process needs to import
+sim_forest and simulate a small graph without a renderer, as each worker of a batch or ensemble does.
+The start time of the interpreter itself is measured separately and subtracted.
+
+Usage: python startup_benchmark.py [--repeat N] [--budget MS]
+
+The exit status is 1 if the median cold start time is above the budget (default 100 ms), so the benchmark can guard
+against heavy imports (matplotlib, networkx, scipy) creeping back into the simulation modules.
+
+Requirements
+------------
+Python 3.7 or higher.
+
+Notes
+-----
+This module is created as material for the phase 2 project for DM857, DS830 (2023).
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import List, Optional
+
+# A headless run on a 10x10 grid, small enough that the imports dominate
+HEADLESS_RUN = """
+from sim_forest import ForestFireGraph
+edges = [(r * 10 + c, r * 10 + c + 1) for r in range(10) for c in range(9)]
+edges += [(r * 10 + c, r * 10 + c + 10) for r in range(9) for c in range(10)]
+ForestFireGraph(edges, renderer=None).simulate()
+"""
+# Modules a headless run must not import
+HEAVY_MODULES = ("matplotlib", "networkx", "scipy")
+
+
+def time_process(code: str, repeat: int) -> List[float]:
+    """Return the wall time in seconds of each of repeat fresh Python processes executing code
+
+    Parameters
+    ----------
+    code: str
+        Python code to execute, in the directory of this module
+    repeat: int
+        Number of processes
+    """
+    directory = os.path.dirname(os.path.abspath(__file__))
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], cwd=directory, check=True, stdout=subprocess.DEVNULL)
+        times.append(time.perf_counter() - started)
+
+    return times
+
+
+def imported_heavy_modules() -> List[str]:
+    """Return the heavy modules (see HEAVY_MODULES) a headless run imports"""
+
+    code = HEADLESS_RUN + "import sys\nprint(' '.join(m for m in sys.modules if m.split('.')[0] in %r))" % (HEAVY_MODULES,)
+    directory = os.path.dirname(os.path.abspath(__file__))
+    output = subprocess.run([sys.executable, "-c", code], cwd=directory, check=True, capture_output=True, text=True)
+
+    return sorted({module.split(".")[0] for module in output.stdout.split()} & set(HEAVY_MODULES))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Measure and print the cold start time of a headless run. Return the exit status"""
+
+    parser = argparse.ArgumentParser(description="Measure the cold start time of a headless simulation.")
+    parser.add_argument("--repeat", type=int, default=10, help="number of processes measured (default 10)")
+    parser.add_argument("--budget", type=float, default=100, help="budget in milliseconds (default 100)")
+    arguments = parser.parse_args(argv)
+
+    interpreter = statistics.median(time_process("pass", arguments.repeat))
+    cold_start = statistics.median(time_process(HEADLESS_RUN, arguments.repeat)) - interpreter
+    heavy = imported_heavy_modules()
+
+    print(f"Interpreter start: {interpreter * 1000:.1f} ms")
+    print(f"Headless cold start: {cold_start * 1000:.1f} ms (budget {arguments.budget:g} ms)")
+    print(f"Heavy modules imported: {', '.join(heavy) if heavy else 'none'}")
+
+    return 0 if cold_start * 1000 <= arguments.budget and not heavy else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+"""
+This module measures the time per step of a headless simulation on a square lattice, with tree patches regrowing
+lazily by the update clock of the simulation (see class_helper.UpdateClock) and with eager updates, where every tree
+adds its regrowth and draws for autocombustion in each update.
+
+Usage: python step_benchmark.py [--side N] [--steps N] [--repeat N] [--seed N] [--autocombustion P] [--fire-spread P]
+
+The processor time of the fastest of the repeated runs is reported, as the other runs are slowed down by other
+processes. Quiet trees dominate the steps with low autocombustion and fire spread, eg. --autocombustion 0
+--fire-spread 10.
+
+Requirements
+------------
+Package numpy https://numpy.org/ which can be installed via PIP.
+Python 3.7 or higher.
+
+Notes
+-----
+This module is created as material for the phase 2 project for DM857, DS830 (2023).
+"""
+import argparse
+import random
+import sys
+import time
+from typing import List, Optional
+from sim_forest import ForestFireGraph
+from class_helper import Treepatch
+from generator_helper import square_lattice
+
+
+def time_steps(side: int, steps: int, lazy: bool, seed: int, **params) -> float:
+    """Return the processor time in seconds per step of a seeded headless run on a side x side lattice
+
+    Parameters
+    ----------
+    side: int
+        Number of vertices along each side of the lattice
+    steps: int
+        Number of simulated steps
+    lazy: bool
+        If False, the clock is taken from the patches so they are updated eagerly
+    seed: int
+        Seed of the random module
+    params:
+        Simulation parameters of ForestFireGraph
+    """
+    random.seed(seed)
+    graph = ForestFireGraph(square_lattice(side), sim_time=steps, renderer=None, **params)
+    if not lazy:
+        for patch in graph._patches_map.values():
+            tree_health = getattr(patch, "_tree_health", None)
+            patch._clock = None
+            if isinstance(patch, Treepatch):
+                patch._tree_health = tree_health
+
+    started = time.process_time()
+    graph.simulate()
+
+    return (time.process_time() - started) / steps
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Measure and print the time per step of lazy and eager tree updates. Return the exit status"""
+
+    parser = argparse.ArgumentParser(description="Measure the time per step of a headless simulation.")
+    parser.add_argument("--side", type=int, default=200, help="side of the square lattice (default 200)")
+    parser.add_argument("--steps", type=int, default=20, help="number of steps per run (default 20)")
+    parser.add_argument("--repeat", type=int, default=10, help="number of runs measured (default 10)")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first run (default 0)")
+    parser.add_argument("--autocombustion", type=int, default=1, help="autocombustion probability (default 1)")
+    parser.add_argument("--fire-spread", type=int, default=30, help="fire spread probability (default 30)")
+    arguments = parser.parse_args(argv)
+    params = dict(autocombustion=arguments.autocombustion, fire_spread_prob=arguments.fire_spread)
+
+    # Eager and lazy runs take turns, so both are measured under the same load
+    runs = {False: [], True: []}
+    for run in range(arguments.repeat):
+        for lazy in (False, True):
+            runs[lazy].append(time_steps(arguments.side, arguments.steps, lazy, arguments.seed + run, **params))
+    times = {lazy: min(run_times) for lazy, run_times in runs.items()}
+
+    print(f"{arguments.side}x{arguments.side} lattice, {arguments.steps} steps, autocombustion "
+          f"{arguments.autocombustion}, fire spread {arguments.fire_spread}, fastest of {arguments.repeat} runs")
+    print(f"Eager updates: {times[False] * 1000:.1f} ms per step")
+    print(f"Lazy updates:  {times[True] * 1000:.1f} ms per step ({times[True] / times[False]:.2f} of eager)")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
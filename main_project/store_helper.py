@@ -0,0 +1,616 @@
+"""
+This module provides ConfigStore, a persistent store of simulation configurations in an SQLite database,
+StoredConfig, a dataclass describing a stored configuration without its graph, ResultStore, a warehouse of simulation
+runs in an SQLite database, and helper functions, to:
+- default_store_path:   return the path of the configuration database used when none is given
+- default_results_path: return the path of the results database used when none is given
+- config_key:           return the key of a configuration, a hash of its graph key and parameters
+
+The parameters of each configuration are kept in indexed columns, so thousands of configurations can be listed and
+queried by parameter range without reading any graph. Graphs are stored once per edge set, as binary graph files
+(see graphfile_helper) named by the content hash of their edges (see cache_helper.edge_set_hash). Configurations
+on the same graph refer to the same file.
+
+ResultStore keeps a row per run with its configuration key, graph key, engine, seed, parameters, wall time and summary
+statistics (see STATISTICS). Per step series are stored zlib compressed in a separate table. The runs are indexed by
+graph and each parameter, so aggregates like mean_by('total_ignited_tree_patches', 'fire_spread_prob', graph=key)
+only read the matching runs. Runs are buffered and written in batches of one transaction each, and the database is
+in WAL mode, so several worker processes can write to it while it is queried.
+
+Requirements
+------------
+Package numpy https://numpy.org/ which can be installed via PIP.
+Python 3.7 or higher.
+
+Notes
+-----
+This module is created as material for the phase 2 project for DM857, DS830 (2023).
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+import numpy as np
+import cache_helper as cache
+import graphfile_helper as gfh
+from class_helper import SERIES, ConfigData
+from csr_helper import CSRGraph, csr_from_edges
+
+# Parameters stored per configuration, named like the prompts of graph_forest, with the ConfigData field of each
+PARAMETERS = {
+    "tree_rate": "tree_distribution",
+    "firefighters": "firefighters",
+    "autocombustion_prob": "autocombustion",
+    "fire_spread_prob": "fire_spread_prob",
+    "rock_mutate_prob": "rock_mutate_prob",
+    "sim_limit": "sim_time",
+}
+# Parameters stored per run, as batch_forest.PARAM_DEFAULTS
+RESULT_PARAMETERS = (*PARAMETERS, "firefighter_skill")
+# Summary statistics stored per run: trees and rocks after the last step, the most and mean burning trees of a step,
+# and the burning trees summed over all steps (the burnt area)
+STATISTICS = ("final_tree_patches", "final_rock_patches", "peak_ignited_tree_patches", "mean_ignited_tree_patches",
+              "total_ignited_tree_patches")
+# Bump when the tables change. Databases of a newer version are rejected. There is no older version yet, so opening a
+# database only creates missing tables and indexes; a change of the tables needs a migration keyed on user_version
+SCHEMA_VERSION = 1
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS graphs (
+    key TEXT PRIMARY KEY,
+    num_vertices INTEGER NOT NULL,
+    num_edges INTEGER NOT NULL,
+    has_positions INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS configurations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    graph TEXT NOT NULL REFERENCES graphs(key),
+    {", ".join(f"{name} REAL NOT NULL" for name in PARAMETERS)},
+    created REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS configurations_graph ON configurations(graph);
+{"".join(f"CREATE INDEX IF NOT EXISTS configurations_{name} ON configurations({name});" for name in PARAMETERS)}
+"""
+
+# Series are kept in their own table, so queries over the runs do not read them
+_RESULTS_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    config TEXT NOT NULL,
+    graph TEXT NOT NULL,
+    engine TEXT NOT NULL,
+    seed INTEGER,
+    {", ".join(f"{name} REAL" for name in RESULT_PARAMETERS)},
+    land_patches INTEGER,
+    steps INTEGER NOT NULL,
+    wall_seconds REAL,
+    {", ".join(f"{name} REAL NOT NULL" for name in STATISTICS)},
+    created REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS series (
+    run INTEGER PRIMARY KEY REFERENCES runs(id),
+    data BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_config ON runs(config);
+{"".join(f"CREATE INDEX IF NOT EXISTS runs_graph_{name} ON runs(graph, {name});" for name in RESULT_PARAMETERS)}
+"""
+
+
+def default_store_path() -> str:
+    """Return the path of the configuration database in default_cache_dir() (see cache_helper)"""
+
+    return os.path.join(cache.default_cache_dir(), "configurations.sqlite")
+
+
+def default_results_path() -> str:
+    """Return the path of the results database in default_cache_dir() (see cache_helper)"""
+
+    return os.path.join(cache.default_cache_dir(), "results.sqlite")
+
+
+@dataclass(frozen=True)
+class StoredConfig:
+    """Each instance of this dataclass describes a stored configuration: its parameters and the size of its graph.
+
+    Parameters
+    ----------
+    config_id: int
+        Identity of the configuration in the store
+    graph: str
+        Content hash of the edges of the graph
+    num_vertices: int
+        Number of vertices of the graph
+    num_edges: int
+        Number of edges of the graph
+    tree_rate, firefighters, autocombustion_prob, fire_spread_prob, rock_mutate_prob, sim_limit:
+        The simulation parameters, see PARAMETERS
+    created: float
+        Time the configuration was stored, in seconds since the epoch
+    """
+    config_id: int
+    graph: str
+    num_vertices: int
+    num_edges: int
+    tree_rate: float
+    firefighters: int
+    autocombustion_prob: float
+    fire_spread_prob: float
+    rock_mutate_prob: float
+    sim_limit: int
+    created: float
+
+    def __str__(self) -> str:
+        return (f"{self.num_vertices} vertices, {self.num_edges} edges, tree rate {self.tree_rate:g}, "
+                f"firefighters {self.firefighters}, autocombustion {self.autocombustion_prob:g}, "
+                f"fire spread {self.fire_spread_prob:g}, rock mutation {self.rock_mutate_prob:g}, "
+                f"steps {self.sim_limit}")
+
+
+class ConfigStore:
+    """Each instance of this class manages a database of simulation configurations and a directory of their graphs"""
+    def __init__(self,
+                 path: Optional[str] = None,
+                 graph_directory: Optional[str] = None) -> None:
+        """
+        Parameters
+        ----------
+        path: Optional[str], default = None
+            Path of the SQLite database. If None, default_store_path() is used
+        graph_directory: Optional[str], default = None
+            Directory holding the graph files. If None, the directory 'stored_graphs' next to the database is used
+        """
+        self._path = path or default_store_path()
+        self._graph_directory = graph_directory or os.path.join(os.path.dirname(os.path.abspath(self._path)),
+                                                                "stored_graphs")
+        os.makedirs(self._graph_directory, exist_ok=True)
+
+        # Several processes may share the store: wait for locks, and let readers run alongside a writer
+        self._connection = sqlite3.connect(self._path, timeout=30)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        version = self._connection.execute("PRAGMA user_version").fetchone()[0]
+        if version > SCHEMA_VERSION:
+            raise Exception(f"store, {self._path} has schema version {version}, only up to {SCHEMA_VERSION} "
+                            "is supported")
+        with self._connection:
+            self._connection.executescript(_SCHEMA)
+            self._connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def __enter__(self) -> "ConfigStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._connection.execute("SELECT COUNT(*) FROM configurations").fetchone()[0]
+
+    def close(self) -> None:
+        """Closes the database"""
+
+        self._connection.close()
+
+    def add_graph(self,
+                  edges: Union[np.ndarray, List[Tuple[int, int]], CSRGraph],
+                  pos_nodes: Optional[Dict[int, Tuple[float, float]]] = None,
+                  key: Optional[str] = None) -> str:
+        """Stores a graph unless its edge set is stored already. Return its key, the content hash of the edges
+
+        Parameters
+        ----------
+        edges: Union[np.ndarray, List[(int,int)], CSRGraph]
+            (E,2) array or list of tuples with the edges of the graph, or a CSRGraph (eg. from a binary graph file)
+        pos_nodes: Optional[Dict[int,(float,float)]], default = None
+            Position of each vertex. Stored if the graph was stored without positions. Taken from the coordinates
+            of a CSRGraph if empty
+        key: Optional[str], default = None
+            cache_helper.edge_set_hash(edges), if already known, so edges are not hashed again
+        """
+        # A CSRGraph is stored by the original vertex ids of its edges
+        if isinstance(edges, CSRGraph):
+            if not pos_nodes and edges.coords is not None:
+                pos_nodes = edges.positions()
+            edges = edges.ids()[edges.edge_array()]
+
+        key = key or cache.edge_set_hash(edges)
+        row = self._connection.execute("SELECT has_positions FROM graphs WHERE key = ?", (key,)).fetchone()
+        if row is not None and (row[0] or not pos_nodes):
+            return key
+
+        edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+        # Numbered in first seen order, so a loaded graph is simulated in the patch order of its edge list
+        csr = csr_from_edges(edges, relabel=True, first_seen=True)
+        has_positions = bool(pos_nodes) and all(vertex in pos_nodes for vertex in csr.vertex_ids.tolist())
+        if has_positions:
+            csr.coords = np.array([pos_nodes[vertex] for vertex in csr.vertex_ids.tolist()], dtype=float)
+        elif row is not None:
+            return key
+
+        # The graph file is published before its row, so every stored key has a file
+        gfh.write_graph_file(self._graph_path(key), edges, csr)
+        with self._connection:
+            self._connection.execute("INSERT OR REPLACE INTO graphs VALUES (?, ?, ?, ?)",
+                                     (key, csr.num_vertices(), csr.num_edges(), int(has_positions)))
+
+        return key
+
+    def load_graph(self, key: str) -> CSRGraph:
+        """Return a stored graph as the memory mapped CSRGraph of its graph file, with the stored vertex positions
+        as its coordinates (None if none were stored)
+
+        Parameters
+        ----------
+        key: str
+            Key of the graph from add_graph
+        """
+        path = self._graph_path(key)
+        if not os.path.isfile(path):
+            raise Exception(f"store, graph {key} not found in {self._graph_directory}")
+
+        return gfh.open_graph_file(path).graph()
+
+    def add(self, config: ConfigData) -> int:
+        """Stores a configuration and its graph. Return the identity of the stored configuration
+
+        Parameters
+        ----------
+        config: ConfigData
+            The configuration to store
+        """
+        key = self.add_graph(config.edges, config.pos_nodes, key=config.graph)
+        values = [getattr(config, field) for field in PARAMETERS.values()]
+        with self._connection:
+            cursor = self._connection.execute(
+                f"INSERT INTO configurations (graph, {', '.join(PARAMETERS)}, created) "
+                f"VALUES (?, {', '.join('?' * len(PARAMETERS))}, ?)", (key, *values, time.time()))
+
+        return cursor.lastrowid
+
+    def load(self, config_id: int) -> ConfigData:
+        """Return a stored configuration, interning its graph (see cache_helper.intern_graph) if it is not yet
+
+        Parameters
+        ----------
+        config_id: int
+            Identity of the configuration from add or configurations
+        """
+        row = self._connection.execute(f"SELECT graph, {', '.join(PARAMETERS)} FROM configurations WHERE id = ?",
+                                       (config_id,)).fetchone()
+        if row is None:
+            raise Exception(f"store, no configuration with id {config_id}")
+
+        # The graph file is only read if the graph is not interned, eg. in a new process
+        if cache.is_interned(row[0]):
+            edges, pos_nodes = cache.interned_graph(row[0])
+        else:
+            # The positions of a CSRGraph are its coordinates (see sim_forest.ForestFireGraph)
+            edges, pos_nodes = self.load_graph(row[0]), {}
+
+        return ConfigData(edges, pos_nodes, graph=row[0],
+                          **{field: _number(value) for field, value in zip(PARAMETERS.values(), row[1:])})
+
+    def remove(self, config_id: int) -> None:
+        """Removes a stored configuration. Its graph is kept for other configurations
+
+        Parameters
+        ----------
+        config_id: int
+            Identity of the configuration
+        """
+        with self._connection:
+            self._connection.execute("DELETE FROM configurations WHERE id = ?", (config_id,))
+
+    def configurations(self,
+                       graph: Optional[str] = None,
+                       limit: Optional[int] = None,
+                       **ranges: Union[float, Tuple[Optional[float], Optional[float]]]) -> List[StoredConfig]:
+        """Return the stored configurations, oldest first, without loading their graphs
+
+        Parameters
+        ----------
+        graph: Optional[str], default = None
+            If given, only configurations of the graph with this key
+        limit: Optional[int], default = None
+            If given, at most this many configurations
+        ranges: Union[float, Tuple[Optional[float], Optional[float]]]
+            Per parameter in PARAMETERS, a value or an inclusive (low, high) range, where None is unbounded.
+            eg. configurations(fire_spread_prob=(20, 60), firefighters=3)
+        """
+        conditions, values = _conditions(ranges, PARAMETERS, "c")
+        if graph is not None:
+            conditions.append("c.graph = ?")
+            values.append(graph)
+
+        query = (f"SELECT c.id, c.graph, g.num_vertices, g.num_edges, {', '.join('c.' + name for name in PARAMETERS)}, "
+                 "c.created FROM configurations c JOIN graphs g ON g.key = c.graph")
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY c.id"
+        if limit is not None:
+            query += " LIMIT ?"
+            values.append(limit)
+
+        return [StoredConfig(row[0], row[1], row[2], row[3], *map(_number, row[4:-1]), row[-1])
+                for row in self._connection.execute(query, values)]
+
+    def _graph_path(self, key: str) -> str:
+        """Return the path of the graph file of a key"""
+
+        return os.path.join(self._graph_directory, key + ".ffg")
+
+
+class ResultStore:
+    """Each instance of this class manages a database (warehouse) of simulation runs: their parameters, summary
+    statistics and per step series"""
+    def __init__(self,
+                 path: Optional[str] = None,
+                 batch_size: Optional[int] = 1000) -> None:
+        """
+        Parameters
+        ----------
+        path: Optional[str], default = None
+            Path of the SQLite database. If None, default_results_path() is used
+        batch_size: Optional[int], default = 1000
+            Number of runs buffered before they are written in one transaction
+        """
+        self._path = path or default_results_path()
+        directory = os.path.dirname(os.path.abspath(self._path))
+        os.makedirs(directory, exist_ok=True)
+        self._batch_size = batch_size
+        self._pending = []
+
+        # Transactions are managed explicitly, so a batch takes the write lock once
+        self._connection = sqlite3.connect(self._path, timeout=60, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        version = self._connection.execute("PRAGMA user_version").fetchone()[0]
+        if version > SCHEMA_VERSION:
+            raise Exception(f"store, {self._path} has schema version {version}, only up to {SCHEMA_VERSION} "
+                            "is supported")
+        self._connection.executescript(_RESULTS_SCHEMA)
+        self._connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def __enter__(self) -> "ResultStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        self.flush()
+        return self._connection.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+
+    def close(self) -> None:
+        """Writes the buffered runs and closes the database"""
+
+        self.flush()
+        self._connection.close()
+
+    def add_run(self,
+                graph: str,
+                params: Dict[str, float],
+                series: Dict[str, np.ndarray],
+                engine: Optional[str] = "object",
+                seed: Optional[int] = None,
+                wall_seconds: Optional[float] = None,
+                land_patches: Optional[int] = None) -> None:
+        """Buffers a run, written with the next batch
+
+        Parameters
+        ----------
+        graph: str
+            Key of the graph, its edge set hash (see cache_helper.edge_set_hash)
+        params: Dict[str, float]
+            Simulation parameters, see RESULT_PARAMETERS. Missing parameters are stored as NULL
+        series: Dict[str, np.ndarray]
+            Per step counts of each of SERIES
+        engine: Optional[str], default = 'object'
+            Name of the simulation engine
+        seed: Optional[int], default = None
+            Seed of the run, if any
+        wall_seconds: Optional[float], default = None
+            Time the simulation took
+        land_patches: Optional[int], default = None
+            Number of patches of the graph
+        """
+        self.add_runs(graph, params, {name: np.asarray(series[name])[np.newaxis] for name in SERIES}, engine, seed,
+                      wall_seconds, land_patches)
+
+    def add_runs(self,
+                 graph: str,
+                 params: Dict[str, float],
+                 series: Dict[str, np.ndarray],
+                 engine: Optional[str] = "object",
+                 seed: Optional[int] = None,
+                 wall_seconds: Optional[float] = None,
+                 land_patches: Optional[int] = None) -> None:
+        """Buffers the replicas of a configuration, as returned by the engines of batch_forest.
+        Replica r gets seed + r and an equal share of wall_seconds.
+
+        Parameters
+        ----------
+        series: Dict[str, np.ndarray]
+            (replicas, steps + 1) counts of each of SERIES
+        graph, params, engine, seed, wall_seconds, land_patches:
+            As for add_run, for all replicas together
+        """
+        unknown = set(params) - set(RESULT_PARAMETERS)
+        if unknown:
+            raise Exception(f"store, unknown parameters: {', '.join(sorted(unknown))}")
+
+        # (replicas, series, steps + 1) counts, summarized for all replicas at once
+        counts = np.stack([np.asarray(series[name], dtype=np.int64) for name in SERIES], axis=1)
+        replicas, steps = len(counts), counts.shape[2] - 1
+        ignited = counts[:, SERIES.index("ignited_tree_patches")]
+        statistics = zip(counts[:, 0, -1].tolist(), counts[:, 1, -1].tolist(), ignited.max(axis=1).tolist(),
+                         ignited.mean(axis=1).tolist(), ignited.sum(axis=1).tolist())
+
+        shared = (config_key(graph, params), graph, engine)
+        values = tuple(params.get(name) for name in RESULT_PARAMETERS)
+        replica_seconds = None if wall_seconds is None else wall_seconds / replicas
+        created = time.time()
+        blobs = counts.astype("<i4")
+        for replica, replica_statistics in enumerate(statistics):
+            self._pending.append((*shared, None if seed is None else seed + replica, *values, land_patches, steps,
+                                  replica_seconds, *replica_statistics, created,
+                                  zlib.compress(blobs[replica].tobytes())))
+        if len(self._pending) >= self._batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Writes the buffered runs in one transaction"""
+
+        if not self._pending:
+            return
+        columns = ("config", "graph", "engine", "seed", *RESULT_PARAMETERS, "land_patches", "steps", "wall_seconds",
+                   *STATISTICS, "created")
+        self._connection.execute("BEGIN IMMEDIATE")
+        try:
+            # Run ids are taken under the write lock, so runs and their series are inserted as two bulk statements
+            first = self._connection.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM runs").fetchone()[0]
+            ids = range(first, first + len(self._pending))
+            self._connection.executemany(
+                f"INSERT INTO runs (id, {', '.join(columns)}) VALUES (?, {', '.join('?' * len(columns))})",
+                ((run_id, *row[:-1]) for run_id, row in zip(ids, self._pending)))
+            self._connection.executemany("INSERT INTO series VALUES (?, ?)",
+                                         ((run_id, row[-1]) for run_id, row in zip(ids, self._pending)))
+            self._connection.execute("COMMIT")
+        except BaseException:
+            self._connection.execute("ROLLBACK")
+            raise
+        self._pending = []
+
+    def runs(self,
+             graph: Optional[str] = None,
+             engine: Optional[str] = None,
+             limit: Optional[int] = None,
+             **ranges: Union[float, Tuple[Optional[float], Optional[float]]]) -> List[Dict]:
+        """Return the stored runs, oldest first, as dictionaries of their columns without the series
+
+        Parameters
+        ----------
+        graph: Optional[str], default = None
+            If given, only runs on the graph with this key
+        engine: Optional[str], default = None
+            If given, only runs with this engine
+        limit: Optional[int], default = None
+            If given, at most this many runs
+        ranges: Union[float, Tuple[Optional[float], Optional[float]]]
+            Per parameter in RESULT_PARAMETERS, a value or an inclusive (low, high) range, where None is unbounded
+        """
+        conditions, values = self._filters(graph, engine, ranges)
+        query = "SELECT * FROM runs r" + (" WHERE " + " AND ".join(conditions) if conditions else "") + " ORDER BY r.id"
+        if limit is not None:
+            query += " LIMIT ?"
+            values.append(limit)
+
+        cursor = self._connection.execute(query, values)
+        names = [column[0] for column in cursor.description]
+        return [dict(zip(names, row)) for row in cursor]
+
+    def series(self, run_id: int) -> Dict[str, np.ndarray]:
+        """Return the per step counts of each of SERIES of a stored run
+
+        Parameters
+        ----------
+        run_id: int
+            Id of the run, from runs
+        """
+        self.flush()
+        row = self._connection.execute("SELECT data FROM series WHERE run = ?", (run_id,)).fetchone()
+        if row is None:
+            raise Exception(f"store, no run with id {run_id}")
+        counts = np.frombuffer(zlib.decompress(row[0]), dtype="<i4").reshape(len(SERIES), -1)
+
+        return {name: counts[i].astype(np.int64) for i, name in enumerate(SERIES)}
+
+    def mean_by(self,
+                statistic: str,
+                parameter: str,
+                graph: Optional[str] = None,
+                engine: Optional[str] = None,
+                **ranges: Union[float, Tuple[Optional[float], Optional[float]]]) -> List[Tuple[float, float, int]]:
+        """Return (parameter value, mean of statistic, number of runs) for each value of parameter, in order,
+        eg. mean_by('total_ignited_tree_patches', 'fire_spread_prob', graph=key)
+
+        Parameters
+        ----------
+        statistic: str
+            One of STATISTICS, or 'wall_seconds'
+        parameter: str
+            One of RESULT_PARAMETERS
+        graph, engine, ranges:
+            Select the runs, as for runs
+        """
+        if statistic not in STATISTICS + ("wall_seconds",):
+            raise Exception(f"store, unknown statistic '{statistic}', use one of {', '.join(STATISTICS)}")
+        if parameter not in RESULT_PARAMETERS:
+            raise Exception(f"store, unknown parameter '{parameter}', use one of {', '.join(RESULT_PARAMETERS)}")
+
+        conditions, values = self._filters(graph, engine, ranges)
+        query = (f"SELECT r.{parameter}, AVG(r.{statistic}), COUNT(*) FROM runs r"
+                 + (" WHERE " + " AND ".join(conditions) if conditions else "")
+                 + f" GROUP BY r.{parameter} ORDER BY r.{parameter}")
+
+        return [(_number(value), mean, count) for value, mean, count in self._connection.execute(query, values)]
+
+    def _filters(self,
+                 graph: Optional[str],
+                 engine: Optional[str],
+                 ranges: Dict[str, Union[float, Tuple[Optional[float], Optional[float]]]]) -> Tuple[List[str], List]:
+        """Return the SQL conditions and values selecting runs, after writing the buffered runs"""
+
+        self.flush()
+        conditions, values = _conditions(ranges, RESULT_PARAMETERS, "r")
+        if graph is not None:
+            conditions.append("r.graph = ?")
+            values.append(graph)
+        if engine is not None:
+            conditions.append("r.engine = ?")
+            values.append(engine)
+
+        return conditions, values
+
+
+def config_key(graph: str, params: Dict[str, float]) -> str:
+    """Return the key of a configuration: a hash of its graph key and its parameters
+
+    Parameters
+    ----------
+    graph: str
+        Key of the graph, its edge set hash (see cache_helper.edge_set_hash)
+    params: Dict[str, float]
+        Simulation parameters
+    """
+    content = json.dumps([graph, sorted((name, float(value)) for name, value in params.items())])
+
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def _conditions(ranges: Dict[str, Union[float, Tuple[Optional[float], Optional[float]]]],
+                parameters: Iterable[str],
+                table: str) -> Tuple[List[str], List[float]]:
+    """Return the SQL conditions and their values selecting parameters by value or inclusive (low, high) range"""
+
+    conditions, values = [], []
+    for name, bounds in ranges.items():
+        if name not in parameters:
+            raise Exception(f"store, unknown parameter '{name}', use one of {', '.join(parameters)}")
+        low, high = bounds if isinstance(bounds, (tuple, list)) else (bounds, bounds)
+        if low is not None:
+            conditions.append(f"{table}.{name} >= ?")
+            values.append(low)
+        if high is not None:
+            conditions.append(f"{table}.{name} <= ?")
+            values.append(high)
+
+    return conditions, values
+
+
+def _number(value: float) -> Union[int, float]:
+    """Return a stored parameter as int if it is whole, as the prompts of graph_forest return ints"""
+
+    return int(value) if float(value).is_integer() else value
@@ -0,0 +1,127 @@
+import sys
+import os
+
+# Ensure other modules can be opened while perfoming tests.
+# Get the absolute path
+main_project_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+# Add the module directory to the Python path
+sys.path.insert(0, main_project_dir)
+
+# Imported the way the batch entry point is run, so graphs from the cache are the same CSRGraph class
+from batch_forest import load_runs, load_graph_source, execute_run, main, PARAM_DEFAULTS
+from store_helper import ResultStore
+import unittest
+import tempfile
+import json
+import csv
+import numpy as np
+from unittest.mock import patch
+
+class TestBatchForest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        environment = patch.dict(os.environ, {"FOREST_CACHE_DIR": self.directory.name})
+        environment.start()
+        self.addCleanup(environment.stop)
+
+    def path(self, name):
+        return os.path.join(self.directory.name, name)
+
+    def write_spec(self, name, content):
+        with open(self.path(name), "w") as file:
+            file.write(content)
+        return self.path(name)
+
+    def test_load_json_defaults(self):
+        spec = self.write_spec("runs.json", json.dumps({"graph": {"generator": "square", "rows": 3},
+                                                        "params": {"sim_limit": 4}}))
+        [run] = load_runs(spec)
+        self.assertEqual(run["name"], "run1")
+        self.assertEqual(run["params"], dict(PARAM_DEFAULTS, sim_limit=4))
+        self.assertEqual((run["replicas"], run["seed"], run["engine"], run["output"]), (1, None, "object", "run1.json"))
+
+    def test_load_toml(self):
+        spec = self.write_spec("runs.toml", '[[runs]]\nname = "a"\nreplicas = 3\n'
+                                            '[runs.graph]\ngenerator = "delaunay"\nnpoints = 50\nseed = 2\n'
+                                            '[[runs]]\nname = "b"\ngraph = { file = "edges.dat" }\n')
+        runs = load_runs(spec)
+        self.assertEqual([run["name"] for run in runs], ["a", "b"])
+        self.assertEqual(runs[0]["graph"], {"generator": "delaunay", "npoints": 50, "seed": 2})
+        self.assertEqual(runs[1]["graph"], {"file": "edges.dat"})
+
+    def test_invalid_specs(self):
+        for run in [{"graph": {"file": "x.dat"}, "params": {"speed": 1}},
+                    {"graph": {"file": "x.dat"}, "engine": "quantum"},
+                    {"graph": {"file": "x.dat"}, "colour": "red"},
+                    {"params": {}}]:
+            with self.assertRaises(Exception):
+                load_runs(self.write_spec("runs.json", json.dumps(run)))
+
+    @patch('time.sleep')
+    def test_execute_headless_and_reproducible(self, mock_sleep):
+        run = load_runs(self.write_spec("runs.json", json.dumps({
+            "name": "grid", "graph": {"generator": "square", "rows": 5}, "params": {"sim_limit": 6},
+            "replicas": 3, "seed": 7, "output": self.path("out/grid.npz")})))[0]
+
+        with patch('matplotlib.pyplot.subplots') as mock_subplots, patch('builtins.print'):
+            first = execute_run(run)
+            second = execute_run(run)
+        mock_sleep.assert_not_called()
+        mock_subplots.assert_not_called()
+
+        self.assertEqual(first["land_patches"], 25)
+        self.assertEqual(first["series"]["tree_patches"].shape, (3, 7))
+        for name, values in first["series"].items():
+            np.testing.assert_array_equal(values, second["series"][name])
+        np.testing.assert_array_equal(first["series"]["tree_patches"] + first["series"]["rock_patches"], 25)
+        self.assertEqual(np.load(self.path("out/grid.npz"))["tree_patches"].shape, (3, 7))
+
+    def test_graph_source_order(self):
+        graph = load_graph_source({"generator": "square", "rows": 6})
+        reordered = load_graph_source({"generator": "square", "rows": 6, "order": "hilbert"})
+        self.assertEqual(sorted(map(sorted, reordered.iter_edges())), sorted(map(sorted, graph.iter_edges())))
+        self.assertFalse(np.array_equal(reordered.ids(), graph.ids()))
+        with self.assertRaises(Exception):
+            load_graph_source({"generator": "square", "rows": 6, "order": "spiral"})
+
+    @patch('builtins.print')
+    def test_main_from_file_graph(self, mock_print):
+        with open(self.path("edges.dat"), "w") as file:
+            file.write("1, 2\n2, 3\n3, 1\n3, 4\n")
+        spec = self.write_spec("runs.json", json.dumps({"runs": [
+            {"name": "csv", "graph": {"file": self.path("edges.dat")}, "replicas": 2, "seed": 1,
+             "params": {"sim_limit": 2}, "output": self.path("csv.csv")},
+            {"name": "json", "graph": {"file": self.path("edges.dat")}, "output": self.path("json.json")},
+            {"name": "missing", "graph": {"file": self.path("missing.dat")}, "output": self.path("missing.json")}]}))
+
+        with patch('sys.stderr'):
+            self.assertEqual(main([spec, "--only", "csv", "json", "--quiet"]), 0)
+            self.assertEqual(main([spec, "--only", "missing", "--quiet"]), 1)
+
+        with open(self.path("csv.csv")) as file:
+            rows = list(csv.DictReader(file))
+        self.assertEqual(len(rows), 2 * 3)
+        self.assertEqual(int(rows[0]["tree_patches"]) + int(rows[0]["rock_patches"]), 4)
+        with open(self.path("json.json")) as file:
+            self.assertEqual(len(json.load(file)["series"]["tree_patches"][0]), PARAM_DEFAULTS["sim_limit"] + 1)
+
+    @patch('builtins.print')
+    def test_main_records_warehouse(self, mock_print):
+        spec = self.write_spec("runs.json", json.dumps({
+            "graph": {"generator": "square", "rows": 4}, "params": {"sim_limit": 3, "fire_spread_prob": 50},
+            "replicas": 4, "seed": 10, "output": self.path("out.json")}))
+        self.assertEqual(main([spec, "--quiet", "--warehouse", self.path("results.sqlite")]), 0)
+
+        with ResultStore(self.path("results.sqlite")) as results:
+            runs = results.runs()
+            self.assertEqual([run["seed"] for run in runs], [10, 11, 12, 13])
+            self.assertEqual({run["fire_spread_prob"] for run in runs}, {50})
+            with open(self.path("out.json")) as file:
+                tree_patches = json.load(file)["series"]["tree_patches"]
+            self.assertEqual(results.series(runs[2]["id"])["tree_patches"].tolist(), tree_patches[2])
+
+if __name__ == '__main__':
+    unittest.main()
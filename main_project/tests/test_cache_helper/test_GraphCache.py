@@ -0,0 +1,97 @@
+import sys
+import os
+
+# Ensure other modules can be opened while perfoming tests.
+# Get the absolute path
+main_project_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+# Add the module directory to the Python path
+sys.path.insert(0, main_project_dir)
+
+import unittest
+import tempfile
+import multiprocessing
+import numpy as np
+from ...cache_helper import GraphCache, cached_voronoi_to_edges, cached_generate
+from ...graph_helper import voronoi_to_edges
+
+
+def store_entry(directory):
+    """Store the same entry from a worker process"""
+    cache = GraphCache(directory)
+    key = cache.key("test", {"size": 1000}, 1)
+    cache.put(key, {"edges": np.arange(2000).reshape(-1, 2)})
+    return cache.get(key)["edges"].sum()
+
+
+class TestGraphCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = GraphCache(self.directory.name)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_key_depends_on_generator_params_and_seed(self):
+        key = GraphCache.key("voronoi", {"minpoints": 10}, 1)
+        self.assertEqual(key, GraphCache.key("voronoi", {"minpoints": 10}, 1))
+        self.assertNotEqual(key, GraphCache.key("voronoi", {"minpoints": 11}, 1))
+        self.assertNotEqual(key, GraphCache.key("voronoi", {"minpoints": 10}, 2))
+        self.assertNotEqual(key, GraphCache.key("delaunay", {"minpoints": 10}, 1))
+
+    def test_put_and_get_memory_mapped(self):
+        self.assertIsNone(self.cache.get("missing"))
+        self.cache.put("key", {"edges": np.array([[0, 1], [1, 2]], dtype=np.int32)})
+        arrays = self.cache.get("key")
+        self.assertIsInstance(arrays["edges"], np.memmap)
+        self.assertEqual(arrays["edges"].tolist(), [[0, 1], [1, 2]])
+
+    def test_cached_voronoi_matches_generator(self):
+        first = cached_voronoi_to_edges(50, 4, self.cache)
+        second = cached_voronoi_to_edges(50, 4, self.cache)
+        self.assertEqual(first, second)
+        self.assertEqual(first, voronoi_to_edges(50, seed=4))
+        self.assertEqual(len(self.cache.entries()), 1)
+
+    def test_cached_voronoi_rejects_negative_seed(self):
+        with self.assertRaises(Exception):
+            cached_voronoi_to_edges(50, -4, self.cache)
+        self.assertEqual(self.cache.entries(), [])
+
+    def test_cached_generate(self):
+        graph = cached_generate("square", cache=self.cache, rows=4)
+        again = cached_generate("square", cache=self.cache, rows=4)
+        self.assertEqual(graph.num_vertices(), 16)
+        self.assertEqual(again.indices.tolist(), graph.indices.tolist())
+
+    def test_cached_generate_voronoi_memory_mapped(self):
+        cached_generate("voronoi", 4, self.cache, minpoints=50)
+        graph = cached_generate("voronoi", 4, self.cache, minpoints=50)
+        self.assertIsInstance(graph.indices, np.memmap)
+        self.assertIsInstance(graph.coords, np.memmap)
+        self.assertGreaterEqual(graph.num_vertices(), 50)
+        with self.assertRaises(Exception):
+            cached_generate("voronoi", -4, self.cache, minpoints=50)
+
+    def test_evicts_least_recently_used(self):
+        for age, key in enumerate(["a", "b", "c"]):
+            self.cache.put(key, {"data": np.zeros(1000)})
+            os.utime(os.path.join(self.directory.name, key), (1000 + age, 1000 + age))
+        self.cache.get("a")
+
+        small_cache = GraphCache(self.directory.name, max_bytes=2 * 8200)
+        small_cache.evict()
+        self.assertEqual(sorted(key for key, _, _ in small_cache.entries()), ["a", "c"])
+        self.assertLessEqual(small_cache.total_bytes(), 2 * 8200)
+
+    def test_concurrent_workers(self):
+        if "fork" not in multiprocessing.get_all_start_methods():
+            self.skipTest("requires fork")
+        with multiprocessing.get_context("fork").Pool(4) as pool:
+            results = pool.map(store_entry, [self.directory.name] * 8)
+        self.assertEqual(set(results), {sum(range(2000))})
+        self.assertEqual(len(self.cache.entries()), 1)
+
+if __name__ == '__main__':
+    unittest.main()
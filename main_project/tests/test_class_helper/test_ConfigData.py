@@ -0,0 +1,60 @@
+import sys
+import os
+
+# Ensure other modules can be opened while perfoming tests.
+# Get the absolute path
+main_project_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+# Add the module directory to the Python path
+sys.path.insert(0, main_project_dir)
+
+import unittest
+from ...class_helper import ConfigData
+# Imported the way class_helper imports it, so the interned graphs are the same
+import cache_helper
+
+
+class TestConfigData(unittest.TestCase):
+
+    def setUp(self):
+        cache_helper._INTERNED_GRAPHS.clear()
+        self.edges = [(0, 1), (1, 2), (2, 0)]
+        self.pos_nodes = {0: (0.0, 0.0), 1: (1.0, 0.0), 2: (0.5, 1.0)}
+
+    def test_configs_share_one_graph(self):
+        first = ConfigData(self.edges, self.pos_nodes, 60)
+        # An equal edge set, in another order and direction
+        second = ConfigData([(1, 0), (0, 2), (2, 1)], {}, 70)
+        self.assertEqual(first.graph, second.graph)
+        self.assertIs(first.edges, second.edges)
+        self.assertIs(first.edges, self.edges)
+        self.assertEqual(second.pos_nodes, self.pos_nodes)
+
+    def test_configs_are_hashable(self):
+        configs = {ConfigData(self.edges, {}, 60): "first",
+                   ConfigData(list(self.edges), {}, 60): "again",
+                   ConfigData(self.edges, {}, 70): "other"}
+        self.assertEqual(len(configs), 2)
+        self.assertEqual(configs[ConfigData(self.edges, {}, 60)], "again")
+
+    def test_get_config(self):
+        config = ConfigData(self.edges, self.pos_nodes, 60, 2, 1, 40, 3, 15)
+        self.assertEqual(config.get_config(), (self.edges, self.pos_nodes, 60, 2, 1, 40, 3, 15))
+
+    def test_unknown_graph(self):
+        with self.assertRaises(Exception):
+            cache_helper.interned_graph("missing")
+
+    def test_interned_graphs_are_bounded(self):
+        first = ConfigData(self.edges, self.pos_nodes, 60)
+        for size in range(cache_helper.MAX_INTERNED_GRAPHS + 5):
+            ConfigData([(vertex, vertex + 1) for vertex in range(size + 1)])
+        self.assertEqual(len(cache_helper._INTERNED_GRAPHS), cache_helper.MAX_INTERNED_GRAPHS)
+        self.assertFalse(cache_helper.is_interned(first.graph))
+        # A configuration keeps its graph after it is released
+        self.assertEqual(first.get_config()[:2], (self.edges, self.pos_nodes))
+        self.assertEqual(ConfigData(list(self.edges), {}, 60), first)
+
+
+if __name__ == '__main__':
+    unittest.main()
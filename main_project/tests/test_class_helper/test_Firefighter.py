@@ -19,6 +19,9 @@ class Treepatch:
         self._id = id
         self._ignited = ignited
 
+    def extinguish(self):
+        self._ignited = False
+
 class TestFirefighter(unittest.TestCase):
     def setUp(self):
         self.firefighter = Firefighter(firefighter_skill=50, health=80)
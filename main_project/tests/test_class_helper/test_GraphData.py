@@ -39,6 +39,14 @@ class TestGraphdata(unittest.TestCase):
         self.assertEqual(self.graph_data._rock_patches, [0])
         self.assertEqual(self.graph_data._ignited_tree_patches, [1])
 
+    def test_append_patch_counts(self):
+        self.graph_data.append_patch_counts(4, 2, 1)
+        self.graph_data.append_patch_counts(3, 3, 0)
+
+        self.assertEqual(self.graph_data._tree_patches, [4, 3])
+        self.assertEqual(self.graph_data._rock_patches, [2, 3])
+        self.assertEqual(self.graph_data._ignited_tree_patches, [1, 0])
+
     def test_update_rock_to_tree_counter(self):
         self.graph_data.update_rock_to_tree_counter()
         self.assertEqual(self.graph_data._rock_to_tree_counter, 1)
@@ -8,7 +8,8 @@ main_project_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..',
 # Add the module directory to the Python path
 sys.path.insert(0, main_project_dir)
 import unittest
-from ...class_helper import Rockpatch, Treepatch, Landpatch
+from ...class_helper import Rockpatch, Treepatch, Landpatch, UpdateClock
+import random
 
 class TestRockpatch(unittest.TestCase):
     def setUp(self):
@@ -25,5 +26,27 @@ class TestRockpatch(unittest.TestCase):
         self.assertEqual(new_treepatch.get_id(), 1)
         self.assertEqual(new_treepatch.get_neighbour_ids(), [2, 3])
 
+    def test_lazy_mutation_is_drawn_ahead(self):
+        clock = UpdateClock()
+        self.assertEqual(Rockpatch(1, [2, 3], mutate_chance=100, clock=clock, position=0)._mutates_at, 0)
+        self.assertEqual(Rockpatch(1, [2, 3], mutate_chance=-1, clock=clock, position=0)._mutates_at, float("inf"))
+
+        # A mutation in each step with probability 10 / 101, as randint(0, 100) <= 9
+        random.seed(0)
+        waits = [Rockpatch(1, [2, 3], mutate_chance=9, clock=clock, position=0)._mutates_at for _ in range(10000)]
+        self.assertAlmostEqual(waits.count(0) / len(waits), 10 / 101, delta=0.01)
+
+    def test_lazy_mutates_at_drawn_step(self):
+        clock = UpdateClock()
+        rockpatch = Rockpatch(1, [2, 3], mutate_chance=5, clock=clock, position=3)
+        rockpatch._mutates_at = 2
+        clock.step = 1
+        self.assertFalse(rockpatch.mutates_this_step())
+        clock.step = 2
+        self.assertTrue(rockpatch.mutates_this_step())
+        # A rock made after its position was evolved draws from the next step
+        clock.position = 4
+        self.assertGreaterEqual(Rockpatch(1, [2, 3], mutate_chance=100, clock=clock, position=3)._mutates_at, 3)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
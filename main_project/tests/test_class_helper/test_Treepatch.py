@@ -8,7 +8,7 @@ main_project_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..',
 # Add the module directory to the Python path
 sys.path.insert(0, main_project_dir)
 import unittest
-from ...class_helper import Rockpatch, Treepatch, Landpatch
+from ...class_helper import Rockpatch, Treepatch, Landpatch, UpdateClock
 import random
 
 class TestTreepatch(unittest.TestCase):
@@ -48,5 +48,95 @@ class TestTreepatch(unittest.TestCase):
         self.assertEqual(mutated_patch.get_id(), 1)
         self.assertEqual(mutated_patch.get_neighbour_ids(), [2, 3])
 
+    def test_lazy_regrowth(self):
+        clock = UpdateClock()
+        treepatch = Treepatch(1, [2, 3], autocombustion_prob=-1, tree_health=200, clock=clock, position=4)
+        # Two updates per step, regrown when read
+        clock.step = 2
+        self.assertEqual(treepatch._tree_health, 240)
+        # Patches before the clock position have been updated in the current step
+        clock.position = 5
+        self.assertEqual(treepatch._tree_health, 256)
+
+    def test_lazy_ignite_keeps_regrown_health(self):
+        clock = UpdateClock()
+        treepatch = Treepatch(1, [2, 3], autocombustion_prob=-1, tree_health=100, clock=clock, position=0)
+        clock.step = 1
+        treepatch.ignite()
+        treepatch.updateland()
+        self.assertEqual(treepatch._tree_health, 100)
+        # Put out after two more updates, the tree regrows from there
+        treepatch.updateland(2)
+        clock.position = 1
+        treepatch.extinguish()
+        clock.step = 3
+        clock.position = 0
+        self.assertEqual(treepatch._tree_health, 100)
+
+    def test_lazy_autocombustion_is_drawn_ahead(self):
+        clock = UpdateClock()
+        self.assertEqual(Treepatch(1, [2, 3], autocombustion_prob=100, clock=clock, position=0)._combusts_at, 1)
+        self.assertEqual(Treepatch(1, [2, 3], autocombustion_prob=-1, clock=clock, position=0)._combusts_at,
+                         float("inf"))
+
+        # Autocombustion in each update with probability 10 / 101, as randint(0, 100) <= 9
+        random.seed(0)
+        waits = [Treepatch(1, [2, 3], autocombustion_prob=9, clock=clock, position=0)._combusts_at
+                 for _ in range(10000)]
+        self.assertAlmostEqual(waits.count(1) / len(waits), 10 / 101, delta=0.01)
+        self.assertAlmostEqual(sum(waits) / len(waits), 101 / 10, delta=0.3)
+
+    def test_lazy_autocombustion_at_drawn_update(self):
+        clock = UpdateClock()
+        treepatch = Treepatch(1, [2, 3], autocombustion_prob=50, tree_health=100, clock=clock, position=0)
+        treepatch._combusts_at = 4
+        clock.step = 1
+        treepatch.updateland()
+        self.assertFalse(treepatch._ignited)
+        treepatch.updateland(2)
+        self.assertTrue(treepatch._ignited)
+        self.assertEqual(treepatch._tree_health, 140)
+
+    def test_lazy_autocombustion_drawn_again_after_burning(self):
+        clock = UpdateClock()
+        treepatch = Treepatch(1, [2, 3], autocombustion_prob=50, clock=clock, position=0)
+        treepatch._combusts_at = 3
+        treepatch.ignite()
+        # Put out after the drawn update has passed
+        clock.step = 3
+        treepatch.extinguish()
+        self.assertFalse(treepatch._ignited)
+        self.assertEqual(treepatch._touched, 6)
+        self.assertGreaterEqual(treepatch._combusts_at, 7)
+        treepatch.updateland()
+        self.assertEqual(treepatch._ignited, treepatch._combusts_at == 7)
+
+    def test_extinguish_without_clock(self):
+        self.treepatch._ignited = True
+        self.treepatch.extinguish()
+        self.assertFalse(self.treepatch._ignited)
+        self.assertEqual(self.treepatch._tree_health, 200)
+
+    def test_quiet_until_next_step(self):
+        clock = UpdateClock()
+        treepatch = Treepatch(1, [2, 3], autocombustion_prob=50, tree_health=100, clock=clock, position=0)
+        clock.step = 1
+        # Updates 3 and 4 belong to the second step
+        treepatch._combusts_at = 5
+        self.assertTrue(treepatch.quiet_until_next_step())
+        treepatch._combusts_at = 4
+        self.assertFalse(treepatch.quiet_until_next_step())
+        treepatch._combusts_at = 5
+        treepatch.ignite()
+        self.assertFalse(treepatch.quiet_until_next_step())
+        self.assertFalse(self.treepatch.quiet_until_next_step())
+
+    def test_lazy_mutate_keeps_clock(self):
+        clock = UpdateClock()
+        treepatch = Treepatch(1, [2, 3], clock=clock, position=7)
+        rockpatch = treepatch.mutate()
+        self.assertIs(rockpatch._clock, clock)
+        self.assertIs(rockpatch.mutate(autocombustion_prob=1)._clock, clock)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,57 @@
+import sys
+import os
+
+# Ensure other modules can be opened while perfoming tests.
+# Get the absolute path
+main_project_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+# Add the module directory to the Python path
+sys.path.insert(0, main_project_dir)
+
+import unittest
+import tempfile
+import numpy as np
+from ...csr_helper import CSRGraph, csr_from_edges, load_csr
+
+
+class TestCsrFromEdges(unittest.TestCase):
+
+    def test_neighbours_both_directions(self):
+        graph = csr_from_edges([(0, 1), (1, 2), (2, 0)])
+        self.assertEqual(graph.num_vertices(), 3)
+        self.assertEqual(graph.num_edges(), 3)
+        self.assertEqual(graph.neighbour_lists(), {0: [1, 2], 1: [0, 2], 2: [0, 1]})
+
+    def test_drops_duplicates_and_self_loops(self):
+        graph = csr_from_edges([(0, 1), (1, 0), (0, 1), (2, 2), (1, 2)])
+        self.assertEqual(graph.edge_array().tolist(), [[0, 1], [1, 2]])
+
+    def test_relabel_keeps_original_ids(self):
+        graph = csr_from_edges([(10, 20), (20, 30)], relabel=True)
+        self.assertEqual(graph.num_vertices(), 3)
+        self.assertEqual(graph.ids().tolist(), [10, 20, 30])
+        self.assertEqual(sorted(graph.iter_edges()), [(10, 20), (20, 30)])
+
+    def test_relabel_in_first_seen_order(self):
+        graph = csr_from_edges([(30, 20), (20, 10)], relabel=True, first_seen=True)
+        self.assertEqual(graph.ids().tolist(), [30, 20, 10])
+        self.assertEqual(graph.neighbour_lists(), {30: [20], 20: [30, 10], 10: [20]})
+
+    def test_isolated_vertices_left_out(self):
+        graph = csr_from_edges([(0, 1)], num_vertices=4)
+        self.assertEqual(graph.degrees().tolist(), [1, 1, 0, 0])
+        self.assertEqual(graph.neighbour_lists(), {0: [1], 1: [0]})
+
+    def test_save_and_load(self):
+        coords = np.array([[0, 0], [1, 0], [0, 1]], dtype=np.float32)
+        graph = csr_from_edges([(0, 1), (1, 2)], coords=coords)
+        with tempfile.TemporaryDirectory() as directory:
+            graph.save(directory)
+            loaded = load_csr(directory)
+            self.assertIsInstance(loaded.indices, np.memmap)
+            self.assertEqual(loaded.indices.tolist(), graph.indices.tolist())
+            self.assertEqual(loaded.positions(), graph.positions())
+            self.assertIsNone(loaded.vertex_ids)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+import sys
+import os
+
+# Ensure other modules can be opened while perfoming tests.
+# Get the absolute path
+main_project_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+# Add the module directory to the Python path
+sys.path.insert(0, main_project_dir)
+
+import unittest
+from unittest.mock import patch
+import numpy as np
+# Imported the way ensemble_helper imports them, so graphs are the same CSRGraph class
+from ensemble_helper import PackedReplicaEngine, ReplicaEngine, run_packed, _pack, _unpack
+from csr_helper import csr_from_edges
+from generator_helper import square_lattice
+from batch_forest import PARAM_DEFAULTS, run_object
+
+
+class TestPackedReplicaEngine(unittest.TestCase):
+
+    def setUp(self):
+        # A path 0 - 1 - 2 where every patch is a tree and nothing happens by chance
+        self.path = csr_from_edges([(0, 1), (1, 2)])
+        self.quiet = dict(tree_rate=100, firefighters=0, autocombustion_prob=-1, rock_mutate_prob=-1)
+
+    def test_pack_and_unpack(self):
+        flags = np.random.default_rng(0).random((5, 70)) < 0.5
+        words = _pack(flags)
+        self.assertEqual(words.shape, (5, 2))
+        self.assertEqual(int(words[0, 0]) & 1, int(flags[0, 0]))
+        np.testing.assert_array_equal(_unpack(words, 70), flags)
+
+    def test_bernoulli_words(self):
+        engine = PackedReplicaEngine(self.path, replicas=64, seed=1)
+        for probability in (0, 2 / 101, 0.3, 1):
+            bits = _unpack(engine._bernoulli_words(probability, (2000, 1)), 64)
+            self.assertAlmostEqual(bits.mean(), probability, delta=0.005)
+
+    def test_fire_crosses_later_trees_in_one_step(self):
+        engine = PackedReplicaEngine(self.path, fire_spread_prob=100, replicas=70, seed=1, **self.quiet)
+        state = engine.initial_state()
+        state.burning[0] = engine._valid
+        engine.step(state)
+        np.testing.assert_array_equal(_unpack(state.burning, 70).T, [[True, True, True]] * 70)
+        np.testing.assert_array_equal(state.health.T, [[216, 216, 216]] * 70)
+        np.testing.assert_array_equal(engine.counts(state), [[3, 0, 3]] * 70)
+
+    def test_fire_reaches_earlier_trees_after_their_turn(self):
+        engine = PackedReplicaEngine(self.path, fire_spread_prob=100, replicas=70, seed=1, **self.quiet)
+        state = engine.initial_state()
+        state.burning[2] = engine._valid
+        engine.step(state)
+        np.testing.assert_array_equal(_unpack(state.burning, 70).T, [[False, True, True]] * 70)
+        np.testing.assert_array_equal(state.health.T, [[256, 256, 216]] * 70)
+
+    def test_burnt_trees_become_rock(self):
+        engine = PackedReplicaEngine(self.path, fire_spread_prob=-1, replicas=1, seed=1, **self.quiet)
+        state = engine.initial_state()
+        state.burning[1] = 1
+        state.health[1] = 10
+        engine.step(state)
+        np.testing.assert_array_equal(_unpack(state.tree, 1).T, [[True, False, True]])
+        np.testing.assert_array_equal(_unpack(state.burnt, 1).T, [[False, True, False]])
+        np.testing.assert_array_equal(engine.counts(state), [[2, 1, 0]])
+
+    def test_extinguished_trees_below_zero_become_rock(self):
+        # Trees put out below zero health by a firefighter, as in the object engine
+        engine = PackedReplicaEngine(self.path, fire_spread_prob=-1, replicas=1, seed=1, **self.quiet)
+        state = engine.initial_state()
+        state.health[1:, 0] = [-15, -5]
+        engine.step(state)
+        np.testing.assert_array_equal(_unpack(state.tree, 1).T, [[True, False, True]])
+        np.testing.assert_array_equal(_unpack(state.burnt, 1).T, [[False, True, False]])
+        np.testing.assert_array_equal(state.health.T, [[256, 0, 15]])
+
+    def test_firefighters_extinguish_or_move(self):
+        engine = PackedReplicaEngine(self.path, firefighter_skill=100, fire_spread_prob=-1, replicas=2, seed=1,
+                                     **dict(self.quiet, firefighters=1))
+        state = engine.initial_state()
+        state.firefighters[:] = [[1], [0]]
+        state.burning[1] = 0b11
+        engine.step(state)
+        np.testing.assert_array_equal(_unpack(state.burning, 2)[1], [False, True])
+        np.testing.assert_array_equal(state.firefighters, [[1], [1]])
+
+    def test_push_and_pull_spread(self):
+        # Vertex 1 burning in every replica, the tree after it ignites going forward and the one before it backward
+        engine = PackedReplicaEngine(self.path, fire_spread_prob=100, replicas=70, seed=1, **self.quiet)
+        sources = np.zeros((3, 2), dtype=np.uint64)
+        sources[1] = engine._valid
+        targets = ~sources & engine._valid
+        for alpha in (0, 10 ** 9):
+            with patch("ensemble_helper.PUSH_PULL_ALPHA", alpha):
+                np.testing.assert_array_equal(engine._spread_fire(sources, targets, forward=True),
+                                              [[0, 0], [0, 0], engine._valid])
+                np.testing.assert_array_equal(engine._spread_fire(sources, targets, forward=False),
+                                              [engine._valid, [0, 0], [0, 0]])
+
+    def test_same_dynamics_as_replica_engine(self):
+        graph = square_lattice(20)
+        packed = PackedReplicaEngine(graph, sim_limit=20, replicas=200, seed=3).run()
+        arrays = ReplicaEngine(graph, sim_limit=20, replicas=200, seed=4).run()
+        self.assertEqual(packed.shape, (200, 3, 21))
+        np.testing.assert_array_equal(packed[:, 0] + packed[:, 1], 400)
+        # Mean series agree within a few standard errors
+        error = 4 * np.sqrt(packed.var(axis=0) / 200 + arrays.var(axis=0) / 200) + 1
+        self.assertTrue((np.abs(packed.mean(axis=0) - arrays.mean(axis=0)) <= error).all())
+
+    def test_same_dynamics_as_object_engine(self):
+        graph = square_lattice(8)
+        params = dict(PARAM_DEFAULTS, sim_limit=12)
+        objects = np.stack(list(run_object(graph, params, 600, 0).values()), axis=1)
+        packed = PackedReplicaEngine(graph, replicas=3000, seed=1, **params).run()
+        error = 4 * np.sqrt(objects.var(axis=0) / 600 + packed.var(axis=0) / 3000) + 0.5
+        self.assertTrue((np.abs(objects.mean(axis=0) - packed.mean(axis=0)) <= error).all())
+
+    def test_batch_engine(self):
+        batch = run_packed(square_lattice(4), dict(sim_limit=2), 3, 0)
+        self.assertEqual(batch["tree_patches"].shape, (3, 3))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,166 @@
+import sys
+import os
+
+# Ensure other modules can be opened while perfoming tests.
+# Get the absolute path
+main_project_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+# Add the module directory to the Python path
+sys.path.insert(0, main_project_dir)
+
+import unittest
+from unittest.mock import patch
+import numpy as np
+# Imported the way ensemble_helper imports them, so graphs are the same CSRGraph class
+from ensemble_helper import (ReplicaEngine, randint_probability, simulate_config, run_replicas, TREE, BURNING_TREE,
+                              BURNT_ROCK, HEALTH_MIN, _saturating_update)
+from csr_helper import csr_from_edges
+from generator_helper import square_lattice
+from class_helper import ConfigData
+from batch_forest import PARAM_DEFAULTS, run_object
+
+
+class TestReplicaEngine(unittest.TestCase):
+
+    def setUp(self):
+        # A path 0 - 1 - 2 where every patch is a tree and nothing happens by chance
+        self.path = csr_from_edges([(0, 1), (1, 2)])
+        self.quiet = dict(tree_rate=100, firefighters=0, autocombustion_prob=-1, rock_mutate_prob=-1)
+
+    def test_randint_probability(self):
+        self.assertEqual(randint_probability(1), 2 / 101)
+        self.assertEqual(randint_probability(100), 1)
+        self.assertEqual(randint_probability(-1), 0)
+
+    def test_fire_crosses_later_trees_in_one_step(self):
+        # Trees take their turn in vertex order, a tree ignited before its turn burns in it and spreads on
+        engine = ReplicaEngine(self.path, fire_spread_prob=100, replicas=2, seed=1, **self.quiet)
+        state = engine.initial_state()
+        state.codes[:, 0] = BURNING_TREE
+        engine.step(state)
+        np.testing.assert_array_equal(state.codes, [[BURNING_TREE] * 3] * 2)
+        # Burning trees lose 20 health per update
+        np.testing.assert_array_equal(state.health, [[216, 216, 216]] * 2)
+        np.testing.assert_array_equal(engine.counts(state), [[3, 0, 3]] * 2)
+
+    def test_fire_reaches_earlier_trees_after_their_turn(self):
+        engine = ReplicaEngine(self.path, fire_spread_prob=100, replicas=2, seed=1, **self.quiet)
+        state = engine.initial_state()
+        state.codes[:, 2] = BURNING_TREE
+        engine.step(state)
+        # Tree 1 had its turn before tree 2 ignited it, it burns from the next step
+        np.testing.assert_array_equal(state.codes, [[TREE, BURNING_TREE, BURNING_TREE]] * 2)
+        np.testing.assert_array_equal(state.health, [[256, 256, 216]] * 2)
+
+    def test_burnt_trees_become_rock(self):
+        engine = ReplicaEngine(self.path, fire_spread_prob=-1, replicas=1, seed=1, **self.quiet)
+        state = engine.initial_state()
+        state.codes[0, 1] = BURNING_TREE
+        state.health[0, 1] = 10
+        engine.step(state)
+        np.testing.assert_array_equal(state.codes, [[TREE, BURNT_ROCK, TREE]])
+        np.testing.assert_array_equal(state.health, [[256, 0, 256]])
+        np.testing.assert_array_equal(engine.counts(state), [[2, 1, 0]])
+
+    def test_extinguished_trees_below_zero_become_rock(self):
+        # Trees put out below zero health by a firefighter, as in the object engine
+        engine = ReplicaEngine(self.path, fire_spread_prob=-1, replicas=1, seed=1, **self.quiet)
+        state = engine.initial_state()
+        state.health[0, 1:] = [-15, -5]
+        engine.step(state)
+        np.testing.assert_array_equal(state.codes, [[TREE, BURNT_ROCK, TREE]])
+        np.testing.assert_array_equal(state.health, [[256, 0, 15]])
+        np.testing.assert_array_equal(engine.counts(state), [[2, 1, 0]])
+
+    def test_firefighters_extinguish_or_move(self):
+        engine = ReplicaEngine(self.path, firefighter_skill=100, fire_spread_prob=-1, replicas=2, seed=1,
+                               **dict(self.quiet, firefighters=1))
+        state = engine.initial_state()
+        state.firefighters[:] = [[1], [0]]
+        state.codes[:, 1] = BURNING_TREE
+        engine.step(state)
+        # The firefighter on the burning tree puts it out and stays, the other one moves to its only neighbour
+        np.testing.assert_array_equal(state.codes[:, 1], [TREE, BURNING_TREE])
+        np.testing.assert_array_equal(state.firefighters, [[1], [1]])
+
+    def test_push_and_pull_spread(self):
+        # A centre vertex burning in every replica, with four tree neighbours after it
+        star = csr_from_edges([(0, 1), (0, 2), (0, 3), (0, 4)])
+        engine = ReplicaEngine(star, fire_spread_prob=29, replicas=4000, seed=5, **self.quiet)
+        front = np.arange(4000) * 5
+        targets = np.ones((4000, 5), dtype=bool)
+        targets[:, 0] = False
+        # An alpha of 0 always pushes, a huge alpha always pulls
+        for alpha in (0, 10 ** 9):
+            with patch("ensemble_helper.PUSH_PULL_ALPHA", alpha):
+                ignited = np.zeros((4000, 5), dtype=bool)
+                ignited.flat[engine._spread_fire(front, targets, forward=True)] = True
+                self.assertEqual(len(engine._spread_fire(front, targets, forward=False)), 0)
+            self.assertFalse(ignited[:, 0].any())
+            self.assertAlmostEqual(ignited[:, 1:].mean(), 0.3, delta=0.02)
+
+    def test_saturating_update(self):
+        health = np.array([HEALTH_MIN, HEALTH_MIN, 250, 0], dtype=np.int16)
+        _saturating_update(health, np.array([BURNING_TREE, TREE, TREE, BURNT_ROCK], dtype=np.uint8))
+        np.testing.assert_array_equal(health, [HEALTH_MIN, HEALTH_MIN + 20 + 10, 256, 0])
+
+    def test_run_series(self):
+        graph = square_lattice(10)
+        first = ReplicaEngine(graph, sim_limit=8, replicas=16, seed=3).run()
+        second = ReplicaEngine(graph, sim_limit=8, replicas=16, seed=3).run()
+        np.testing.assert_array_equal(first, second)
+        self.assertEqual(first.shape, (16, 3, 9))
+        np.testing.assert_array_equal(first[:, 0, 0], 80)
+        np.testing.assert_array_equal(first[:, 0] + first[:, 1], 100)
+        self.assertTrue((first[:, 2] <= first[:, 0]).all())
+        # Replicas draw separately
+        self.assertGreater(len({tuple(row) for row in first[:, 2].tolist()}), 1)
+
+    @patch('ensemble_helper.DRAW_CHUNK', 64)
+    def test_initial_trees_drawn_by_chunk(self):
+        # 10 columns per chunk of 6 replicas, every replica still places exactly 80 trees, at any patch alike
+        engine = ReplicaEngine(square_lattice(10), replicas=6, seed=4, tree_rate=80)
+        states = [engine.initial_state() for _ in range(200)]
+        codes = np.stack([state.codes for state in states])
+        np.testing.assert_array_equal((codes == TREE).sum(axis=2), 80)
+        self.assertLess(np.abs((codes == TREE).mean(axis=(0, 1)) - 0.8).max(), 0.05)
+        np.testing.assert_array_equal(states[0].health, np.where(states[0].codes == TREE, 256, 0))
+
+    @patch('ensemble_helper.DRAW_CHUNK', 64)
+    def test_bernoulli_flags_drawn_by_chunk(self):
+        engine = ReplicaEngine(square_lattice(10), replicas=50, seed=6)
+        mask = np.zeros((50, 100), dtype=bool)
+        mask[:, ::3] = True
+        flags = engine._bernoulli_flags(mask, 0.25)
+        # Set only where the event can happen, with its probability
+        self.assertFalse((flags & ~mask).any())
+        self.assertAlmostEqual(flags.sum() / mask.sum(), 0.25, delta=0.03)
+        np.testing.assert_array_equal(engine._bernoulli_flags(mask, 1), mask)
+        self.assertFalse(engine._bernoulli_flags(mask, 0).any())
+
+    def test_same_dynamics_as_object_engine(self):
+        graph = square_lattice(8)
+        params = dict(PARAM_DEFAULTS, sim_limit=12)
+        objects = np.stack(list(run_object(graph, params, 600, 0).values()), axis=1)
+        arrays = ReplicaEngine(graph, replicas=3000, seed=1, **params).run()
+        # Mean series agree within a few standard errors
+        error = 4 * np.sqrt(objects.var(axis=0) / 600 + arrays.var(axis=0) / 3000) + 0.5
+        self.assertTrue((np.abs(objects.mean(axis=0) - arrays.mean(axis=0)) <= error).all())
+
+    def test_config_and_batch_engine(self):
+        edges = [(0, 1), (1, 2), (2, 3), (3, 0), (7, 8)]
+        series = simulate_config(ConfigData(edges, {}, 50, 1, 1, 30, 1, 4), replicas=5, seed=2)
+        self.assertEqual(series.shape, (5, 3, 5))
+        np.testing.assert_array_equal(series[:, 0, 0], 3)
+
+        # Configurations of generated and .ffg graphs hold a CSRGraph, which is simulated as it is
+        series = simulate_config(ConfigData(square_lattice(5), {}, 50, 1, 1, 30, 1, 4), replicas=5, seed=2)
+        self.assertEqual(series.shape, (5, 3, 5))
+        np.testing.assert_array_equal(series[:, 0, 0], 12)
+
+        batch = run_replicas(square_lattice(4), dict(sim_limit=2), 3, 0)
+        self.assertEqual(batch["ignited_tree_patches"].shape, (3, 3))
+
+
+if __name__ == '__main__':
+    unittest.main()
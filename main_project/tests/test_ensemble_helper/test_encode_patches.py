@@ -0,0 +1,54 @@
+import sys
+import os
+
+# Ensure other modules can be opened while perfoming tests.
+# Get the absolute path
+main_project_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+# Add the module directory to the Python path
+sys.path.insert(0, main_project_dir)
+
+import unittest
+import numpy as np
+# Imported the way ensemble_helper imports them, so patches are the same classes
+from ensemble_helper import encode_patches, decode_patches, ROCK, TREE, BURNING_TREE, BURNT_ROCK
+from class_helper import Treepatch, Rockpatch
+
+
+class TestEncodePatches(unittest.TestCase):
+
+    def setUp(self):
+        self.neighbours = {1: [2], 2: [1, 3], 3: [2, 4], 4: [3]}
+        burning = Treepatch(2, self.neighbours[2], autocombustion_prob=5, tree_health=-12)
+        burning._ignited = True
+        self.patches = {1: Treepatch(1, self.neighbours[1], autocombustion_prob=5, tree_health=130), 2: burning,
+                        3: Rockpatch(3, self.neighbours[3], mutate_chance=7), 4: Rockpatch(4, self.neighbours[4])}
+
+    def test_encode(self):
+        health, codes = encode_patches(self.patches, autocombustion_prob=5, rock_mutate_prob=7)
+        self.assertEqual((health.dtype, codes.dtype), (np.int16, np.uint8))
+        np.testing.assert_array_equal(health, [130, -12, 0, 0])
+        np.testing.assert_array_equal(codes, [TREE, BURNING_TREE, ROCK, BURNT_ROCK])
+
+    def test_round_trip(self):
+        health, codes = encode_patches(self.patches, [4, 3, 2, 1], 5, 7)
+        patches = decode_patches(health, codes, [4, 3, 2, 1], self.neighbours, 5, 7)
+        for vertex, patch in self.patches.items():
+            decoded = patches[vertex]
+            self.assertIs(type(decoded), type(patch))
+            self.assertEqual(decoded.get_neighbour_ids(), patch.get_neighbour_ids())
+            for attribute in ("_tree_health", "_ignited", "_autocombustion_prob", "_mutate_chance"):
+                self.assertEqual(getattr(decoded, attribute, None), getattr(patch, attribute, None))
+
+    def test_out_of_range(self):
+        self.patches[1]._tree_health = -40000
+        with self.assertRaises(Exception):
+            encode_patches(self.patches, autocombustion_prob=5, rock_mutate_prob=7)
+        # A rock patch whose mutate chance is neither of the two rock codes
+        self.patches[1]._tree_health = 130
+        with self.assertRaises(Exception):
+            encode_patches(self.patches, autocombustion_prob=5, rock_mutate_prob=3)
+
+
+if __name__ == '__main__':
+    unittest.main()
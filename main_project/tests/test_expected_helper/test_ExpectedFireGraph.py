@@ -0,0 +1,73 @@
+import sys
+import os
+
+# Ensure other modules can be opened while perfoming tests.
+# Get the absolute path
+main_project_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+# Add the module directory to the Python path
+sys.path.insert(0, main_project_dir)
+
+import unittest
+import numpy as np
+# Imported the way expected_helper imports them, so graphs are the same CSRGraph class
+from expected_helper import ExpectedFireGraph, burn_steps
+from batch_forest import PARAM_DEFAULTS, run_object
+from csr_helper import csr_from_edges
+
+
+class TestExpectedFireGraph(unittest.TestCase):
+
+    def setUp(self):
+        # Nothing happens by chance but the spread of fire
+        self.quiet = dict(tree_distribution=100, autocombustion=-1, rock_mutate_prob=-1)
+
+    def test_burn_steps(self):
+        self.assertEqual(burn_steps(256), 7)
+        self.assertEqual(burn_steps(39), 1)
+
+    def test_certain_spread_on_path(self):
+        graph = ExpectedFireGraph([(0, 1), (1, 2), (2, 3)], fire_spread_prob=100, sim_time=10, **self.quiet)
+        graph.simulate(ignited=[0])
+        data = graph._graph_data
+        # Fire crosses the trees after a burning one in vertex order in the same step, and they burn out a step
+        # sooner, all 7 steps after the first tree ignited
+        np.testing.assert_allclose(data._ignited_tree_patches, [1, 4, 4, 4, 4, 4, 4, 0, 0, 0, 0], atol=1e-6)
+        # Rocks left by burnt trees regrow with BURNT_ROCK_MUTATE_PROB from the step after
+        np.testing.assert_allclose(data._rock_patches[:9], [0] * 7 + [4, 4 * 99 / 101], atol=1e-6)
+        np.testing.assert_allclose(graph._vertex_series["ignited_tree_patches"][:, 3], [0] + [1] * 6 + [0] * 4,
+                                   atol=1e-6)
+
+    def test_fire_reaches_earlier_trees_next_step(self):
+        # Vertex 2 burns in its turn after vertex 1, which it ignites for the next step
+        graph = ExpectedFireGraph([(2, 1), (1, 0)], fire_spread_prob=100, sim_time=2, **self.quiet)
+        graph.simulate(ignited=[0])
+        np.testing.assert_allclose(graph._graph_data._ignited_tree_patches, [1, 2, 3], atol=1e-6)
+
+    def test_series_shape(self):
+        graph = ExpectedFireGraph([(5, 6), (6, 7), (9, 10)], tree_distribution=60, sim_time=4)
+        graph.simulate()
+        series = graph._vertex_series
+        self.assertEqual(series["tree_patches"].shape, (5, 5))
+        np.testing.assert_allclose(series["tree_patches"] + series["rock_patches"], 1)
+        np.testing.assert_allclose(graph._graph_data._tree_patches, series["tree_patches"].sum(axis=1))
+        self.assertEqual(graph._graph_data._tree_patches[0], 3)
+        self.assertEqual(graph._graph_data._land_patches, [5])
+
+        with self.assertRaises(Exception):
+            graph.simulate(ignited=[8])
+
+    def test_mean_of_replicas_on_a_tree(self):
+        # On a graph without cycles, neighbours only depend on each other through the edge between them
+        rng = np.random.default_rng(0)
+        graph = csr_from_edges([(vertex, int(rng.integers(0, vertex))) for vertex in range(1, 400)])
+        expected = ExpectedFireGraph(graph, fire_spread_prob=40, sim_time=20)
+        expected.simulate()
+        replicas = run_object(graph, dict(PARAM_DEFAULTS, firefighters=0, fire_spread_prob=40, sim_limit=20), 300, 0)
+        np.testing.assert_allclose(expected._graph_data._ignited_tree_patches,
+                                   replicas["ignited_tree_patches"].mean(axis=0), atol=8)
+        np.testing.assert_allclose(expected._graph_data._tree_patches, replicas["tree_patches"].mean(axis=0), atol=8)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -8,8 +8,9 @@ main_project_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..',
 # Add the module directory to the Python path
 sys.path.insert(0, main_project_dir)
 
-from ...file_helper import check_planar_graph
+from ...file_helper import check_planar_graph, max_planar_edges
 import unittest
+import tempfile
 from unittest.mock import patch, MagicMock
 
 class TestCheckPlanarGraph(unittest.TestCase):
@@ -33,6 +34,52 @@ class TestCheckPlanarGraph(unittest.TestCase):
         mock_print.assert_called()  # Add appropriate assert for print calls
 
 
+    @patch('file_helper.gh.edges_planar')
+    @patch('builtins.print')
+    def test_rejects_by_edge_count(self, mock_print, mock_edges_planar):
+        # K6 has 15 edges, more than 3 * 6 - 6 = 12
+        edges = [(u, v) for u in range(6) for v in range(u + 1, 6)]
+        self.assertFalse(check_planar_graph(edges))
+        mock_edges_planar.assert_not_called()
+
+    @patch('file_helper.gh.edges_planar')
+    @patch('builtins.print')
+    def test_repeated_edges_not_counted(self, mock_print, mock_edges_planar):
+        mock_edges_planar.return_value = True
+        edges = [(1, 2), (2, 1), (2, 3), (3, 2), (3, 1), (1, 3), (1, 1)]
+        self.assertTrue(check_planar_graph(edges))
+        mock_edges_planar.assert_called_once()
+
+    @patch('file_helper.gh.edges_planar')
+    @patch('builtins.print')
+    def test_planar_by_construction(self, mock_print, mock_edges_planar):
+        self.assertTrue(check_planar_graph([(1, 2)], planar_by_construction=True))
+        mock_edges_planar.assert_not_called()
+
+    @patch('file_helper.gh.edges_planar')
+    @patch('builtins.print')
+    def test_verdict_cached_by_content(self, mock_print, mock_edges_planar):
+        mock_edges_planar.return_value = True
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        filename = os.path.join(directory.name, "edges.dat")
+        with open(filename, "w") as file:
+            file.write("1, 2\n2, 3\n")
+
+        with patch.dict(os.environ, {"FOREST_CACHE_DIR": directory.name}):
+            self.assertTrue(check_planar_graph([(1, 2), (2, 3)], filename=filename))
+            self.assertTrue(check_planar_graph([(1, 2), (2, 3)], filename=filename))
+            mock_edges_planar.assert_called_once()
+
+            # A file with other content is tested again
+            with open(filename, "a") as file:
+                file.write("3, 1\n")
+            check_planar_graph([(1, 2), (2, 3), (3, 1)], filename=filename)
+            self.assertEqual(mock_edges_planar.call_count, 2)
+
+    def test_max_planar_edges(self):
+        self.assertEqual([max_planar_edges(v) for v in range(6)], [0, 0, 1, 3, 6, 9])
+
 
 if __name__ == '__main__':
     unittest.main()
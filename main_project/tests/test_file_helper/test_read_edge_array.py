@@ -0,0 +1,73 @@
+import sys
+import os
+
+# Ensure other modules can be opened while perfoming tests.
+# Get the absolute path
+main_project_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+# Add the module directory to the Python path
+sys.path.insert(0, main_project_dir)
+
+from ...file_helper import read_edge_array, parse_edge_block, create_edge_array_from_file
+import unittest
+import tempfile
+from unittest.mock import patch
+
+class TestReadEdgeArray(unittest.TestCase):
+
+    def write_file(self, content):
+        file = tempfile.NamedTemporaryFile("w", suffix=".dat", delete=False)
+        file.write(content)
+        file.close()
+        self.addCleanup(os.remove, file.name)
+        return file.name
+
+    def test_parse_block(self):
+        edges, invalid = parse_edge_block(b"# header\n(1, 2)\n3,4\n\n  5 ,6\t\n")
+        self.assertEqual(edges.tolist(), [[1, 2], [3, 4], [5, 6]])
+        self.assertEqual(invalid, [])
+
+    def test_numbers_of_every_length(self):
+        edges, invalid = parse_edge_block(b"0,123456789012345678\n# 1,2\n007, 10\n1234567890123456789,1\n99,5\n")
+        self.assertEqual(edges.tolist(), [[0, 123456789012345678], [7, 10], [99, 5]])
+        self.assertEqual(invalid, [4])
+
+    def test_invalid_lines_by_number(self):
+        edges, invalid = parse_edge_block(b"1, a\n1, 2\n3, 4, 5\n,1 2\n1 2, 3\n6, 7 # note\n8,9\n", first_line=10)
+        self.assertEqual(edges.tolist(), [[1, 2], [8, 9]])
+        self.assertEqual(invalid, [10, 12, 13, 14, 15])
+
+    def test_comment_lines_with_several_other_characters(self):
+        # Only the first character that is not part of an edge decides if a line is a comment
+        edges, invalid = parse_edge_block(b"# (a) b, c\n1, 2\nx # 3, 4\n  #1,2 ## c\n(5, 6) #\n")
+        self.assertEqual(edges.tolist(), [[1, 2]])
+        self.assertEqual(invalid, [3, 5])
+
+    def test_streams_blocks(self):
+        lines = [f"({i}, {i + 1})" for i in range(1000)]
+        filename = self.write_file("#comment\n" + "\n".join(lines))
+        for block_size in [7, 100, 1 << 20]:
+            edges, invalid = read_edge_array(filename, block_size=block_size)
+            self.assertEqual(edges.tolist(), [[i, i + 1] for i in range(1000)])
+            self.assertEqual(invalid, [])
+
+    def test_invalid_line_numbers_across_blocks(self):
+        filename = self.write_file("1,2\nbad\n3,4\n\n5,x\n6,7")
+        edges, invalid = read_edge_array(filename, block_size=5)
+        self.assertEqual(edges.tolist(), [[1, 2], [3, 4], [6, 7]])
+        self.assertEqual(invalid, [2, 5])
+
+    @patch('builtins.print')
+    def test_reports_invalid_lines_once(self, mock_print):
+        filename = self.write_file("\n".join(["x"] * 50 + ["1, 2"]))
+        edges = create_edge_array_from_file(filename)
+        self.assertEqual(edges.tolist(), [[1, 2]])
+        mock_print.assert_called_once()
+
+    @patch('builtins.print')
+    def test_missing_file(self, mock_print):
+        edges = create_edge_array_from_file("does_not_exist.dat")
+        self.assertEqual(edges.shape, (0, 2))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import sys
+import os
+
+# Ensure other modules can be opened while perfoming tests.
+# Get the absolute path
+main_project_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+# Add the module directory to the Python path
+sys.path.insert(0, main_project_dir)
+
+import unittest
+import tempfile
+import numpy as np
+import networkx as nx
+from ...generator_helper import square_lattice, triangular_lattice, hexagonal_lattice, delaunay_graph, voronoi_graph
+from ...csr_helper import load_csr
+
+
+class TestLattices(unittest.TestCase):
+
+    def to_networkx(self, graph):
+        nx_graph = nx.Graph()
+        nx_graph.add_edges_from(graph.iter_edges())
+        return nx_graph
+
+    def test_square_lattice(self):
+        graph = square_lattice(3, 4)
+        self.assertEqual(graph.num_vertices(), 12)
+        self.assertEqual(graph.num_edges(), 3 * 3 + 2 * 4)
+        self.assertEqual(graph.neighbour_lists()[5], [1, 4, 6, 9])
+
+    def test_triangular_lattice(self):
+        graph = triangular_lattice(3)
+        self.assertEqual(graph.num_edges(), 2 * 3 * 2 + 2 * 2)
+        self.assertEqual(graph.degrees()[4], 6)
+        self.assertTrue(nx.is_planar(self.to_networkx(graph)))
+
+    def test_hexagonal_lattice(self):
+        graph = hexagonal_lattice(6, 8)
+        self.assertLessEqual(graph.degrees().max(), 3)
+        self.assertTrue(nx.is_planar(self.to_networkx(graph)))
+        self.assertTrue(nx.is_connected(self.to_networkx(graph)))
+
+    def test_coordinates_in_unit_square(self):
+        for generator in [square_lattice, triangular_lattice, hexagonal_lattice]:
+            coords = generator(5, 7).coords
+            self.assertEqual(coords.shape, (35, 2))
+            self.assertGreaterEqual(coords.min(), 0)
+            self.assertLessEqual(coords.max(), 1)
+
+    def test_chunked_to_disk(self):
+        in_memory = triangular_lattice(9, 5)
+        with tempfile.TemporaryDirectory() as directory:
+            triangular_lattice(9, 5, out_dir=directory, chunk_rows=2)
+            on_disk = load_csr(directory)
+            np.testing.assert_array_equal(on_disk.indptr, in_memory.indptr)
+            np.testing.assert_array_equal(on_disk.indices, in_memory.indices)
+            np.testing.assert_array_equal(on_disk.coords, in_memory.coords)
+
+    def test_random_planar_generators(self):
+        for generator in [delaunay_graph, voronoi_graph]:
+            graph = generator(60, seed=2)
+            self.assertGreaterEqual(graph.num_vertices(), 60)
+            self.assertTrue(nx.is_planar(self.to_networkx(graph)))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -9,6 +9,7 @@ main_project_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..',
 sys.path.insert(0, main_project_dir)
 
 import unittest
+import tempfile
 from unittest.mock import patch
 from ...graph_forest import display_config_storage
 from io import StringIO
@@ -21,6 +22,14 @@ configuration_storage = [
 ]
 
 class TestDisplayConfigStorage(unittest.TestCase):
+    def setUp(self):
+        # Use an empty configuration store instead of the one in the user's cache directory
+        self.directory = tempfile.TemporaryDirectory()
+        environment = patch.dict(os.environ, {"FOREST_CACHE_DIR": self.directory.name})
+        environment.start()
+        self.addCleanup(environment.stop)
+        self.addCleanup(self.directory.cleanup)
+
     @patch('sys.stdout', new_callable=StringIO)
     def test_display_config_storage_output(self, mock_stdout):
         expected_output = ("Graph: 1\n{'param1': 'value1', 'param2': 'value2'}\n"
@@ -10,7 +10,10 @@ sys.path.insert(0, main_project_dir)
 
 
 from ...graph_forest import get_config_choice
+import class_helper as ch
+import store_helper as store
 import unittest
+import tempfile
 from unittest.mock import patch
 from io import StringIO
 
@@ -21,6 +24,19 @@ configuration_storage = [
 ]
 
 class TestGetConfigChoice(unittest.TestCase):
+    def setUp(self):
+        # Use an empty configuration store instead of the one in the user's cache directory
+        self.directory = tempfile.TemporaryDirectory()
+        environment = patch.dict(os.environ, {"FOREST_CACHE_DIR": self.directory.name})
+        environment.start()
+        self.addCleanup(environment.stop)
+        self.addCleanup(self.directory.cleanup)
+
+        # Two configurations to choose from, as in configuration_storage
+        with store.ConfigStore() as config_store:
+            for tree_rate in (60, 70):
+                config_store.add(ch.ConfigData([(0, 1), (1, 2), (2, 0)], {}, tree_rate, 2, 1, 40, 3, 15))
+
     @patch('sys.stdout', new_callable=StringIO)
     @patch('builtins.input', return_value='2')  # Simulate user input for testing (choosing the second config)
     def test_get_config_choice(self, mock_input, mock_stdout):
@@ -45,5 +61,11 @@ class TestGetConfigChoice(unittest.TestCase):
         self.assertEqual(result, expected_output)
         self.assertEqual(choice, 2)  # Ensure the function returns the correct choice
 
+    @patch('sys.stdout', new_callable=StringIO)
+    @patch('builtins.input', return_value='1')
+    def test_get_config_choice_empty_storage(self, mock_input, mock_stdout):
+        self.assertIsNone(get_config_choice([]))
+        mock_input.assert_not_called()
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,45 @@
+import sys
+import os
+
+# Ensure other modules can be opened while perfoming tests.
+# Get the absolute path
+main_project_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+# Add the module directory to the Python path
+sys.path.insert(0, main_project_dir)
+
+import unittest
+import tempfile
+from unittest.mock import patch
+from ...graph_forest import record_run
+from ...sim_forest import ForestFireGraph
+# Imported the way graph_forest imports them, so the stores are found in the same cache directory
+from class_helper import ConfigData
+import store_helper as store
+
+
+class TestRecordRun(unittest.TestCase):
+    def setUp(self):
+        # Use an empty results database instead of the one in the user's cache directory
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        environment = patch.dict(os.environ, {"FOREST_CACHE_DIR": directory.name})
+        environment.start()
+        self.addCleanup(environment.stop)
+
+    def test_firefighter_skill_is_recorded(self):
+        edges = [(0, 1), (1, 2), (2, 0)]
+        config = ConfigData(edges, {}, 50, 1, 1, 30, 1, 2)
+        graph = ForestFireGraph(edges, tree_distribution=50, firefighters=1, sim_time=2, renderer=None)
+        graph.simulate()
+
+        record_run(config, graph, 0.5)
+
+        with store.ResultStore() as results:
+            run, = results.runs()
+        # The interactive engine runs with the default skill, as batch runs do
+        self.assertEqual(run["firefighter_skill"], 25)
+        self.assertEqual(run["fire_spread_prob"], 30)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import sys
+import os
+
+# Ensure other modules can be opened while perfoming tests.
+# Get the absolute path
+main_project_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+# Add the module directory to the Python path
+sys.path.insert(0, main_project_dir)
+
+import unittest
+import numpy as np
+from ...graph_helper import voronoi_to_edges, voronoi_arrays, voronoi_seed_count, edges_planar
+
+
+class TestVoronoiToEdges(unittest.TestCase):
+
+    def test_minimum_vertices(self):
+        for minpoints in [4, 5, 17, 250]:
+            edges, pos_nodes = voronoi_to_edges(minpoints, seed=minpoints)
+            self.assertGreaterEqual(len(pos_nodes), minpoints)
+            self.assertTrue(edges_planar(edges))
+
+    def test_vertices_in_unit_square(self):
+        edges, pos_nodes = voronoi_to_edges(100, seed=3)
+        vertices = {vertex for edge in edges for vertex in edge}
+        self.assertEqual(vertices, set(pos_nodes))
+        for x, y in pos_nodes.values():
+            self.assertTrue(0 <= x <= 1 and 0 <= y <= 1)
+
+    def test_seed_is_reproducible(self):
+        self.assertEqual(voronoi_to_edges(50, seed=7), voronoi_to_edges(50, seed=7))
+
+    def test_too_few_points(self):
+        with self.assertRaises(Exception):
+            voronoi_to_edges(3)
+
+    def test_arrays_no_duplicate_edges(self):
+        edges, coords = voronoi_arrays(1000, seed=1)
+        self.assertEqual(edges.shape[1], 2)
+        self.assertEqual(len(np.unique(np.sort(edges, axis=1), axis=0)), len(edges))
+        self.assertEqual(edges.max() + 1, len(coords))
+
+    def test_seed_count_prediction(self):
+        # The prediction should need at most one retry for large graphs
+        self.assertLess(voronoi_seed_count(10000), 10000)
+        self.assertGreater(voronoi_seed_count(10000), 5000)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import sys
+import os
+
+# Ensure other modules can be opened while perfoming tests.
+# Get the absolute path
+main_project_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+# Add the module directory to the Python path
+sys.path.insert(0, main_project_dir)
+
+# Imported the way graph_forest imports them, so CSRGraph is the same class
+from graphfile_helper import write_graph_file, open_graph_file, is_graph_file, convert_dat_file, load_graph
+from csr_helper import csr_from_edges
+import unittest
+import tempfile
+import numpy as np
+
+class TestGraphFile(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = os.path.join(self.directory.name, "graph.ffg")
+
+    def test_round_trip_edges_only(self):
+        edges = np.array([[1, 5], [5, 9], [9, 1]])
+        write_graph_file(self.path, edges)
+        graph_file = open_graph_file(self.path)
+        self.assertIsInstance(graph_file.edges, np.memmap)
+        self.assertEqual(graph_file.edges.tolist(), edges.tolist())
+        self.assertIsNone(graph_file.csr)
+        self.assertEqual(sorted(graph_file.graph().iter_edges()), [(1, 5), (1, 9), (5, 9)])
+
+    def test_round_trip_csr_and_coords(self):
+        edges = np.array([[10, 20], [20, 30], [30, 40], [40, 10]])
+        csr = csr_from_edges(edges, relabel=True)
+        csr.coords = np.array([[0, 0], [1, 0], [1, 1], [0, 1]], dtype=np.float32)
+        write_graph_file(self.path, edges, csr)
+
+        stored = open_graph_file(self.path).csr
+        self.assertEqual(stored.indptr.tolist(), csr.indptr.tolist())
+        self.assertEqual(stored.indices.tolist(), csr.indices.tolist())
+        self.assertEqual(stored.vertex_ids.tolist(), [10, 20, 30, 40])
+        self.assertEqual(stored.positions()[30], (1.0, 1.0))
+        self.assertEqual(stored.neighbour_lists(), csr.neighbour_lists())
+
+    def test_sections_are_aligned(self):
+        write_graph_file(self.path, np.array([[0, 1], [1, 2]]), csr_from_edges([(0, 1), (1, 2)]))
+        csr = open_graph_file(self.path).csr
+        for array in (csr.indptr, csr.indices):
+            self.assertEqual(array.offset % 64, 0)
+
+    def test_is_graph_file(self):
+        dat_path = os.path.join(self.directory.name, "edges.dat")
+        with open(dat_path, "w") as file:
+            file.write("1, 2\n")
+        write_graph_file(self.path, [(1, 2)])
+        self.assertTrue(is_graph_file(self.path))
+        self.assertFalse(is_graph_file(dat_path))
+        self.assertFalse(is_graph_file("does_not_exist.ffg"))
+
+    def test_not_a_graph_file(self):
+        with open(self.path, "wb") as file:
+            file.write(b"\0" * 200)
+        with self.assertRaises(ValueError):
+            open_graph_file(self.path)
+
+    def test_empty_graph(self):
+        write_graph_file(self.path, np.empty((0, 2), dtype=np.int64))
+        self.assertEqual(open_graph_file(self.path).edges.shape, (0, 2))
+
+    def test_convert_dat_file(self):
+        dat_path = os.path.join(self.directory.name, "edges.dat")
+        with open(dat_path, "w") as file:
+            file.write("# square\n(1, 2)\n2, 3\n3,4\n4,1\n")
+        graph_file = convert_dat_file(dat_path, self.path)
+        self.assertEqual(graph_file.edges.tolist(), [[1, 2], [2, 3], [3, 4], [4, 1]])
+        self.assertEqual(graph_file.csr.neighbour_lists(), {1: [2, 4], 2: [1, 3], 3: [2, 4], 4: [1, 3]})
+
+        # Both formats load to the same graph
+        self.assertEqual(load_graph(dat_path).neighbour_lists(), load_graph(self.path).neighbour_lists())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import sys
+import os
+
+# Ensure other modules can be opened while perfoming tests.
+# Get the absolute path
+main_project_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+# Add the module directory to the Python path
+sys.path.insert(0, main_project_dir)
+
+# Imported the way visualiser_random_forest_graph imports them, so patches apply to the same module
+from layout_helper import spectral_layout, compute_layout, cached_layout
+from cache_helper import GraphCache, edge_set_hash
+import unittest
+import tempfile
+import networkx as nx
+import numpy as np
+from unittest.mock import patch
+
+class TestCachedLayout(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.cache = GraphCache(self.directory.name)
+
+    def test_edge_set_hash(self):
+        self.assertEqual(edge_set_hash([(1, 2), (2, 3)]), edge_set_hash([(3, 2), (2, 1), (1, 2), (4, 4)]))
+        self.assertNotEqual(edge_set_hash([(1, 2), (2, 3)]), edge_set_hash([(1, 2), (1, 3)]))
+
+    def test_spectral_layout_of_grid(self):
+        graph = nx.convert_node_labels_to_integers(nx.grid_2d_graph(30, 30))
+        layout = spectral_layout(graph)
+        coords = np.array([layout[node] for node in graph.nodes()])
+        self.assertEqual(coords.shape, (900, 2))
+        self.assertAlmostEqual(coords.min(), 0.0)
+        self.assertAlmostEqual(coords.max(), 1.0)
+        # Neighbours are placed close to each other
+        lengths = [np.linalg.norm(coords[u] - coords[v]) for u, v in graph.edges()]
+        self.assertLess(max(lengths), 0.1)
+
+    def test_spectral_layout_separates_components(self):
+        graph = nx.Graph([(0, 1), (1, 2), (2, 0), (10, 11), (11, 12), (12, 10)])
+        layout = spectral_layout(graph)
+        self.assertEqual(len(set(layout.values())), 6)
+
+    def test_unknown_method(self):
+        with self.assertRaises(Exception):
+            compute_layout(nx.Graph([(0, 1)]), "circle")
+
+    def test_layout_cached_per_edge_set(self):
+        graph = nx.Graph([(0, 1), (1, 2), (2, 3), (3, 0)])
+        with patch('layout_helper.compute_layout', wraps=compute_layout) as mock_compute:
+            first = cached_layout(graph, "spring", self.cache)
+            # Same edge set in another order and graph object is read from the cache
+            again = cached_layout(nx.Graph([(3, 0), (2, 3), (1, 2), (0, 1)]), "spring", self.cache)
+            self.assertEqual(mock_compute.call_count, 1)
+            self.assertEqual(first, again)
+
+            cached_layout(graph, "spectral", self.cache)
+            self.assertEqual(mock_compute.call_count, 2)
+
+if __name__ == '__main__':
+    unittest.main()
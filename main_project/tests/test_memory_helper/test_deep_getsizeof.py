@@ -0,0 +1,46 @@
+import sys
+import os
+
+# Ensure other modules can be opened while perfoming tests.
+# Get the absolute path
+main_project_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+# Add the module directory to the Python path
+sys.path.insert(0, main_project_dir)
+
+import unittest
+from ...memory_helper import deep_getsizeof
+
+
+class Patch:
+    def __init__(self, neighbour_ids):
+        self._neighbour_ids = neighbour_ids
+
+
+class TestDeepGetsizeof(unittest.TestCase):
+
+    def test_counts_nested_containers(self):
+        inner = [1000, 2000, 3000]
+        outer = {"key": inner}
+        self.assertGreater(deep_getsizeof(outer), sys.getsizeof(outer) + sys.getsizeof(inner))
+
+    def test_follows_instance_attributes(self):
+        neighbours = list(range(1000, 1100))
+        patch = Patch(neighbours)
+        self.assertGreaterEqual(deep_getsizeof(patch), deep_getsizeof(neighbours))
+
+    def test_shared_objects_counted_once(self):
+        neighbours = list(range(1000, 1100))
+        seen = set()
+        first = deep_getsizeof({0: neighbours}, seen)
+        second = deep_getsizeof(Patch(neighbours), seen)
+        self.assertGreater(first, second)
+        self.assertLess(second, deep_getsizeof(neighbours))
+
+    def test_cyclic_references(self):
+        cycle = []
+        cycle.append(cycle)
+        self.assertEqual(deep_getsizeof(cycle), sys.getsizeof(cycle))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import sys
+import os
+
+# Ensure other modules can be opened while perfoming tests.
+# Get the absolute path
+main_project_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+# Add the module directory to the Python path
+sys.path.insert(0, main_project_dir)
+
+import unittest
+import tracemalloc
+from unittest.mock import patch
+from ...sim_forest import ForestFireGraph
+from ...memory_helper import deep_getsizeof, memory_breakdown
+
+
+class TestSimulateMemoryReport(unittest.TestCase):
+
+    def setUp_test_graph(self):
+        """Create instance of ForestFireGraph for testing"""
+        custom_edges = [(0, 1), (1, 2), (2, 0), (2, 3), (3, 0)]
+        custom_pos_nodes = {0: (0, 0), 1: (1, 1), 2: (2, 2), 3: (0, 2)}
+
+        return ForestFireGraph(edges=custom_edges, pos_nodes=custom_pos_nodes, sim_time=2)
+
+    @patch('matplotlib.pyplot.savefig')
+    @patch('matplotlib.pyplot.pause')
+    @patch('time.sleep')
+    def test_no_report_by_default(self, mock_sleep, mock_pause, mock_savefig):
+        test = self.setUp_test_graph()
+        self.assertIsNone(test.simulate())
+
+    @patch('matplotlib.pyplot.savefig')
+    @patch('matplotlib.pyplot.pause')
+    @patch('time.sleep')
+    def test_memory_breakdown(self, mock_sleep, mock_pause, mock_savefig):
+        test = self.setUp_test_graph()
+        report = test.simulate(memory_report=True)
+
+        for subsystem in ["patches_map", "neighbour_lists", "graph_data", "vis_figure"]:
+            self.assertIn(subsystem, report.breakdown)
+        self.assertGreater(report.breakdown["patches_map"], 0)
+        self.assertEqual(report.total(), sum(report.breakdown.values()))
+        self.assertEqual(report.snapshots, [])
+
+    @patch('matplotlib.pyplot.savefig')
+    @patch('matplotlib.pyplot.pause')
+    @patch('time.sleep')
+    def test_memory_breakdown_adds_up(self, mock_sleep, mock_pause, mock_savefig):
+        test = self.setUp_test_graph()
+        test.simulate()
+        breakdown = memory_breakdown(test)
+
+        for subsystem in ["components", "component_of", "component_counts", "patch_counts", "clock"]:
+            self.assertGreater(breakdown[subsystem], 0)
+        total = deep_getsizeof(test)
+        self.assertAlmostEqual(sum(breakdown.values()), total, delta=total * 0.01)
+
+    @patch('matplotlib.pyplot.savefig')
+    @patch('matplotlib.pyplot.pause')
+    @patch('time.sleep')
+    def test_trace_steps(self, mock_sleep, mock_pause, mock_savefig):
+        test = self.setUp_test_graph()
+        report = test.simulate(trace_steps=[0, 2], trace_top=3)
+
+        self.assertEqual([snapshot.step for snapshot in report.snapshots], [0, 2])
+        self.assertLessEqual(len(report.snapshots[1].top_sites), 3)
+        self.assertEqual(report.breakdown, {})
+
+    def test_failed_run_stops_tracing(self):
+        test = ForestFireGraph([(0, 1), (1, 2), (2, 0)], sim_time=2, renderer=None)
+        # Frames can not be recorded headless, so the run fails after tracing started
+        with self.assertRaises(Exception):
+            test.simulate(trace_steps=[0, 1], record_to="frames")
+
+        self.assertFalse(tracemalloc.is_tracing())
+
+if __name__ == '__main__':
+    unittest.main()
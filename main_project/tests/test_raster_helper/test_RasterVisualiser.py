@@ -0,0 +1,80 @@
+import sys
+import os
+
+# Ensure other modules can be opened while perfoming tests.
+# Get the absolute path
+main_project_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+# Add the module directory to the Python path
+sys.path.insert(0, main_project_dir)
+
+from ...raster_helper import RasterVisualiser, pixel_indices, GREENS, REDS, NO_COLOUR, BACKGROUND, HIGHLIGHT
+from ...sim_forest import ForestFireGraph
+import unittest
+import numpy as np
+from unittest.mock import patch, MagicMock
+
+class TestRasterVisualiser(unittest.TestCase):
+
+    def setUp(self):
+        # Two vertices share the bottom left pixel, vertex 4 is alone at the top right
+        self.edges = [(1, 2), (2, 3), (3, 4)]
+        self.pos = {1: (0.0, 0.0), 2: (0.01, 0.0), 3: (1.0, 0.0), 4: (1.0, 1.0)}
+        self.visualiser = RasterVisualiser(self.edges, pos_nodes=self.pos, resolution=10, show=False)
+
+    def test_pixel_indices(self):
+        pixels, width, height = pixel_indices(np.array([[0, 0], [2, 1], [2, 0]]), 5)
+        self.assertEqual((width, height), (5, 3))
+        # y grows upwards, image rows grow downwards
+        self.assertEqual(pixels.tolist(), [2 * 5 + 0, 0 * 5 + 4, 2 * 5 + 4])
+
+    def test_colours_per_pixel(self):
+        self.visualiser.update_node_colours({1: 100, 2: 200, 3: -56})
+        image = self.visualiser.image()
+        self.assertEqual(image.shape, (10, 10, 3))
+        self.assertEqual(image[9, 0].tolist(), GREENS[150].tolist())
+        self.assertEqual(image[9, 9].tolist(), REDS[56].tolist())
+        self.assertEqual(image[0, 9].tolist(), NO_COLOUR.tolist())
+        self.assertEqual(image[5, 5].tolist(), BACKGROUND.tolist())
+
+    def test_fire_drawn_over_trees(self):
+        self.visualiser.update_node_colours({1: 256, 2: -200})
+        self.assertEqual(self.visualiser.image()[9, 0].tolist(), REDS[200].tolist())
+
+    def test_highlighted_vertices(self):
+        self.visualiser.update_node_edges([4])
+        self.assertEqual(self.visualiser.image()[0, 9].tolist(), HIGHLIGHT.tolist())
+
+    def test_update_nodes_records_one_frame(self):
+        recorder = MagicMock()
+        self.visualiser.set_recorder(recorder)
+        self.visualiser.update_nodes({1: 100, 3: -56}, [4])
+        recorder.record.assert_called_once()
+        image = self.visualiser.image()
+        self.assertEqual(image[9, 9].tolist(), REDS[56].tolist())
+        self.assertEqual(image[0, 9].tolist(), HIGHLIGHT.tolist())
+
+    def test_values_in_vertex_order(self):
+        visualiser = RasterVisualiser([(0, 1), (1, 2)], pos_nodes={0: (0, 0), 1: (0.5, 0), 2: (1, 0)},
+                                      resolution=3, show=False)
+        visualiser.update_node_values(np.array([10, 0, -10]))
+        self.assertEqual(visualiser.image()[0].tolist(), [GREENS[10].tolist(), NO_COLOUR.tolist(), REDS[10].tolist()])
+
+    def test_frames_recorded(self):
+        recorder = MagicMock()
+        self.visualiser.set_recorder(recorder)
+        self.visualiser.update_node_colours({1: 10})
+        recorder.record.assert_called_once()
+        self.assertEqual(recorder.record.call_args[0][0].shape, (10, 10, 3))
+
+    @patch('time.sleep')
+    @patch('matplotlib.pyplot.pause')
+    def test_forest_fire_graph_renderer(self, mock_pause, mock_sleep):
+        graph = ForestFireGraph(self.edges, pos_nodes=self.pos, sim_time=2, renderer="raster")
+        self.assertEqual(type(graph._vis_graph).__name__, "RasterVisualiser")
+        graph.simulate()
+        self.assertEqual(len(graph._graph_data._tree_patches), 3)
+        graph._vis_graph.close()
+
+if __name__ == '__main__':
+    unittest.main()
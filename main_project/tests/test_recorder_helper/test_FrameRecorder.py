@@ -0,0 +1,152 @@
+import sys
+import os
+
+# Ensure other modules can be opened while perfoming tests.
+# Get the absolute path
+main_project_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+# Add the module directory to the Python path
+sys.path.insert(0, main_project_dir)
+
+from ...recorder_helper import FrameRecorder
+from ... import recorder_helper
+from ...sim_forest import ForestFireGraph
+import unittest
+import tempfile
+import threading
+import numpy as np
+from PIL import Image
+from unittest.mock import patch, Mock
+
+class TestFrameRecorder(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def frames(self, count):
+        return [np.full((12, 16, 4), 20 * i, dtype=np.uint8) for i in range(count)]
+
+    def test_png_sequence(self):
+        path = os.path.join(self.directory.name, "frames")
+        with FrameRecorder(path) as recorder:
+            for frame in self.frames(3):
+                recorder.record(frame)
+        self.assertEqual(sorted(os.listdir(path)), ["frame_00000.png", "frame_00001.png", "frame_00002.png"])
+        image = np.asarray(Image.open(os.path.join(path, "frame_00002.png")))
+        self.assertEqual(image.shape, (12, 16, 3))
+        self.assertEqual(int(image[0, 0, 0]), 40)
+
+    def test_gif_animation(self):
+        path = os.path.join(self.directory.name, "run.gif")
+        recorder = FrameRecorder(path, fps=10)
+        for frame in self.frames(4):
+            recorder.record(frame)
+        recorder.close()
+        self.assertEqual(recorder.frames_written(), 4)
+        self.assertEqual(Image.open(path).n_frames, 4)
+
+    def test_gif_frame_limit(self):
+        path = os.path.join(self.directory.name, "run.gif")
+        with patch.object(recorder_helper, "MAX_GIF_FRAMES", 2):
+            recorder = FrameRecorder(path)
+            frames = self.frames(3)
+            recorder.record(frames[0])
+            recorder.record(frames[1])
+            with self.assertRaises(Exception):
+                recorder.record(frames[2])
+        recorder.close()
+        self.assertEqual(Image.open(path).n_frames, 2)
+
+    def test_gif_refused_before_recording(self):
+        path = os.path.join(self.directory.name, "run.gif")
+        with patch.object(recorder_helper, "MAX_GIF_FRAMES", 2):
+            with self.assertRaises(Exception):
+                FrameRecorder(path, frames=3)
+            FrameRecorder(path, frames=2).close()
+
+    def test_frame_buffer_is_copied(self):
+        path = os.path.join(self.directory.name, "frames")
+        buffer = np.zeros((4, 4, 3), dtype=np.uint8)
+        with FrameRecorder(path) as recorder:
+            recorder.record(buffer)
+            buffer[:] = 255
+        self.assertEqual(int(np.asarray(Image.open(os.path.join(path, "frame_00000.png"))).max()), 0)
+
+    def test_backpressure(self):
+        path = os.path.join(self.directory.name, "frames")
+        release = threading.Event()
+        recorder = FrameRecorder(path, queue_size=1)
+        write = recorder._write
+        recorder._write = lambda frame: (release.wait(), write(frame))
+
+        # The writer holds one frame and the queue one more, the third frame must wait
+        recorder.record(self.frames(1)[0])
+        recorder.record(self.frames(1)[0])
+        third = threading.Thread(target=recorder.record, args=(self.frames(1)[0],))
+        third.start()
+        third.join(0.2)
+        self.assertTrue(third.is_alive())
+
+        release.set()
+        third.join()
+        recorder.close()
+        self.assertEqual(recorder.frames_written(), 3)
+
+    def test_unsupported_format(self):
+        with self.assertRaises(Exception):
+            FrameRecorder(os.path.join(self.directory.name, "run.avi"))
+
+    @patch('time.sleep')
+    @patch('matplotlib.pyplot.pause')
+    @patch('matplotlib.pyplot.savefig')
+    def test_simulate_records_instead_of_saving(self, mock_savefig, mock_pause, mock_sleep):
+        edges = [(0, 1), (1, 2), (2, 3), (3, 0), (0, 2)]
+        graph = ForestFireGraph(edges, pos_nodes={0: (0, 0), 1: (1, 0), 2: (1, 1), 3: (0, 1)}, sim_time=3)
+        mock_savefig.reset_mock()
+
+        path = os.path.join(self.directory.name, "frames")
+        graph.simulate(record_to=path)
+
+        mock_savefig.assert_not_called()
+        # One frame per step
+        self.assertEqual(len(os.listdir(path)), 3)
+        self.assertIsNone(graph._vis_graph._recorder)
+        graph._vis_graph.close()
+
+    @patch('time.sleep')
+    @patch('matplotlib.pyplot.pause')
+    @patch('matplotlib.pyplot.savefig')
+    def test_interrupted_simulate_closes_recorder(self, mock_savefig, mock_pause, mock_sleep):
+        edges = [(0, 1), (1, 2), (2, 3), (3, 0), (0, 2)]
+        graph = ForestFireGraph(edges, pos_nodes={0: (0, 0), 1: (1, 0), 2: (1, 1), 3: (0, 1)}, sim_time=3)
+        # The run stops in the second step, after the frames of the first
+        graph._graph_data.append_patch_counts = Mock(side_effect=[None, KeyboardInterrupt])
+
+        path = os.path.join(self.directory.name, "frames")
+        with self.assertRaises(KeyboardInterrupt):
+            graph.simulate(record_to=path)
+
+        self.assertEqual(len(os.listdir(path)), 1)
+        self.assertIsNone(graph._vis_graph._recorder)
+        graph._vis_graph.close()
+
+    @patch('time.sleep')
+    @patch('matplotlib.pyplot.pause')
+    @patch('matplotlib.pyplot.savefig')
+    def test_simulate_refuses_long_gif_before_running(self, mock_savefig, mock_pause, mock_sleep):
+        edges = [(0, 1), (1, 2), (2, 3), (3, 0), (0, 2)]
+        graph = ForestFireGraph(edges, pos_nodes={0: (0, 0), 1: (1, 0), 2: (1, 1), 3: (0, 1)}, sim_time=3)
+        graph._graph_data.append_patch_counts = Mock()
+
+        # simulate imports recorder_helper by its module name
+        with patch("recorder_helper.MAX_GIF_FRAMES", 2):
+            with self.assertRaises(Exception):
+                graph.simulate(record_to=os.path.join(self.directory.name, "run.gif"))
+
+        graph._graph_data.append_patch_counts.assert_not_called()
+        self.assertIsNone(graph._vis_graph._recorder)
+        graph._vis_graph.close()
+
+if __name__ == '__main__':
+    unittest.main()
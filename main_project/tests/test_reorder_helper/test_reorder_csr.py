@@ -0,0 +1,75 @@
+import sys
+import os
+
+# Ensure other modules can be opened while perfoming tests.
+# Get the absolute path
+main_project_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+# Add the module directory to the Python path
+sys.path.insert(0, main_project_dir)
+
+import unittest
+import numpy as np
+# Imported the way reorder_helper imports them, so graphs are the same CSRGraph class
+from reorder_helper import hilbert_order, morton_order, reorder_csr
+from csr_helper import csr_from_edges
+from generator_helper import square_lattice
+
+
+def shuffled_lattice(rows: int):
+    """Return a square lattice with its vertices numbered at random, like a graph read from a file"""
+
+    lattice = square_lattice(rows)
+    permutation = np.random.default_rng(0).permutation(lattice.num_vertices())
+    rank = np.argsort(permutation)
+    return csr_from_edges(rank[lattice.edge_array()], coords=np.asarray(lattice.coords)[permutation])
+
+
+def sorted_neighbours(graph) -> dict:
+    """Return the neighbour lists of a graph, each sorted by vertex id"""
+
+    return {vertex: sorted(neighbours) for vertex, neighbours in graph.neighbour_lists().items()}
+
+
+def mean_span(graph) -> float:
+    """Return the mean difference of the vertex numbers of the ends of an edge"""
+
+    return np.abs(graph.edge_array()[:, 0] - graph.edge_array()[:, 1]).mean()
+
+
+class TestReorderCSR(unittest.TestCase):
+
+    def test_curve_orders(self):
+        corners = np.array([[0.0, 0.0], [1.0, 0.0], [0.0, 1.0], [1.0, 1.0]])
+        np.testing.assert_array_equal(hilbert_order(corners, bits=1), [0, 2, 3, 1])
+        np.testing.assert_array_equal(morton_order(corners, bits=1), [0, 1, 2, 3])
+
+    def test_vertex_ids_are_unchanged(self):
+        graph = shuffled_lattice(12)
+        for order in ("auto", "hilbert", "morton", "rcm"):
+            reordered = reorder_csr(graph, order)
+            self.assertEqual(sorted(map(sorted, reordered.iter_edges())), sorted(map(sorted, graph.iter_edges())))
+            self.assertEqual(sorted_neighbours(reordered), sorted_neighbours(graph))
+            self.assertEqual(reordered.positions(), graph.positions())
+            # Neighbours stay sorted within each row
+            for v in range(reordered.num_vertices()):
+                row = reordered.indices[reordered.indptr[v]:reordered.indptr[v + 1]]
+                self.assertTrue((np.diff(row) > 0).all())
+
+    def test_locality(self):
+        graph = shuffled_lattice(40)
+        for order in ("hilbert", "morton", "rcm"):
+            self.assertLess(mean_span(reorder_csr(graph, order)), mean_span(graph) / 10)
+
+    def test_invalid_orders(self):
+        without_positions = csr_from_edges([(0, 1), (1, 2)])
+        with self.assertRaises(Exception):
+            reorder_csr(without_positions, "hilbert")
+        with self.assertRaises(Exception):
+            reorder_csr(without_positions, "random")
+        # Without positions, auto falls back to reverse Cuthill-McKee
+        self.assertEqual(sorted_neighbours(reorder_csr(without_positions)), sorted_neighbours(without_positions))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -8,10 +8,21 @@ main_project_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..',
 # Add the module directory to the Python path
 sys.path.insert(0, main_project_dir)
 import unittest
+import tempfile
+from unittest.mock import patch
 from ...sim_forest import ForestFireGraph
 
 
 class TestForestFireGraphInitialization(unittest.TestCase):
+
+    def setUp(self):
+        # Layouts of graphs without positions are cached in a temporary directory, not in the home directory
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        environment = patch.dict(os.environ, {"FOREST_CACHE_DIR": directory.name})
+        environment.start()
+        self.addCleanup(environment.stop)
+
     def test_default_initialization(self):
         graph = ForestFireGraph(edges=[(0, 1), (1, 2)])
         
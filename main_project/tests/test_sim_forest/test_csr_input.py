@@ -0,0 +1,48 @@
+import sys
+import os
+
+# Ensure other modules can be opened while perfoming tests.
+# Get the absolute path
+main_project_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+# Add the module directory to the Python path
+sys.path.insert(0, main_project_dir)
+
+import unittest
+import tempfile
+from unittest.mock import patch
+from ...sim_forest import ForestFireGraph
+# Imported the way sim_forest imports them, so CSRGraph is the same class
+from csr_helper import csr_from_edges
+from generator_helper import square_lattice
+
+
+# test ForestFireGraph built from array graphs
+class TestForestFireGraphCsrInput(unittest.TestCase):
+
+    def setUp(self):
+        # Layouts of graphs without positions are cached in a temporary directory, not in the home directory
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        environment = patch.dict(os.environ, {"FOREST_CACHE_DIR": directory.name})
+        environment.start()
+        self.addCleanup(environment.stop)
+
+    def test_neighbours_match_edge_list(self):
+        edges = [(0, 1), (1, 2), (2, 0), (2, 3)]
+        from_list = ForestFireGraph(edges=edges)
+        from_csr = ForestFireGraph(edges=csr_from_edges(edges))
+
+        self.assertEqual(sorted(from_csr._vertices_list), sorted(from_list._vertices_list))
+        for vertex, neighbours in from_list._vertices_neighbours.items():
+            self.assertEqual(sorted(from_csr._vertices_neighbours[vertex]), sorted(neighbours))
+
+    def test_positions_from_coordinates(self):
+        graph = ForestFireGraph(edges=square_lattice(3), tree_distribution=50)
+
+        self.assertEqual(len(graph._vertices_list), 9)
+        self.assertEqual(graph._pos_nodes[8], (1.0, 1.0))
+        self.assertEqual(graph._graph_data._land_patches, [9])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import sys
+import os
+
+# Ensure other modules can be opened while perfoming tests.
+# Get the absolute path
+main_project_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+# Add the module directory to the Python path
+sys.path.insert(0, main_project_dir)
+
+import unittest
+import random
+from unittest.mock import patch
+# Imported the way sim_forest imports them, so patches are the same classes
+from sim_forest import ForestFireGraph
+from class_helper import Graphdata, Treepatch, Rockpatch
+
+
+class TestDormantComponents(unittest.TestCase):
+
+    def setUp(self):
+        # A triangle, a path and a single edge
+        self.edges = [(0, 1), (1, 2), (2, 0), (3, 4), (4, 5), (6, 7)]
+
+    def test_find_components(self):
+        graph = ForestFireGraph(self.edges, renderer=None)
+        self.assertEqual(graph._components, [[(0, 0), (1, 1), (2, 2)], [(3, 3), (4, 4), (5, 5)], [(6, 6), (7, 7)]])
+
+    def test_dormant_components_are_skipped(self):
+        # All trees, nothing happens by chance and fire always spreads, so only the triangle burns
+        graph = ForestFireGraph(self.edges, tree_distribution=100, firefighters=0, autocombustion=-1,
+                                fire_spread_prob=100, rock_mutate_prob=-1, sim_time=20, renderer=None)
+        graph._patches_map[0].ignite()
+        evolved = set()
+        evolve_patch = graph._evolve_patch
+
+        def record(position, vertex, patch):
+            evolved.add(vertex)
+            evolve_patch(position, vertex, patch)
+
+        with patch.object(graph, "_evolve_patch", record):
+            graph.simulate()
+
+        self.assertEqual(evolved, {0, 1, 2})
+        self.assertEqual(graph._graph_data._tree_patches[-1], 5)
+        self.assertEqual(graph._graph_data._rock_patches[-1], 3)
+        # The trees of the other components kept regrowing
+        self.assertTrue(all(graph._patches_map[vertex]._tree_health == 256 for vertex in range(3, 8)))
+
+    def test_fire_free_component_sleeps_with_menu_parameters(self):
+        # With the lowest probabilities graph_forest accepts, trees autocombust and rocks turn into trees now and then,
+        # so a component without fire is only evolved in the steps where that happens
+        random.seed(1)
+        graph = ForestFireGraph(self.edges, tree_distribution=50, firefighters=0, autocombustion=1,
+                                fire_spread_prob=30, rock_mutate_prob=1, sim_time=30, renderer=None)
+        for vertex in (6, 7):
+            graph._patches_map[vertex] = Rockpatch(vertex, graph._vertices_neighbours[vertex], mutate_chance=1,
+                                                   clock=graph._clock, position=vertex)
+        graph._patches_map[6]._mutates_at = 12
+        graph._patches_map[7]._mutates_at = 20
+
+        evolved = []
+        evolve_patch = graph._evolve_patch
+
+        def record(position, vertex, patch):
+            if vertex in (6, 7):
+                evolved.append((graph._clock.step, vertex))
+            evolve_patch(position, vertex, patch)
+
+        with patch.object(graph, "_evolve_patch", record):
+            graph.simulate()
+
+        # Asleep until the first rock turns into a tree in step 12
+        self.assertEqual(evolved[:2], [(12, 6), (12, 7)])
+        self.assertIsInstance(graph._patches_map[6], Treepatch)
+        self.assertLess(len(evolved), 2 * 30)
+
+    def test_counts_match_full_recount(self):
+        random.seed(4)
+        edges = [(2 * i, 2 * i + 1) for i in range(30)] + [(100 + i, 101 + i) for i in range(20)]
+        graph = ForestFireGraph(edges, firefighters=2, autocombustion=5, fire_spread_prob=60, rock_mutate_prob=-1,
+                                sim_time=25, renderer=None)
+        recount = Graphdata()
+        append_patch_counts = graph._graph_data.append_patch_counts
+
+        def record(*counts):
+            recount.update_patches(graph._patches_map)
+            append_patch_counts(*counts)
+
+        graph._graph_data.append_patch_counts = record
+        graph.simulate()
+
+        data = graph._graph_data
+        self.assertEqual(data._tree_patches[1:], recount._tree_patches)
+        self.assertEqual(data._rock_patches[1:], recount._rock_patches)
+        self.assertEqual(data._ignited_tree_patches[1:], recount._ignited_tree_patches)
+        # Burnt out components of rock stay dormant
+        self.assertGreater(data._rock_patches[-1], data._rock_patches[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,30 @@
+import sys
+import os
+
+# Ensure other modules can be opened while perfoming tests.
+# Get the absolute path
+main_project_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+# Add the module directory to the Python path
+sys.path.insert(0, main_project_dir)
+
+import unittest
+import subprocess
+from ...startup_benchmark import imported_heavy_modules, HEAVY_MODULES
+
+
+class TestLazyImports(unittest.TestCase):
+
+    def test_headless_run_imports_no_heavy_modules(self):
+        self.assertEqual(imported_heavy_modules(), [])
+
+    def test_helper_modules_import_no_heavy_modules(self):
+        code = ("import sim_forest, class_helper, graph_helper, store_helper, batch_forest, expected_helper, sys\n"
+                "print(' '.join(m for m in sys.modules if m.split('.')[0] in %r))" % (HEAVY_MODULES,))
+        output = subprocess.run([sys.executable, "-c", code], cwd=main_project_dir, check=True,
+                                capture_output=True, text=True)
+        self.assertEqual(output.stdout.split(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
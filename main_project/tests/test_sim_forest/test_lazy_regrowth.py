@@ -0,0 +1,66 @@
+import sys
+import os
+
+# Ensure other modules can be opened while perfoming tests.
+# Get the absolute path
+main_project_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+# Add the module directory to the Python path
+sys.path.insert(0, main_project_dir)
+
+import unittest
+import random
+from unittest import mock
+# Imported the way sim_forest imports them, so patches are the same classes
+from sim_forest import ForestFireGraph
+from class_helper import Treepatch, Rockpatch
+from generator_helper import square_lattice
+
+
+def observed_health(lazy: bool, seed: int, **params) -> list:
+    """Return the type, ignition and health of every patch after each step of a seeded headless run, with fire started
+    on some trees. Trees do not autocombust, so eager updates leave out their autocombustion draws, and rocks draw in
+    every step also with a clock, so both runs draw the same random numbers"""
+
+    random.seed(seed)
+    with mock.patch.object(Rockpatch, "_schedule_mutation", lambda self, steps: setattr(self, "_mutates_at", steps)):
+        graph = ForestFireGraph(square_lattice(8), renderer=None, autocombustion=-1, **params)
+    trees = [patch for patch in graph._patches_map.values() if isinstance(patch, Treepatch)]
+    for tree in random.sample(trees, 3):
+        tree.ignite()
+    if not lazy:
+        # Without a clock, trees regrow eagerly in every update
+        for patch in graph._patches_map.values():
+            tree_health = getattr(patch, "_tree_health", None)
+            patch._clock = None
+            if isinstance(patch, Treepatch):
+                patch._tree_health = tree_health
+
+    observed = []
+    append_patch_counts = graph._graph_data.append_patch_counts
+
+    def record(*counts):
+        observed.append([(type(patch).__name__, getattr(patch, "_ignited", None), getattr(patch, "_tree_health", None))
+                         for patch in graph._patches_map.values()])
+        append_patch_counts(*counts)
+
+    graph._graph_data.append_patch_counts = record
+    with mock.patch.object(Treepatch, "check_autocombust", lambda self: None), \
+            mock.patch.object(Rockpatch, "_schedule_mutation", lambda self, steps: setattr(self, "_mutates_at", steps)), \
+            mock.patch.object(Rockpatch, "mutates_this_step", lambda self: random.randint(0, 100) <= self._mutate_chance):
+        graph.simulate()
+
+    return observed
+
+
+class TestLazyRegrowth(unittest.TestCase):
+
+    def test_same_health_as_eager_updates(self):
+        for seed in range(10):
+            params = dict(sim_time=20, firefighters=seed % 4, fire_spread_prob=10 + 8 * seed,
+                          rock_mutate_prob=seed % 5, firefighter_average_skill=90)
+            self.assertEqual(observed_health(True, seed, **params), observed_health(False, seed, **params))
+
+
+if __name__ == '__main__':
+    unittest.main()
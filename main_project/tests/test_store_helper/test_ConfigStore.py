@@ -0,0 +1,108 @@
+import sys
+import os
+
+# Ensure other modules can be opened while perfoming tests.
+# Get the absolute path
+main_project_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+# Add the module directory to the Python path
+sys.path.insert(0, main_project_dir)
+
+import unittest
+import tempfile
+import numpy as np
+# Imported the way store_helper imports them, so ConfigData is the same class
+from store_helper import ConfigStore
+from class_helper import ConfigData
+from csr_helper import CSRGraph, csr_from_edges
+import cache_helper
+import graphfile_helper
+
+
+class TestConfigStore(unittest.TestCase):
+
+    def setUp(self):
+        # Start without interned graphs, so graphs are read from the store
+        cache_helper._INTERNED_GRAPHS.clear()
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "configurations.sqlite")
+        self.store = ConfigStore(self.path)
+        self.edges = [(1, 2), (2, 3), (3, 1), (3, 4)]
+        self.pos_nodes = {1: (0.0, 0.0), 2: (1.0, 0.0), 3: (0.5, 1.0), 4: (0.5, 2.0)}
+
+    def tearDown(self):
+        self.store.close()
+        self.directory.cleanup()
+
+    def test_add_and_load(self):
+        config = ConfigData(self.edges, self.pos_nodes, 60, 2, 1, 40, 3, 15)
+        config_id = self.store.add(config)
+        loaded = self.store.load(config_id)
+        self.assertEqual(loaded, config)
+        self.assertIsInstance(loaded.sim_time, int)
+
+    def test_persists_between_stores(self):
+        self.store.add(ConfigData(self.edges, {}, 60, 2, 1, 40, 3, 15))
+        self.store.close()
+        cache_helper._INTERNED_GRAPHS.clear()
+        self.store = ConfigStore(self.path)
+        self.assertEqual(len(self.store), 1)
+        # The graph is read as the memory mapped CSRGraph of its file, its vertices in the order of self.edges
+        graph = self.store.load(self.store.configurations()[0].config_id).edges
+        self.assertIsInstance(graph, CSRGraph)
+        self.assertIsInstance(graph.indices, np.memmap)
+        self.assertEqual(graph.ids().tolist(), [1, 2, 3, 4])
+        self.assertEqual(sorted(map(sorted, graph.iter_edges())), sorted(map(sorted, self.edges)))
+
+    def test_add_graph_from_binary_file(self):
+        # A configuration on a binary graph file holds the CSRGraph of the file, as in graph_forest
+        csr = csr_from_edges(self.edges, relabel=True)
+        csr.coords = [self.pos_nodes[vertex] for vertex in csr.vertex_ids.tolist()]
+        path = os.path.join(self.directory.name, "graph.ffg")
+        graphfile_helper.write_graph_file(path, self.edges, csr)
+        graph = graphfile_helper.open_graph_file(path).graph()
+
+        config_id = self.store.add(ConfigData(graph, {}, 60))
+        cache_helper._INTERNED_GRAPHS.clear()
+        loaded = self.store.load(config_id)
+        self.assertEqual(sorted(map(sorted, loaded.edges.iter_edges())), sorted(map(sorted, self.edges)))
+        self.assertEqual(loaded.edges.positions(), self.pos_nodes)
+        self.assertEqual(loaded.graph, cache_helper.edge_set_hash(self.edges))
+
+    def test_graphs_are_shared_by_content(self):
+        self.store.add(ConfigData(self.edges, {}, 60))
+        # Same edge set in another order and direction
+        self.store.add(ConfigData([(4, 3), (1, 3), (2, 1), (3, 2)], self.pos_nodes, 70))
+        first, second = self.store.configurations()
+        self.assertEqual(first.graph, second.graph)
+        self.assertEqual(len(os.listdir(os.path.join(self.directory.name, "stored_graphs"))), 1)
+        # Positions given later are stored with the shared graph
+        cache_helper._INTERNED_GRAPHS.clear()
+        self.assertEqual(self.store.load(first.config_id).edges.positions(), self.pos_nodes)
+        self.assertEqual((first.num_vertices, first.num_edges), (4, 4))
+
+    def test_query_by_parameter_range(self):
+        for fire_spread_prob in range(0, 100, 10):
+            self.store.add(ConfigData(self.edges, {}, 50, 3, 1, fire_spread_prob))
+        self.store.add(ConfigData([(0, 1)], {}, 50, 5, 1, 30))
+
+        self.assertEqual([c.fire_spread_prob for c in self.store.configurations(fire_spread_prob=(20, 40))],
+                         [20, 30, 40, 30])
+        self.assertEqual(len(self.store.configurations(fire_spread_prob=(None, 15))), 2)
+        self.assertEqual(len(self.store.configurations(fire_spread_prob=30, firefighters=3)), 1)
+        graph = self.store.configurations(firefighters=5)[0].graph
+        self.assertEqual(len(self.store.configurations(graph=graph)), 1)
+        self.assertEqual(len(self.store.configurations(limit=4)), 4)
+        with self.assertRaises(Exception):
+            self.store.configurations(wind=(0, 1))
+
+    def test_remove(self):
+        config_id = self.store.add(ConfigData(self.edges))
+        self.store.remove(config_id)
+        self.assertEqual(len(self.store), 0)
+        with self.assertRaises(Exception):
+            self.store.load(config_id)
+
+
+if __name__ == '__main__':
+    unittest.main()
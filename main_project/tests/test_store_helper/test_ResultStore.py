@@ -0,0 +1,98 @@
+import sys
+import os
+
+# Ensure other modules can be opened while perfoming tests.
+# Get the absolute path
+main_project_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+# Add the module directory to the Python path
+sys.path.insert(0, main_project_dir)
+
+import unittest
+import tempfile
+import multiprocessing
+import numpy as np
+from ...store_helper import ResultStore, config_key
+
+
+def record_runs(path, worker):
+    """Record runs from a worker process"""
+    with ResultStore(path, batch_size=7) as results:
+        for spread in range(10):
+            series = {name: np.full((5, 4), spread) for name in ("tree_patches", "rock_patches", "ignited_tree_patches")}
+            results.add_runs("graph", {"fire_spread_prob": spread}, series, seed=worker * 100)
+    return worker
+
+
+class TestResultStore(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "results.sqlite")
+        self.results = ResultStore(self.path, batch_size=3)
+        self.params = {"tree_rate": 80, "firefighters": 3, "fire_spread_prob": 30, "sim_limit": 3}
+
+    def tearDown(self):
+        self.results.close()
+        self.directory.cleanup()
+
+    def stored_runs(self):
+        with ResultStore(self.path) as other:
+            return len(other)
+
+    def test_add_run_statistics_and_series(self):
+        series = {"tree_patches": [10, 9, 7, 6], "rock_patches": [2, 3, 5, 6], "ignited_tree_patches": [0, 4, 2, 0]}
+        self.results.add_run("graph", self.params, series, engine="object", seed=5, wall_seconds=0.5, land_patches=12)
+        [run] = self.results.runs()
+        self.assertEqual(run["config"], config_key("graph", self.params))
+        self.assertEqual((run["seed"], run["steps"], run["land_patches"], run["wall_seconds"]), (5, 3, 12, 0.5))
+        self.assertEqual((run["final_tree_patches"], run["final_rock_patches"]), (6, 6))
+        self.assertEqual((run["peak_ignited_tree_patches"], run["total_ignited_tree_patches"]), (4, 6))
+        self.assertEqual(run["mean_ignited_tree_patches"], 1.5)
+        self.assertIsNone(run["firefighter_skill"])
+        self.assertEqual({name: values.tolist() for name, values in self.results.series(run["id"]).items()}, series)
+
+    def test_batches_and_persistence(self):
+        series = {name: np.arange(8).reshape(2, 4) for name in ("tree_patches", "rock_patches", "ignited_tree_patches")}
+        self.results.add_runs("graph", self.params, series, seed=1, wall_seconds=2.0)
+        # Two runs are buffered, below the batch size, then all four are written together
+        self.assertEqual(self.stored_runs(), 0)
+        self.results.add_runs("graph", self.params, series, seed=3)
+        self.assertEqual(self.stored_runs(), 4)
+        self.results.close()
+
+        self.results = ResultStore(self.path)
+        runs = self.results.runs()
+        self.assertEqual([run["seed"] for run in runs], [1, 2, 3, 4])
+        self.assertEqual(runs[0]["wall_seconds"], 1.0)
+
+    def test_mean_by_parameter(self):
+        for spread in (10, 20, 30):
+            for burnt in (spread, spread + 2):
+                series = {"tree_patches": [5, 5], "rock_patches": [0, 0], "ignited_tree_patches": [0, burnt]}
+                self.results.add_run("graph", dict(self.params, fire_spread_prob=spread), series)
+        self.results.add_run("other", self.params, {"tree_patches": [1], "rock_patches": [0],
+                                                    "ignited_tree_patches": [100]})
+
+        self.assertEqual(self.results.mean_by("total_ignited_tree_patches", "fire_spread_prob", graph="graph"),
+                         [(10, 11.0, 2), (20, 21.0, 2), (30, 31.0, 2)])
+        self.assertEqual(self.results.mean_by("total_ignited_tree_patches", "fire_spread_prob", graph="graph",
+                                              fire_spread_prob=(15, None)), [(20, 21.0, 2), (30, 31.0, 2)])
+        self.assertEqual(len(self.results.runs(fire_spread_prob=30)), 3)
+        self.assertEqual(len(self.results.runs(graph="other", limit=5)), 1)
+        with self.assertRaises(Exception):
+            self.results.mean_by("colour", "fire_spread_prob")
+        with self.assertRaises(Exception):
+            self.results.add_run("graph", {"wind": 1}, {})
+
+    def test_concurrent_writers(self):
+        self.results.close()
+        with multiprocessing.get_context("spawn").Pool(3) as pool:
+            pool.starmap(record_runs, [(self.path, worker) for worker in range(3)])
+        self.results = ResultStore(self.path)
+        self.assertEqual(len(self.results), 3 * 10 * 5)
+        self.assertEqual(len({run["id"] for run in self.results.runs()}), 150)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import sys
+import os
+
+# Ensure other modules can be opened while perfoming tests.
+# Get the absolute path
+main_project_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+# Add the module directory to the Python path
+sys.path.insert(0, main_project_dir)
+
+from ...visualiser_random_forest_graph import Visualiser
+import unittest
+import numpy as np
+from unittest.mock import patch
+
+class TestNodeColours(unittest.TestCase):
+
+    def setUp(self):
+        self.edges = [(5, 3), (3, 9), (9, 5), (9, 1)]
+        self.pos = {5: (0, 0), 3: (1, 0), 9: (1, 1), 1: (0, 1)}
+        self.visualiser = Visualiser(self.edges, {5: 200, 3: -40, 9: 0}, pos_nodes=self.pos)
+        self.addCleanup(self.visualiser.close)
+
+    def expected(self, colour_map):
+        # Colour of each node, the way it is looked up one node at a time
+        colours = [Visualiser.no_colour] * 4
+        for key, val in colour_map.items():
+            index = list(self.visualiser._H.nodes()).index(key)
+            colours[index] = Visualiser.colour_map[0](val) if val > 0 else Visualiser.colour_map[1](-val)
+        return np.array(colours)
+
+    def test_initial_colours(self):
+        np.testing.assert_allclose(self.visualiser._cmap, self.expected({5: 200, 3: -40, 9: 0}))
+
+    @patch('matplotlib.pyplot.pause')
+    @patch('matplotlib.pyplot.savefig')
+    def test_update_node_colours(self, mock_savefig, mock_pause):
+        colour_map = {5: -256, 3: 256, 9: 17, 1: -1}
+        self.visualiser.update_node_colours(colour_map)
+        np.testing.assert_allclose(self.visualiser._cmap, self.expected(colour_map))
+
+    @patch('matplotlib.pyplot.pause')
+    @patch('matplotlib.pyplot.savefig')
+    def test_highlighted_nodes_use_node_colour(self, mock_savefig, mock_pause):
+        # Node ids are not positions in the drawing order, highlighting must look them up
+        self.visualiser.update_node_edges([9])
+        mock_savefig.assert_called_once()
+
+if __name__ == '__main__':
+    unittest.main()
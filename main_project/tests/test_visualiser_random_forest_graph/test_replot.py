@@ -0,0 +1,67 @@
+import sys
+import os
+
+# Ensure other modules can be opened while perfoming tests.
+# Get the absolute path
+main_project_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+# Add the module directory to the Python path
+sys.path.insert(0, main_project_dir)
+
+from ...visualiser_random_forest_graph import Visualiser
+import unittest
+import numpy as np
+from unittest.mock import patch
+
+class TestReplot(unittest.TestCase):
+
+    def setUp(self):
+        edges = [(5, 3), (3, 9), (9, 5), (9, 1)]
+        pos = {5: (0, 0), 3: (1, 0), 9: (1, 1), 1: (0, 1)}
+        self.visualiser = Visualiser(edges, {5: 200}, pos_nodes=pos, frame_pause=0.05)
+        self.addCleanup(self.visualiser.close)
+
+    @patch('matplotlib.pyplot.pause')
+    @patch('matplotlib.pyplot.savefig')
+    def test_artists_created_once(self, mock_savefig, mock_pause):
+        self.visualiser.update_node_colours({5: 10})
+        nodes = self.visualiser._nodes
+        artists = len(self.visualiser._ax.get_children())
+        self.visualiser.update_node_colours({5: -10, 3: 100})
+        self.visualiser.update_node_edges([9, 1])
+        self.assertIs(self.visualiser._nodes, nodes)
+        self.assertEqual(len(self.visualiser._ax.get_children()), artists)
+        mock_pause.assert_called_with(0.05)
+
+    @patch('matplotlib.pyplot.pause')
+    @patch('matplotlib.pyplot.savefig')
+    def test_highlighted_nodes(self, mock_savefig, mock_pause):
+        self.visualiser.update_node_colours({5: 10, 9: -50})
+        self.visualiser.update_node_edges([9, 5])
+        offsets = self.visualiser._highlight.get_offsets()
+        self.assertEqual(np.asarray(offsets).tolist(), [[1, 1], [0, 0]])
+        np.testing.assert_allclose(self.visualiser._highlight.get_facecolor()[0], Visualiser.colour_map[1](50))
+
+        self.visualiser.update_node_edges([])
+        self.assertEqual(len(self.visualiser._highlight.get_offsets()), 0)
+
+    @patch('matplotlib.pyplot.pause')
+    @patch('matplotlib.pyplot.savefig')
+    def test_update_nodes_draws_one_frame(self, mock_savefig, mock_pause):
+        self.visualiser.update_nodes({5: 10, 9: -50}, [9])
+        self.assertEqual(mock_savefig.call_count, 1)
+        self.assertEqual(np.asarray(self.visualiser._highlight.get_offsets()).tolist(), [[1, 1]])
+        np.testing.assert_allclose(self.visualiser._highlight.get_facecolor()[0], Visualiser.colour_map[1](50))
+
+    @patch('matplotlib.pyplot.pause')
+    @patch('matplotlib.pyplot.savefig')
+    def test_blitted_frame_matches_full_draw(self, mock_savefig, mock_pause):
+        self.visualiser.update_node_colours({5: 10, 3: -100})
+        self.visualiser.update_node_edges([3])
+        canvas = self.visualiser._fig.canvas
+        blitted = np.asarray(canvas.buffer_rgba()).copy()
+        canvas.draw()
+        np.testing.assert_array_equal(blitted, np.asarray(canvas.buffer_rgba()))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,6 +5,7 @@ Requirements
 ------------
 Package matplotlib https://matplotlib.org/ which can be installed via PIP.
 Package networkx https://networkx.org/ which can be installed via PIP.
+Package numpy https://numpy.org/ which can be installed via PIP.
 Python 3.7 or higher.
 
 
@@ -18,23 +19,30 @@ from __future__ import annotations # to use a class in type hints of its members
 from typing import List, Optional, Dict, Tuple
 import matplotlib.pyplot as plt
 import networkx as nx
+import numpy as np
+from csr_helper import CSRGraph
+from recorder_helper import FrameRecorder
+from layout_helper import cached_layout
 
 class Visualiser:
   """Each instance of this class maintains a window where it displays the status of a given collection of edges and sites forming the graph of a simulation."""
   colour_map={0:plt.cm.Greens,1:plt.cm.Reds}
   no_colour=plt.cm.Greys(100)
+  outline_max_nodes=5000
   def __init__(self:Visualiser, 
                edges:List[(int,int)],
                Colour_map: Optional[Dict[int:(int,int)]]={},
                pos_nodes: Optional[Dict[int:Tuple[float,float]]]={},
                node_size : Optional[int] = 100,
                vis_labels: Optional[bool] = False,
-               window_title : Optional[str]=None)->None:
+               window_title : Optional[str]=None,
+               frame_pause : Optional[float] = 0.2,
+               layout : Optional[str] = "auto")->None:
     """
     Parameters
     ----------
     edges: List[(int,int)]
-      List containing the edges (Tuples of 2 vertices) forming the 2D surface for the simulation.
+      List containing the edges (Tuples of 2 vertices) forming the 2D surface for the simulation, or a CSRGraph.
     Colour_map: Dict[int:int]
       Dictionary containing the identity and color of each node
         Colour, expressed as a integer from -256(full-red) to 256(full-green)
@@ -46,28 +54,42 @@ class Visualiser:
       switch to visualize/hide the labels (used to track the species)
     window_title : Optional[str], default = None
       The title of the window.
+    frame_pause : Optional[float], default = 0.2
+      Seconds each frame is shown for, eg. 1/30 for 30 frames per second
+    layout : Optional[str], default = "auto"
+      Layout used when pos_nodes is empty: "spring", "spectral" or "auto" (see layout_helper).
+      Layouts are cached on disk per edge set, so the same graph is only laid out once.
     """
     self._edges = edges
     self._vis_labels = vis_labels
-    self._H = nx.Graph(self._edges)  # create a Graph dict mapping nodes to nbrs
-    self._cmap = [self.no_colour]*self._H.number_of_nodes()
+    if isinstance(self._edges, CSRGraph):
+      self._H = nx.Graph()
+      self._H.add_edges_from(self._edges.iter_edges())  # no edge list is built for array graphs
+    else:
+      self._H = nx.Graph(self._edges)  # create a Graph dict mapping nodes to nbrs
+    # position of each node in the drawing order, looked up in O(1)
+    self._node_index = {node: i for i, node in enumerate(self._H.nodes())}
+    self._cmap = self._colours(Colour_map)
     self._lnodes_edges =[]
     self._window_title=window_title
-    for key,val in Colour_map.items():
-      if(val>0):
-        self._cmap[list(self._H.nodes()).index(key)] = self.colour_map[0](val)
-      else:
-        self._cmap[list(self._H.nodes()).index(key)] = self.colour_map[1](-val)
 
     self._node_size = node_size
+    self._frame_pause = frame_pause
     # Need to create a layout when doing
     # separate calls to draw nodes and edges
     if(pos_nodes):
       self._pos = pos_nodes
     else:
-      self._pos = nx.spring_layout(self._H,k=2)
+      self._pos = cached_layout(self._H, layout)
 
-    self._fig, ax = plt.subplots()
+    self._fig, self._ax = plt.subplots()
+    # artists are created on the first plot and then only updated
+    self._nodes = None
+    self._highlight = None
+    self._background = None
+    self._background_size = None
+    # frames are saved to generic_graph_1.pdf unless a recorder is set
+    self._recorder = None
     # title
     if(self._window_title):
       self._fig.canvas.manager.set_window_title(self._window_title)    
@@ -96,31 +118,90 @@ class Visualiser:
   def update_node_colours(self:Visualiser,Colour_map:Dict[int:int]) -> None:
     """Informs this visualiser that the status of its colours has been updated."""
     if self.is_open() :
-      self._cmap = [self.no_colour]*self._H.number_of_nodes()
-      for key,val in Colour_map.items():
-        if(val>0):
-          self._cmap[list(self._H.nodes()).index(key)] = self.colour_map[0](val)
-        else:
-          self._cmap[list(self._H.nodes()).index(key)] = self.colour_map[1](-val)
+      self._cmap = self._colours(Colour_map)
     self._replot()
 
+  def _colours(self:Visualiser,Colour_map:Dict[int:int]) -> np.ndarray:
+    '''Return a (V,4) array with the RGBA colour of each node, in drawing order'''
+    cmap = np.tile(self.no_colour, (self._H.number_of_nodes(), 1))
+    if Colour_map:
+      index = np.fromiter((self._node_index[key] for key in Colour_map), dtype=np.int64, count=len(Colour_map))
+      values = np.fromiter(Colour_map.values(), dtype=np.int64, count=len(Colour_map))
+      green = values > 0
+      # one colormap call per colour, integer values index the colormap's lookup table directly
+      cmap[index[green]] = self.colour_map[0](values[green])
+      cmap[index[~green]] = self.colour_map[1](-values[~green])
+    return cmap
+
+  def set_recorder(self:Visualiser,recorder:Optional[FrameRecorder]) -> None:
+    """Sends every following frame to recorder (see recorder_helper) instead of saving it to generic_graph_1.pdf.
+    Pass None to stop recording."""
+    self._recorder = recorder
+
   def update_node_edges(self:Visualiser,lab_map:List[int]) -> None:
     """Informs this visualiser that the status of its labels has been updated."""
     self._lnodes_edges=lab_map
     self._replot()
 
+  def update_nodes(self:Visualiser,Colour_map:Dict[int:int],lab_map:List[int]) -> None:
+    """Informs this visualiser that its colours and labels have been updated, drawing (and recording) one frame."""
+    if self.is_open() :
+      self._cmap = self._colours(Colour_map)
+    self._lnodes_edges=lab_map
+    self._replot()
+
   def _replot(self:Visualiser) -> None:
-    '''Plotting facility'''
-    plt.clf()
-    nx.draw_networkx_nodes(self._H, self._pos,
-                       node_color = self._cmap, node_size = self._node_size,linewidths=1)
-    nx.draw_networkx_edges(self._H, self._pos, arrows=False)
-    if(self._lnodes_edges):
-       lcmap=[self._cmap[i] for i in self._lnodes_edges]
-       nx.draw_networkx_nodes(self._H,self._pos,node_color = lcmap,
-                              nodelist=self._lnodes_edges, node_size = self._node_size, edgecolors="blue",linewidths=2)
-    self._fig.canvas.draw()
-    self._fig.canvas.flush_events()
+    '''Plotting facility, the artists are created once and each frame only updates their colours'''
+    if self._nodes is None:
+      self._create_artists()
+
+    self._nodes.set_facecolor(self._cmap)
+    index = [self._node_index[i] for i in self._lnodes_edges]
+    self._highlight.set_offsets(self._xy[index])
+    self._highlight.set_facecolor(self._cmap[index])
+
+    canvas = self._fig.canvas
+    # the background (edges and axes) is captured again whenever the window size changes
+    if self._background is None or canvas.get_width_height() != self._background_size:
+      self._capture_background()
+    if self._background is not None:
+      canvas.restore_region(self._background)
+      self._ax.draw_artist(self._nodes)
+      self._ax.draw_artist(self._highlight)
+      canvas.blit(self._fig.bbox)
+      # the canvas is up to date, so pausing does not redraw the whole figure
+      self._fig.stale = False
+    else:
+      canvas.draw()
+    canvas.flush_events()
     plt.show(block=False)
-    plt.savefig('generic_graph_1.pdf')  
-    plt.pause(0.2)
+    if self._recorder is not None:
+      self._recorder.record(np.asarray(canvas.buffer_rgba()))
+    else:
+      plt.savefig('generic_graph_1.pdf')  
+    plt.pause(self._frame_pause)
+
+  def _create_artists(self:Visualiser) -> None:
+    '''Draws the edges, the nodes and the (empty) highlighted nodes, which are reused by every frame'''
+    self._xy = np.array([self._pos[node] for node in self._H.nodes()], dtype=float).reshape(-1, 2)
+    nx.draw_networkx_edges(self._H, self._pos, arrows=False, ax=self._ax)
+    # outlines are not visible on large graphs but dominate the cost of drawing them
+    linewidths = 1 if self._H.number_of_nodes() <= self.outline_max_nodes else 0
+    self._nodes = nx.draw_networkx_nodes(self._H, self._pos, ax=self._ax,
+                       node_color = self._cmap, node_size = self._node_size,linewidths=linewidths)
+    self._highlight = self._ax.scatter(np.empty(0), np.empty(0), s=self._node_size,
+                       edgecolors="blue", linewidths=2, zorder=3)
+
+  def _capture_background(self:Visualiser) -> None:
+    '''Draws the figure without nodes and stores it for blitting, if the backend supports blitting'''
+    canvas = self._fig.canvas
+    if not getattr(canvas, "supports_blit", False):
+      self._background = None
+      return
+    self._nodes.set_visible(False)
+    self._highlight.set_visible(False)
+    canvas.draw()
+    self._background = canvas.copy_from_bbox(self._fig.bbox)
+    self._background_size = canvas.get_width_height()
+    self._nodes.set_visible(True)
+    self._highlight.set_visible(True)